@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import CustomUser, UserProfile
+from .models import CustomUser, UserProfile, QuizAttempt, CareerTrendRollup
 
 class UserProfileInline(admin.StackedInline):
     model = UserProfile
@@ -32,4 +32,20 @@ class CustomUserAdmin(UserAdmin):
 class UserProfileAdmin(admin.ModelAdmin):
     list_display = ['user', 'city', 'state', 'preferred_language']
     list_filter = ['city', 'state', 'preferred_language']
-    search_fields = ['user__username', 'user__first_name', 'user__last_name', 'bio']
\ No newline at end of file
+    search_fields = ['user__username', 'user__first_name', 'user__last_name', 'bio']
+
+@admin.register(QuizAttempt)
+class QuizAttemptAdmin(admin.ModelAdmin):
+    list_display = ['user', 'quiz', 'score', 'created_at']
+    list_filter = ['quiz', 'created_at']
+    search_fields = ['user__username', 'user__first_name', 'user__last_name']
+    raw_id_fields = ['user']
+    readonly_fields = ['created_at']
+
+@admin.register(CareerTrendRollup)
+class CareerTrendRollupAdmin(admin.ModelAdmin):
+    list_display = ['day', 'career_key', 'grade', 'state', 'attempts', 'top_matches', 'score_sum']
+    list_filter = ['day', 'grade', 'state']
+    search_fields = ['career_key']
+    date_hierarchy = 'day'
+    readonly_fields = ['day', 'grade', 'state', 'career_key', 'attempts', 'top_matches', 'score_sum']
\ No newline at end of file
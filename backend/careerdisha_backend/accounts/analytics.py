@@ -0,0 +1,121 @@
+"""Career trend rollups maintained incrementally from new quiz attempts.
+
+Each saved QuizAttempt adds to per-(day, grade, state, career) totals in
+CareerTrendRollup. Attempts are buffered in memory and applied in batches
+with additive upserts, so the request path never touches the rollup table
+and trend queries cost O(buckets) rather than O(attempts).
+"""
+from collections import defaultdict
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+from resources.buffers import FlushBuffer
+from .models import CustomUser, CareerTrendRollup
+
+FLUSH_INTERVAL = 10  # seconds
+FLUSH_MAX_SIZE = 500
+
+def rollup_deltas(attempts, demographics):
+    """Aggregate (day, user_id, career_scores) tuples into per-bucket deltas.
+
+    demographics maps user_id to (grade, state). Returns a dict of
+    (day, grade, state, career_key) -> [attempts, top_matches, score_sum].
+    """
+    deltas = defaultdict(lambda: [0, 0, 0.0])
+    for day, user_id, career_scores in attempts:
+        grade, state = demographics.get(user_id, ('', ''))
+        scores = {}
+        for career, score in (career_scores or {}).items():
+            try:
+                score = float(score)
+            except (TypeError, ValueError):
+                continue
+            if score:
+                scores[career] = score
+        if not scores:
+            continue
+        top_career = max(scores, key=scores.get)
+        for career, score in scores.items():
+            delta = deltas[(day, grade, state, career)]
+            delta[0] += 1
+            delta[1] += career == top_career
+            delta[2] += score
+    return deltas
+
+def apply_deltas(deltas):
+    """Add deltas to the rollup table with one upsert per bucket"""
+    if not deltas:
+        return
+    qn = connection.ops.quote_name
+    table = qn(CareerTrendRollup._meta.db_table)
+    sql = (
+        f'INSERT INTO {table} (day, grade, state, career_key, attempts, top_matches, score_sum) '
+        f'VALUES (%s, %s, %s, %s, %s, %s, %s) '
+        f'ON CONFLICT (day, grade, state, career_key) DO UPDATE SET '
+        f'attempts = {table}.attempts + excluded.attempts, '
+        f'top_matches = {table}.top_matches + excluded.top_matches, '
+        f'score_sum = {table}.score_sum + excluded.score_sum'
+    )
+    rows = [
+        (connection.ops.adapt_datefield_value(day), grade, state, career, *delta)
+        for (day, grade, state, career), delta in deltas.items()
+    ]
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+def flush_attempts(attempts):
+    """Resolve grade and state for a batch of buffered attempts and apply them"""
+    user_ids = {user_id for _, user_id, _ in attempts}
+    demographics = {
+        user_id: ((grade or '').strip()[:20], (state or '').strip()[:100])
+        for user_id, grade, state in CustomUser.objects.filter(id__in=user_ids)
+        .values_list('id', 'grade', 'profile__state')
+    }
+    apply_deltas(rollup_deltas(attempts, demographics))
+
+_buffer = FlushBuffer(flush_attempts, interval=FLUSH_INTERVAL, max_size=FLUSH_MAX_SIZE, name='career-trends')
+
+def record_attempt(attempt):
+    """Queue a saved attempt for the next rollup flush"""
+    _buffer.add((timezone.localdate(attempt.created_at), attempt.user_id, attempt.career_scores))
+
+def flush_pending():
+    """Apply this worker's buffered attempts now"""
+    _buffer.flush()
+
+def career_trends(since, grade=None, state=None, group_by=None, limit=10):
+    """Rank careers by how often they were the top match since the given day.
+
+    Returns (attempts, careers), or a list of (group value, attempts,
+    careers) when group_by is 'grade', 'state' or 'day'.
+    """
+    queryset = CareerTrendRollup.objects.filter(day__gte=since)
+    if grade:
+        queryset = queryset.filter(grade__iexact=grade)
+    if state:
+        queryset = queryset.filter(state__iexact=state)
+
+    fields = ['career_key'] + ([group_by] if group_by else [])
+    totals = queryset.values(*fields).annotate(
+        total_attempts=Sum('attempts'),
+        total_top_matches=Sum('top_matches'),
+        total_score=Sum('score_sum'),
+    ).order_by('-total_top_matches', '-total_attempts', 'career_key')
+
+    groups = {}
+    for row in totals:
+        # Every attempt is the top match of exactly one career in its bucket
+        group = groups.setdefault(row[group_by] if group_by else None, [0, []])
+        group[0] += row['total_top_matches']
+        if len(group[1]) < limit:
+            group[1].append((
+                row['career_key'], row['total_attempts'], row['total_top_matches'],
+                row['total_score'] / row['total_attempts'] if row['total_attempts'] else 0.0,
+            ))
+
+    if not group_by:
+        return tuple(groups.get(None, (0, [])))
+    groups = [(value, attempts, careers) for value, (attempts, careers) in groups.items()]
+    if group_by == 'day':
+        return sorted(groups, key=lambda group: group[0], reverse=True)
+    return sorted(groups, key=lambda group: (-group[1], group[0]))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from accounts.similarity import build_index
+
+class Command(BaseCommand):
+    help = (
+        'Build the /api/accounts/similar-students/ index from every quiz attempt (run periodically, e.g. from cron). '
+        'Workers add attempts saved after the latest build on their own, and start a new build once enough have piled up'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for training the inverted lists')
+
+    def handle(self, *args, **options):
+        summary = build_index(options['seed'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Published {summary['build']}: {summary['students']} students, "
+            f"{summary['lists']} lists in {summary['seconds']}s"
+        ))
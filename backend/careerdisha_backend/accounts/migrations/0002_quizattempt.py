@@ -0,0 +1,68 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:47
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils.dateparse import parse_date
+import datetime
+
+
+def copy_quiz_scores_to_attempts(apps, schema_editor):
+    """Turn each UserProfile.quiz_scores entry into a QuizAttempt row"""
+    UserProfile = apps.get_model('accounts', 'UserProfile')
+    QuizAttempt = apps.get_model('accounts', 'QuizAttempt')
+    CareerQuiz = apps.get_model('resources', 'CareerQuiz')
+    quiz_ids = set(CareerQuiz.objects.values_list('id', flat=True))
+
+    for profile in UserProfile.objects.exclude(quiz_scores={}).iterator():
+        for quiz_id, entry in (profile.quiz_scores or {}).items():
+            if not isinstance(entry, dict):
+                continue
+            try:
+                score = float(entry.get('score'))
+            except (TypeError, ValueError):
+                score = 0
+            quiz_id = int(quiz_id) if str(quiz_id).isdigit() and int(quiz_id) in quiz_ids else None
+            attempt = QuizAttempt.objects.create(
+                user_id=profile.user_id,
+                quiz_id=quiz_id,
+                score=score,
+                results=entry.get('results') or {},
+            )
+            date_taken = parse_date(str(entry.get('date_taken', '')))
+            if date_taken:
+                QuizAttempt.objects.filter(pk=attempt.pk).update(
+                    created_at=datetime.datetime.combine(date_taken, datetime.time(), tzinfo=datetime.timezone.utc)
+                )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0003_career'),
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizAttempt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('career_scores', models.JSONField(default=dict, help_text='Career key to score vector')),
+                ('results', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('quiz', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='attempts', to='resources.careerquiz')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_attempts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['user', '-created_at', '-id'], name='quizattempt_user_recent'), models.Index(fields=['user', 'quiz', '-created_at', '-id'], name='quizattempt_user_quiz_recent')],
+            },
+        ),
+        migrations.RunPython(copy_quiz_scores_to_attempts, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='userprofile',
+            name='quiz_scores',
+        ),
+    ]
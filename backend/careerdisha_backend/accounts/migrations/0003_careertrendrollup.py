@@ -0,0 +1,76 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:54
+
+from collections import defaultdict
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_career_trends(apps, schema_editor):
+    """Roll up the quiz attempts saved before the rollup table existed"""
+    QuizAttempt = apps.get_model('accounts', 'QuizAttempt')
+    CareerTrendRollup = apps.get_model('accounts', 'CareerTrendRollup')
+
+    totals = defaultdict(lambda: [0, 0, 0.0])
+    attempts = QuizAttempt.objects.values_list(
+        'created_at', 'user__grade', 'user__profile__state', 'career_scores'
+    )
+    for created_at, grade, state, career_scores in attempts.iterator(chunk_size=5000):
+        scores = {}
+        for career, score in (career_scores or {}).items():
+            try:
+                score = float(score)
+            except (TypeError, ValueError):
+                continue
+            if score:
+                scores[career] = score
+        if not scores:
+            continue
+        top_career = max(scores, key=scores.get)
+        bucket = (timezone.localdate(created_at), (grade or '').strip()[:20], (state or '').strip()[:100])
+        for career, score in scores.items():
+            total = totals[bucket + (career,)]
+            total[0] += 1
+            total[1] += career == top_career
+            total[2] += score
+
+    CareerTrendRollup.objects.bulk_create(
+        [
+            CareerTrendRollup(
+                day=day, grade=grade, state=state, career_key=career,
+                attempts=attempts, top_matches=top_matches, score_sum=score_sum
+            )
+            for (day, grade, state, career), (attempts, top_matches, score_sum) in totals.items()
+        ],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_quizattempt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CareerTrendRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('grade', models.CharField(blank=True, max_length=20)),
+                ('state', models.CharField(blank=True, max_length=100)),
+                ('career_key', models.CharField(max_length=100)),
+                ('attempts', models.PositiveIntegerField(default=0, help_text='Attempts that scored this career')),
+                ('top_matches', models.PositiveIntegerField(default=0, help_text='Attempts where this career ranked first')),
+                ('score_sum', models.FloatField(default=0)),
+            ],
+            options={
+                'ordering': ['-day', 'career_key'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='careertrendrollup',
+            constraint=models.UniqueConstraint(fields=('day', 'grade', 'state', 'career_key'), name='careertrendrollup_bucket'),
+        ),
+        migrations.RunPython(backfill_career_trends, migrations.RunPython.noop),
+    ]
@@ -25,8 +25,49 @@ class UserProfile(models.Model):
     state = models.CharField(max_length=100, blank=True)
     preferred_language = models.CharField(max_length=50, default='English')
     notification_preferences = models.JSONField(default=dict)
-    quiz_scores = models.JSONField(default=dict, help_text="Career quiz results")
     bookmarked_content = models.JSONField(default=list, help_text="Bookmarked content IDs")
     
     def __str__(self):
-        return f"{self.user.username}'s Profile"
\ No newline at end of file
+        return f"{self.user.username}'s Profile"
+
+class QuizAttempt(models.Model):
+    """A single saved career quiz result. Rows are only ever appended."""
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='quiz_attempts')
+    quiz = models.ForeignKey('resources.CareerQuiz', on_delete=models.SET_NULL, null=True, blank=True, related_name='attempts')
+    score = models.FloatField()
+    career_scores = models.JSONField(default=dict, help_text="Career key to score vector")
+    results = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='quizattempt_user_recent'),
+            models.Index(fields=['user', 'quiz', '-created_at', '-id'], name='quizattempt_user_quiz_recent'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.quiz or 'Deleted quiz'} ({self.created_at:%Y-%m-%d})"
+
+class CareerTrendRollup(models.Model):
+    """Per-career quiz result totals for one day, grade and state bucket.
+
+    Maintained incrementally from new QuizAttempts (see accounts.analytics),
+    so trend queries read a handful of buckets instead of every attempt.
+    """
+    day = models.DateField()
+    grade = models.CharField(max_length=20, blank=True)
+    state = models.CharField(max_length=100, blank=True)
+    career_key = models.CharField(max_length=100)
+    attempts = models.PositiveIntegerField(default=0, help_text="Attempts that scored this career")
+    top_matches = models.PositiveIntegerField(default=0, help_text="Attempts where this career ranked first")
+    score_sum = models.FloatField(default=0)
+    
+    class Meta:
+        ordering = ['-day', 'career_key']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'grade', 'state', 'career_key'], name='careertrendrollup_bucket'),
+        ]
+    
+    def __str__(self):
+        return f"{self.career_key} on {self.day} ({self.grade or 'unknown grade'}, {self.state or 'unknown state'})"
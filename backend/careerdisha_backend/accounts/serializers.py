@@ -1,11 +1,47 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
-from .models import CustomUser, UserProfile
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from resources.models import CareerQuiz
+from .models import CustomUser, UserProfile, QuizAttempt
+
+def quiz_score_entry(attempt):
+    """An attempt in the {'score', 'results', 'date_taken'} shape of the old UserProfile.quiz_scores"""
+    return {
+        'score': attempt.score,
+        'results': attempt.results,
+        'date_taken': str(timezone.localdate(attempt.created_at)),
+    }
+
+def latest_quiz_scores(user):
+    """The user's latest attempt of each quiz, keyed by quiz ID as UserProfile.quiz_scores was.
+
+    One indexed lookup per quiz, however many attempts the user has made.
+    """
+    latest = QuizAttempt.objects.filter(user=user, quiz=OuterRef('pk')).order_by('-created_at', '-id')
+    attempt_ids = CareerQuiz.objects.annotate(attempt_id=Subquery(latest.values('pk')[:1])).exclude(
+        attempt_id=None
+    ).values('attempt_id')
+    return {
+        str(attempt.quiz_id): quiz_score_entry(attempt)
+        for attempt in QuizAttempt.objects.filter(pk__in=attempt_ids)
+    }
 
 class UserProfileSerializer(serializers.ModelSerializer):
+    quiz_scores = serializers.SerializerMethodField()
+    
     class Meta:
         model = UserProfile
         fields = ['bio', 'avatar', 'city', 'state', 'preferred_language', 'quiz_scores', 'bookmarked_content']
+    
+    def get_quiz_scores(self, profile):
+        return latest_quiz_scores(profile.user_id)
+
+class QuizAttemptSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = QuizAttempt
+        fields = ['id', 'quiz', 'score', 'career_scores', 'results', 'created_at']
+        read_only_fields = ['id', 'created_at']
 
 class UserSerializer(serializers.ModelSerializer):
     profile = UserProfileSerializer(read_only=True)
@@ -1,6 +1,9 @@
+from django.db import transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
-from .models import CustomUser, UserProfile
+from .models import CustomUser, UserProfile, QuizAttempt
+from .analytics import record_attempt
+from .similarity import index_attempt
 
 @receiver(post_save, sender=CustomUser)
 def create_user_profile(sender, instance, created, **kwargs):
@@ -14,4 +17,16 @@ def save_user_profile(sender, instance, **kwargs):
     try:
         instance.profile.save()
     except UserProfile.DoesNotExist:
-        UserProfile.objects.create(user=instance)
\ No newline at end of file
+        UserProfile.objects.create(user=instance)
+
+@receiver(post_save, sender=QuizAttempt)
+def add_attempt_to_similarity_index(sender, instance, created, **kwargs):
+    """Make a new attempt searchable in this worker's similar-students index"""
+    if created:
+        transaction.on_commit(lambda: index_attempt(instance))
+
+@receiver(post_save, sender=QuizAttempt)
+def add_attempt_to_career_trends(sender, instance, created, **kwargs):
+    """Count a new attempt towards the career trend rollups"""
+    if created:
+        transaction.on_commit(lambda: record_attempt(instance))
\ No newline at end of file
@@ -0,0 +1,342 @@
+"""Nearest-neighbour index over students' quiz score vectors.
+
+Each student is represented by the career score vector of their latest
+QuizAttempt, L2-normalized so that a dot product is the cosine similarity.
+build_index() runs as a batch job (the build_similarity_index command),
+never inside a request: it reads every attempt once, partitions the
+vectors into inverted lists around spherical k-means centroids (IVF) and
+publishes a build directory holding
+
+- vectors.f32: the unit vectors grouped by list, memory-mapped by workers
+- meta.npz: the careers, centroids and list boundaries, plus the user,
+  attempt and top career of every row and the last attempt id read
+
+Workers load the latest build and add the attempts saved since then on
+top of it, filed under the same lists, so a query scans the few lists
+closest to it and its cost depends on the list size rather than on the
+number of attempts. Once REBUILD_AFTER_RECENT attempts have piled up on
+top of a build, the worker that notices publishes a fresh build from a
+background thread.
+"""
+import logging
+import os
+import threading
+import time
+import uuid
+import numpy as np
+from django.conf import settings
+from django.db import close_old_connections
+from resources.models import Career
+from resources.semantic import CURRENT_FILE, publish
+from .models import QuizAttempt
+
+logger = logging.getLogger(__name__)
+
+REFRESH_INTERVAL = 30  # seconds between checks for a newer build and new attempts
+TRAINING_SAMPLE_SIZE = 20000
+KMEANS_ITERATIONS = 10
+DEFAULT_NPROBE = 8
+CHUNK_SIZE = 5000
+REBUILD_AFTER_RECENT = 20000  # attempts added on top of a build before a new build is started
+BUILD_LOCK_FILE = 'BUILDING'
+BUILD_LOCK_TIMEOUT = 3600  # seconds after which a leftover lock file is ignored
+
+class SimilarStudentsIndex:
+    """A published build plus the attempts saved after it"""
+
+    def __init__(self, path):
+        with np.load(path / 'meta.npz') as meta:
+            self.careers = tuple(meta['careers'].tolist())
+            self.centroids = meta['centroids']
+            self.offsets = meta['offsets']
+            self.users = meta['users']
+            self.attempt_ids = meta['attempt_ids']
+            self.top_careers = meta['top_careers']
+            self.user_order = meta['user_order']
+            self.last_attempt_id = int(meta['last_attempt_id'])
+        self.last_seen_id = self.last_attempt_id
+        self.vectors = read_vectors(path / 'vectors.f32', len(self.careers))
+        self.columns = {career: column for column, career in enumerate(self.careers)}
+        # Rows of students who have a newer attempt since the build
+        self.alive = np.ones(len(self.users), dtype=bool)
+        self.recent = {}  # user_id -> (attempt_id, vector, top career column, list number)
+        self._recent_lists = {}  # list number -> {user_id: (vector, top career column)}
+        self._recent_arrays = {}  # list number -> stacked arrays of _recent_lists, built on demand
+        self.lock = threading.Lock()
+        self.build_requested = False
+
+    def __len__(self):
+        return int(self.alive.sum()) + len(self.recent)
+
+    def vectorize(self, career_scores):
+        """Turn a career_scores dict into a unit vector, or None if it is empty"""
+        return score_vector(self.columns, career_scores)
+
+    def _built_row(self, user_id):
+        """The build's row for a student, or None"""
+        position = np.searchsorted(self.users, user_id, sorter=self.user_order)
+        if position < len(self.users) and self.users[self.user_order[position]] == user_id:
+            return int(self.user_order[position])
+        return None
+
+    def add(self, attempt_id, user_id, career_scores):
+        """Index an attempt, replacing the student's older vector if there is one"""
+        self.last_seen_id = max(self.last_seen_id, attempt_id)
+        if attempt_id <= self.last_attempt_id:
+            return
+        vector = self.vectorize(career_scores)
+        with self.lock:
+            previous = self.recent.get(user_id)
+            if previous is not None and previous[0] >= attempt_id:
+                return
+            if vector is None:
+                return
+            row = self._built_row(user_id)
+            if row is not None:
+                self.alive[row] = False
+            if previous is not None:
+                del self._recent_lists[previous[3]][user_id]
+                self._recent_arrays.pop(previous[3], None)
+            list_number = int(np.argmax(self.centroids @ vector))
+            top_career = int(np.argmax(vector))
+            self.recent[user_id] = (attempt_id, vector, top_career, list_number)
+            self._recent_lists.setdefault(list_number, {})[user_id] = (vector, top_career)
+            self._recent_arrays.pop(list_number, None)
+        if len(self.recent) > REBUILD_AFTER_RECENT and not self.build_requested:
+            # Once per build: the next one replaces this index when it is published
+            self.build_requested = True
+            request_build()
+
+    def add_many(self, rows):
+        """Index (attempt_id, user_id, career_scores) rows ordered by attempt id"""
+        for attempt_id, user_id, career_scores in rows:
+            self.add(attempt_id, user_id, career_scores)
+
+    def catch_up(self):
+        """Add the attempts saved by any worker since the last catch-up"""
+        self.add_many(
+            QuizAttempt.objects.filter(id__gt=self.last_seen_id)
+            .order_by('id')
+            .values_list('id', 'user_id', 'career_scores')
+            .iterator(chunk_size=CHUNK_SIZE)
+        )
+
+    def recent_arrays(self, list_number):
+        """(vectors, users, top careers) of the attempts added to one list since the build"""
+        with self.lock:
+            arrays = self._recent_arrays.get(list_number)
+            if arrays is None:
+                entries = list(self._recent_lists.get(list_number, {}).items())
+                arrays = self._recent_arrays[list_number] = (
+                    np.vstack([vector for _, (vector, _) in entries]) if entries
+                    else np.empty((0, len(self.careers)), np.float32),
+                    np.array([user_id for user_id, _ in entries], dtype=np.int64),
+                    np.array([top for _, (_, top) in entries], dtype=np.int32),
+                )
+            return arrays
+
+    def search(self, vector, k=50, exclude_user=None, nprobe=DEFAULT_NPROBE):
+        """Return (user_ids, top career columns, similarities) of the k nearest students"""
+        probe = np.argsort(-(self.centroids @ vector))[:nprobe]
+        rows = np.concatenate([
+            np.arange(self.offsets[number], self.offsets[number + 1]) for number in probe
+        ]) if len(probe) else np.empty(0, dtype=np.intp)
+        rows = rows[self.alive[rows]]
+        recent = [self.recent_arrays(int(number)) for number in probe]
+
+        users = np.concatenate([self.users[rows], *(part[1] for part in recent)])
+        top_careers = np.concatenate([self.top_careers[rows], *(part[2] for part in recent)])
+        similarities = np.concatenate([
+            np.asarray(self.vectors[rows] @ vector, dtype=np.float32),
+            *(np.asarray(part[0] @ vector, dtype=np.float32) for part in recent),
+        ])
+        if exclude_user is not None:
+            keep = users != exclude_user
+            users, top_careers, similarities = users[keep], top_careers[keep], similarities[keep]
+
+        if len(similarities) > k:
+            best = np.argpartition(-similarities, k - 1)[:k]
+        else:
+            best = np.arange(len(similarities))
+        best = best[np.argsort(-similarities[best])]
+        return users[best], top_careers[best], similarities[best]
+
+    def careers_chosen(self, career_scores, k=50, exclude_user=None, limit=5):
+        """Count the top careers of the k students most similar to career_scores"""
+        vector = self.vectorize(career_scores)
+        if vector is None:
+            return 0, []
+        _, top_careers, _ = self.search(vector, k=k, exclude_user=exclude_user)
+        counts = np.bincount(top_careers, minlength=len(self.careers))
+        ranked = np.argsort(-counts, kind='stable')[:limit]
+        return len(top_careers), [
+            (self.careers[column], int(counts[column])) for column in ranked if counts[column]
+        ]
+
+def score_vector(columns, career_scores):
+    vector = np.zeros(len(columns), dtype=np.float32)
+    for career, score in (career_scores or {}).items():
+        column = columns.get(career)
+        if column is not None:
+            try:
+                vector[column] = score
+            except (TypeError, ValueError):
+                continue
+    norm = np.linalg.norm(vector)
+    if not norm:
+        return None
+    return vector / norm
+
+def read_vectors(path, dims):
+    # numpy can't memory-map an empty file
+    if path.stat().st_size == 0:
+        return np.zeros((0, dims), dtype=np.float32)
+    return np.memmap(path, dtype=np.float32, mode='r').reshape(-1, dims)
+
+def train_centroids(vectors, nlist, seed=0):
+    """Spherical k-means over (a sample of) the unit vectors"""
+    rng = np.random.default_rng(seed)
+    if len(vectors) > TRAINING_SAMPLE_SIZE:
+        vectors = vectors[rng.choice(len(vectors), TRAINING_SAMPLE_SIZE, replace=False)]
+    centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+        norms = np.linalg.norm(sums, axis=1)
+        filled = norms > 0
+        centroids[filled] = sums[filled] / norms[filled, None]
+    return centroids
+
+def index_root():
+    return settings.SIMILARITY_INDEX_DIR
+
+def build_index(seed=0):
+    """Read every attempt once and publish a fresh build; returns its summary"""
+    started = time.monotonic()
+    careers = sorted(Career.objects.values_list('key', flat=True))
+    columns = {career: column for column, career in enumerate(careers)}
+
+    # The latest vector per student
+    latest, last_attempt_id = {}, 0
+    for attempt_id, user_id, career_scores in (
+        QuizAttempt.objects.order_by('id').values_list('id', 'user_id', 'career_scores').iterator(chunk_size=CHUNK_SIZE)
+    ):
+        vector = score_vector(columns, career_scores)
+        if vector is not None:
+            latest[user_id] = (attempt_id, vector)
+        last_attempt_id = attempt_id
+
+    users = np.fromiter(latest, dtype=np.int64, count=len(latest))
+    attempt_ids = np.array([latest[user_id][0] for user_id in users.tolist()], dtype=np.int64)
+    vectors = (
+        np.vstack([latest[user_id][1] for user_id in users.tolist()]) if latest
+        else np.empty((0, len(careers)), dtype=np.float32)
+    )
+    del latest
+    if len(vectors):
+        nlist = int(min(1024, max(1, np.sqrt(len(vectors)))))
+        centroids = train_centroids(vectors, nlist, seed)
+        assignments = np.concatenate([
+            np.argmax(vectors[start:start + CHUNK_SIZE] @ centroids.T, axis=1)
+            for start in range(0, len(vectors), CHUNK_SIZE)
+        ])
+    else:
+        nlist = 1
+        centroids = np.zeros((1, len(careers)), dtype=np.float32)
+        assignments = np.empty(0, dtype=np.intp)
+
+    # Group the rows by inverted list so each list is one contiguous slice
+    order = np.argsort(assignments, kind='stable')
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(assignments, minlength=nlist))])
+    users, attempt_ids, vectors = users[order], attempt_ids[order], vectors[order]
+
+    root = index_root()
+    build = root / f'build-{time.strftime("%Y%m%d%H%M%S")}-{uuid.uuid4().hex[:8]}'
+    build.mkdir(parents=True)
+    vectors.astype(np.float32).tofile(build / 'vectors.f32')
+    np.savez(
+        build / 'meta.npz', careers=np.array(careers, dtype=str), centroids=centroids, offsets=offsets,
+        users=users, attempt_ids=attempt_ids, top_careers=np.argmax(vectors, axis=1).astype(np.int32),
+        user_order=np.argsort(users, kind='stable'), last_attempt_id=last_attempt_id
+    )
+    publish(root, build.name)
+    return {
+        'build': build.name,
+        'students': len(users),
+        'lists': len(centroids),
+        'seconds': round(time.monotonic() - started, 1),
+    }
+
+_build_thread = None
+
+def _build_in_background():
+    lock = index_root() / BUILD_LOCK_FILE
+    try:
+        # Another worker may already be building
+        if lock.exists() and time.time() - lock.stat().st_mtime < BUILD_LOCK_TIMEOUT:
+            return
+        lock.unlink(missing_ok=True)
+        try:
+            os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            return
+        try:
+            build_index()
+        finally:
+            lock.unlink(missing_ok=True)
+    except Exception:
+        logger.exception('Building the similar-students index failed')
+    finally:
+        # There is no request cycle in this thread to recycle its connection
+        close_old_connections()
+
+def request_build():
+    """Publish a fresh build from a background thread, unless one is running"""
+    global _build_thread
+
+    with _build_lock:
+        if _build_thread is None or not _build_thread.is_alive():
+            _build_thread = threading.Thread(target=_build_in_background, name='similarity-build', daemon=True)
+            _build_thread.start()
+
+_loaded = None  # (checked at, build name, SimilarStudentsIndex or None)
+_refresh_lock = threading.Lock()
+_build_lock = threading.Lock()
+
+def get_similar_students_index():
+    """Return the latest build with recent attempts added, or None before the first build.
+
+    Every REFRESH_INTERVAL one request picks up a newer build and the
+    attempts saved since; requests arriving meanwhile use the index as it is.
+    """
+    global _loaded
+
+    entry = _loaded
+    if entry is not None and time.monotonic() - entry[0] <= REFRESH_INTERVAL:
+        return entry[2]
+    # Only the very first lookup waits for another thread's refresh
+    if not _refresh_lock.acquire(blocking=entry is None):
+        return entry[2]
+    try:
+        entry = _loaded
+        if entry is None or time.monotonic() - entry[0] > REFRESH_INTERVAL:
+            try:
+                name = (index_root() / CURRENT_FILE).read_text().strip()
+            except FileNotFoundError:
+                name = None
+            if entry is not None and entry[1] == name:
+                index = entry[2]
+            else:
+                index = SimilarStudentsIndex(index_root() / name) if name else None
+            if index is not None:
+                index.catch_up()
+            entry = _loaded = (time.monotonic(), name, index)
+        return entry[2]
+    finally:
+        _refresh_lock.release()
+
+def index_attempt(attempt):
+    """Add a freshly saved attempt to this worker's index, if it has one"""
+    if _loaded is not None and _loaded[2] is not None:
+        _loaded[2].add(attempt.id, attempt.user_id, attempt.career_scores)
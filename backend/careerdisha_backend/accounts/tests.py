@@ -0,0 +1,109 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+import numpy as np
+from django.test import TestCase, override_settings
+from resources.models import Career, CareerQuiz
+from rest_framework.test import APIClient
+from . import similarity
+from .models import CustomUser, QuizAttempt
+
+CAREERS = ['doctor', 'engineer', 'lawyer', 'teacher']
+
+class SimilarStudentsIndexTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(SIMILARITY_INDEX_DIR=Path(directory.name))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        # Every test starts without a loaded index
+        self.addCleanup(setattr, similarity, '_loaded', None)
+        similarity._loaded = None
+
+        for key in CAREERS:
+            Career.objects.create(key=key, name=key.title())
+        self.quiz = CareerQuiz.objects.create(title='Quiz', description='d')
+        self.rng = np.random.default_rng(0)
+        self.users = [self.student(f'student{number}') for number in range(300)]
+
+    def student(self, username, career_scores=None):
+        user = CustomUser.objects.create(username=username)
+        self.attempt(user, career_scores)
+        return user
+
+    def attempt(self, user, career_scores=None):
+        if career_scores is None:
+            career_scores = dict(zip(CAREERS, self.rng.integers(0, 10, len(CAREERS)).tolist()))
+        return QuizAttempt.objects.create(user=user, quiz=self.quiz, score=1, career_scores=career_scores)
+
+    def brute_force(self, index, career_scores, k, exclude_user=None):
+        """The k best similarities over every student's latest attempt"""
+        latest = {}
+        for attempt in QuizAttempt.objects.order_by('id'):
+            latest[attempt.user_id] = attempt.career_scores
+        vector = index.vectorize(career_scores)
+        similarities = [
+            float(index.vectorize(scores) @ vector) for user_id, scores in latest.items() if user_id != exclude_user
+        ]
+        return sorted(similarities, reverse=True)[:k]
+
+    def test_search_over_every_list_matches_brute_force(self):
+        summary = similarity.build_index()
+        self.assertEqual(summary['students'], 300)
+        index = similarity.get_similar_students_index()
+        self.assertEqual(len(index), 300)
+
+        query = {'doctor': 9, 'engineer': 1}
+        users, _, similarities = index.search(index.vectorize(query), k=10, exclude_user=self.users[0].pk, nprobe=len(index.centroids))
+        self.assertNotIn(self.users[0].pk, users.tolist())
+        np.testing.assert_allclose(similarities, self.brute_force(index, query, 10, self.users[0].pk), rtol=1e-5)
+
+    def test_attempts_after_the_build_replace_older_ones(self):
+        similarity.build_index()
+        index = similarity.get_similar_students_index()
+        changed, added = self.users[5], self.student('latecomer', {'lawyer': 5})
+        self.attempt(changed, {'teacher': 7})
+        index.catch_up()
+
+        self.assertEqual(len(index), 301)
+        self.assertEqual(len(index.recent), 2)
+        for career, user in (('teacher', changed), ('lawyer', added)):
+            users, top_careers, similarities = index.search(index.vectorize({career: 1}), k=400, nprobe=len(index.centroids))
+            # The student shows up once, with the new vector
+            self.assertEqual(users.tolist().count(user.pk), 1)
+            position = users.tolist().index(user.pk)
+            self.assertAlmostEqual(float(similarities[position]), 1, places=5)
+            self.assertEqual(index.careers[top_careers[position]], career)
+        np.testing.assert_allclose(
+            index.search(index.vectorize({'teacher': 1}), k=20, nprobe=len(index.centroids))[2],
+            self.brute_force(index, {'teacher': 1}, 20), rtol=1e-5
+        )
+
+    def test_a_new_build_is_requested_once_enough_attempts_pile_up(self):
+        similarity.build_index()
+        index = similarity.get_similar_students_index()
+        with mock.patch.object(similarity, 'REBUILD_AFTER_RECENT', 3), \
+                mock.patch.object(similarity, 'request_build') as request_build:
+            for user in self.users[:3]:
+                self.attempt(user)
+            index.catch_up()
+            request_build.assert_not_called()
+            for user in self.users[3:6]:
+                self.attempt(user)
+            index.catch_up()
+        request_build.assert_called_once()
+
+    def test_similar_students_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.users[0])
+        self.assertEqual(client.get('/api/accounts/similar-students/').status_code, 503)
+
+        similarity.build_index()
+        # As if REFRESH_INTERVAL had passed since the last look for a build
+        similarity._loaded = None
+        response = client.get('/api/accounts/similar-students/', {'k': 20})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['neighbours'], 20)
+        self.assertEqual(sum(career['students'] for career in response.data['careers']), 20)
+        self.assertEqual(response.data['careers'][0]['career'], response.data['careers'][0]['career_key'].title())
@@ -9,4 +9,8 @@ urlpatterns = [
     path('bookmark/', views.bookmark_content, name='bookmark-content'),
     path('bookmarks/', views.get_bookmarks, name='get-bookmarks'),
     path('quiz-result/', views.save_quiz_result, name='save-quiz-result'),
+    path('quiz-result/latest/', views.latest_quiz_result, name='latest-quiz-result'),
+    path('quiz-history/', views.QuizAttemptListView.as_view(), name='quiz-history'),
+    path('similar-students/', views.similar_students, name='similar-students'),
+    path('analytics/career-trends/', views.career_trends, name='career-trends'),
 ]
\ No newline at end of file
@@ -1,12 +1,19 @@
 from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
+from datetime import timedelta
 from django.utils import timezone
-from .models import CustomUser, UserProfile
-from .serializers import UserSerializer, UserRegistrationSerializer, LoginSerializer, UserProfileSerializer
+from resources.models import CareerQuiz
+from resources.careers import get_career_catalog
+from resources.scoring import get_compiled_quiz
+from resources.views import parse_limit
+from .models import CustomUser, UserProfile, QuizAttempt
+from . import analytics
+from .similarity import get_similar_students_index
+from .serializers import UserSerializer, UserRegistrationSerializer, LoginSerializer, UserProfileSerializer, QuizAttemptSerializer, quiz_score_entry
 
 class RegisterView(generics.CreateAPIView):
     queryset = CustomUser.objects.all()
@@ -120,21 +127,147 @@ def save_quiz_result(request):
     quiz_id = request.data.get('quiz_id')
     score = request.data.get('score')
     results = request.data.get('results', {})
+    answers = request.data.get('answers')
+    career_scores = request.data.get('career_scores', {})
     
     if not all([quiz_id, score is not None]):
         return Response({'error': 'quiz_id and score are required'}, 
                        status=status.HTTP_400_BAD_REQUEST)
     
-    profile, created = UserProfile.objects.get_or_create(user=request.user)
-    quiz_scores = profile.quiz_scores or {}
+    if answers is not None and not isinstance(answers, list):
+        return Response({'error': 'answers must be a list of answer IDs'},
+                       status=status.HTTP_400_BAD_REQUEST)
+    
+    if not str(quiz_id).isdigit() or not CareerQuiz.objects.filter(pk=quiz_id).exists():
+        return Response({'error': 'Quiz not found'}, status=status.HTTP_404_NOT_FOUND)
     
-    quiz_scores[str(quiz_id)] = {
+    # Prefer recomputing the score vector from the submitted answers
+    if answers:
+        quiz = get_compiled_quiz(quiz_id)
+        if quiz is not None:
+            vector = quiz.score(answers)
+            career_scores = {
+                career: value.item()
+                for career, value in zip(quiz.careers, vector) if value
+            }
+    
+    serializer = QuizAttemptSerializer(data={
+        'quiz': quiz_id,
         'score': score,
+        'career_scores': career_scores,
         'results': results,
-        'date_taken': str(timezone.now().date())
-    }
+    })
+    serializer.is_valid(raise_exception=True)
+    attempt = serializer.save(user=request.user)
     
-    profile.quiz_scores = quiz_scores
-    profile.save()
+    # The saved attempt is the latest of its quiz, so quiz_scores needs no
+    # lookup. Unlike the old profile blob it only holds the submitted quiz;
+    # the profile's quiz_scores still lists every quiz.
+    return Response({
+        'message': 'Quiz result saved successfully',
+        'quiz_scores': {str(attempt.quiz_id): quiz_score_entry(attempt)},
+        'attempt': serializer.data,
+    })
+
+class QuizAttemptListView(generics.ListAPIView):
+    """Paginated quiz history for the current user, newest first"""
+    serializer_class = QuizAttemptSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        queryset = QuizAttempt.objects.filter(user=self.request.user)
+        quiz_id = self.request.query_params.get('quiz_id', None)
+        
+        if quiz_id and quiz_id.isdigit():
+            queryset = queryset.filter(quiz_id=quiz_id)
+            
+        return queryset
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def latest_quiz_result(request):
+    queryset = QuizAttempt.objects.filter(user=request.user)
+    quiz_id = request.query_params.get('quiz_id')
+    if quiz_id and quiz_id.isdigit():
+        queryset = queryset.filter(quiz_id=quiz_id)
+    
+    attempt = queryset.first()
+    if attempt is None:
+        return Response({'error': 'No quiz results found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    return Response(QuizAttemptSerializer(attempt).data)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def similar_students(request):
+    """Careers chosen by the students whose latest quiz results are closest to yours"""
+    attempt = QuizAttempt.objects.filter(user=request.user).first()
+    if attempt is None:
+        return Response({'error': 'Take the career quiz first'}, status=status.HTTP_404_NOT_FOUND)
+    
+    k = parse_limit(request, 50, 500, param='k')
+    
+    index = get_similar_students_index()
+    if index is None:
+        return Response({'error': 'Similar students index has not been built yet'},
+                       status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    neighbours, chosen = index.careers_chosen(attempt.career_scores, k=k, exclude_user=request.user.id)
+    catalog = get_career_catalog()
+    
+    return Response({
+        'neighbours': neighbours,
+        'careers': [
+            {
+                'career': catalog.get(career_key)['name'],
+                'career_key': career_key,
+                'students': count,
+                'share': round(count / neighbours * 100, 1),
+            }
+            for career_key, count in chosen
+        ],
+    })
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def career_trends(request):
+    """Careers most often ranked first in recent quiz results, optionally by grade, state or day"""
+    days = parse_limit(request, 30, 366, param='days')
+    limit = parse_limit(request, 10, 100)
+    grade = request.query_params.get('grade')
+    state = request.query_params.get('state')
+    group_by = request.query_params.get('group_by')
+    
+    if group_by not in (None, 'grade', 'state', 'day'):
+        return Response({'error': 'group_by must be one of grade, state or day'},
+                       status=status.HTTP_400_BAD_REQUEST)
+    
+    analytics.flush_pending()
+    since = timezone.localdate() - timedelta(days=days - 1)
+    catalog = get_career_catalog()
+    
+    def serialize(attempts, careers):
+        return {
+            'attempts': attempts,
+            'careers': [
+                {
+                    'career': catalog.get(career_key)['name'],
+                    'career_key': career_key,
+                    'attempts': career_attempts,
+                    'top_matches': top_matches,
+                    'share': round(top_matches / attempts * 100, 1) if attempts else 0,
+                    'average_score': round(average_score, 2),
+                }
+                for career_key, career_attempts, top_matches, average_score in careers
+            ],
+        }
+    
+    data = {'since': since, 'days': days}
+    if group_by:
+        data['groups'] = [
+            {group_by: value, **serialize(attempts, careers)}
+            for value, attempts, careers in analytics.career_trends(since, grade, state, group_by, limit)
+        ]
+    else:
+        data.update(serialize(*analytics.career_trends(since, grade, state, limit=limit)))
     
-    return Response({'message': 'Quiz result saved successfully', 'quiz_scores': quiz_scores})
\ No newline at end of file
+    return Response(data)
\ No newline at end of file
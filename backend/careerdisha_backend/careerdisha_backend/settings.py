@@ -98,6 +98,20 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# In-process caches (compiled quizzes etc.) are invalidated through generation
+# tokens stored here; use a shared backend such as Redis or Memcached when
+# running more than one worker process.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'careerdisha',
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -227,6 +241,12 @@ CORS_ALLOWED_HEADERS = [
 # Google Generative AI settings
 GOOGLE_API_KEY = config('GOOGLE_API_KEY', default='')
 
+# Vectors for /api/search/semantic/, written by the build_semantic_index command
+SEMANTIC_INDEX_DIR = Path(config('SEMANTIC_INDEX_DIR', default=str(BASE_DIR / 'semantic_index')))
+
+# Score vectors for /api/accounts/similar-students/, written by the build_similarity_index command
+SIMILARITY_INDEX_DIR = Path(config('SIMILARITY_INDEX_DIR', default=str(BASE_DIR / 'similarity_index')))
+
 # File upload settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
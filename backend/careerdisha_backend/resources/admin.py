@@ -1,15 +1,34 @@
 from django.contrib import admin
+from django.contrib.contenttypes.models import ContentType
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
-from .models import Video, PDFResource, Article, CareerQuiz, QuizQuestion, QuizAnswer, Scholarship, College
+from .models import Tag, SynonymGroup, ContentStats, EngagementHourly, EngagementDaily, TrendingItem, Video, PDFResource, Article, Career, CareerQuiz, QuizQuestion, QuizAnswer, QuizScoreSketch, SearchQueryRollup, SearchVolumeRollup, Scholarship, College
+
+class ContentStatsMixin:
+    """Loads each row's ContentStats with the changelist instead of one query per counter or visitor cell"""
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related('stats')
+
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ['name', 'slug']
+    search_fields = ['name', 'slug']
+
+@admin.register(SynonymGroup)
+class SynonymGroupAdmin(admin.ModelAdmin):
+    list_display = ['terms', 'is_active', 'updated_at']
+    list_filter = ['is_active']
+    search_fields = ['terms']
 
 @admin.register(Video)
-class VideoAdmin(admin.ModelAdmin):
-    list_display = ['title', 'category', 'duration', 'is_parent_content', 'is_featured', 'thumbnail_preview', 'uploaded_at']
+class VideoAdmin(ContentStatsMixin, admin.ModelAdmin):
+    list_display = ['title', 'category', 'duration', 'view_count', 'unique_visitors', 'is_parent_content', 'is_featured', 'thumbnail_preview', 'uploaded_at']
     list_filter = ['category', 'is_parent_content', 'is_featured', 'uploaded_at']
-    search_fields = ['title', 'description', 'tags']
+    search_fields = ['title', 'description', 'tags__name']
     ordering = ['-uploaded_at']
+    filter_horizontal = ['tags']
     readonly_fields = ['ai_generated_summary', 'get_video_id', 'get_thumbnail_url', 'get_embed_url']
     
     fieldsets = (
@@ -67,11 +86,12 @@ class VideoAdmin(admin.ModelAdmin):
     delete_selected_videos.short_description = "🗑️ Delete selected videos"
 
 @admin.register(PDFResource)
-class PDFResourceAdmin(admin.ModelAdmin):
-    list_display = ['title', 'category', 'file_size', 'download_count', 'is_parent_content', 'is_featured', 'uploaded_at']
+class PDFResourceAdmin(ContentStatsMixin, admin.ModelAdmin):
+    list_display = ['title', 'category', 'file_size', 'download_count', 'unique_visitors', 'is_parent_content', 'is_featured', 'uploaded_at']
     list_filter = ['category', 'is_parent_content', 'is_featured', 'uploaded_at']
-    search_fields = ['title', 'description', 'tags']
+    search_fields = ['title', 'description', 'tags__name']
     ordering = ['-uploaded_at']
+    filter_horizontal = ['tags']
     readonly_fields = ['file_size', 'download_count', 'ai_generated_summary']
     
     fieldsets = (
@@ -109,8 +129,10 @@ class PDFResourceAdmin(admin.ModelAdmin):
     mark_as_featured.short_description = "Mark selected PDFs as featured"
     
     def reset_download_counts(self, request, queryset):
-        updated = queryset.update(download_count=0)
-        self.message_user(request, f"Reset download counts for {updated} PDFs.")
+        ContentStats.objects.filter(
+            content_type=ContentType.objects.get_for_model(PDFResource), object_id__in=queryset.values('pk')
+        ).update(download_count=0)
+        self.message_user(request, f"Reset download counts for {queryset.count()} PDFs.")
     reset_download_counts.short_description = "Reset download counts for selected PDFs"
     
     def delete_selected_pdfs(self, request, queryset):
@@ -127,11 +149,12 @@ class PDFResourceAdmin(admin.ModelAdmin):
     delete_selected_pdfs.short_description = "🗑️ Delete selected PDFs"
 
 @admin.register(Article)
-class ArticleAdmin(admin.ModelAdmin):
-    list_display = ['title', 'author', 'category', 'read_time', 'view_count', 'is_published', 'is_parent_content', 'is_featured', 'uploaded_at']
+class ArticleAdmin(ContentStatsMixin, admin.ModelAdmin):
+    list_display = ['title', 'author', 'category', 'read_time', 'view_count', 'unique_visitors', 'is_published', 'is_parent_content', 'is_featured', 'uploaded_at']
     list_filter = ['category', 'is_parent_content', 'is_featured', 'is_published', 'author', 'uploaded_at']
-    search_fields = ['title', 'description', 'content', 'tags', 'author']
+    search_fields = ['title', 'description', 'content', 'tags__name', 'author']
     ordering = ['-uploaded_at']
+    filter_horizontal = ['tags']
     readonly_fields = ['read_time', 'view_count', 'ai_enhanced_content']
     
     fieldsets = (
@@ -219,9 +242,57 @@ class QuizQuestionAdmin(admin.ModelAdmin):
         return obj.answers.count()
     answer_count.short_description = "Answers"
 
+@admin.register(Career)
+class CareerAdmin(admin.ModelAdmin):
+    list_display = ['name', 'key', 'category', 'avg_salary', 'growth_outlook', 'updated_at']
+    list_filter = ['category']
+    search_fields = ['name', 'key', 'description']
+    ordering = ['name']
+
+@admin.register(QuizScoreSketch)
+class QuizScoreSketchAdmin(admin.ModelAdmin):
+    list_display = ['career_key', 'quiz', 'count', 'updated_at']
+    list_filter = ['quiz']
+    search_fields = ['career_key']
+    exclude = ['sketch']
+    readonly_fields = ['quiz', 'career_key', 'count', 'updated_at']
+
+@admin.register(SearchQueryRollup)
+class SearchQueryRollupAdmin(admin.ModelAdmin):
+    list_display = ['day', 'query', 'searches', 'zero_results']
+    search_fields = ['query']
+    date_hierarchy = 'day'
+    readonly_fields = ['day', 'query', 'searches', 'zero_results']
+
+@admin.register(SearchVolumeRollup)
+class SearchVolumeRollupAdmin(admin.ModelAdmin):
+    list_display = ['hour', 'searches', 'zero_results']
+    date_hierarchy = 'hour'
+    readonly_fields = ['hour', 'searches', 'zero_results']
+
+@admin.register(EngagementHourly)
+class EngagementHourlyAdmin(admin.ModelAdmin):
+    list_display = ['hour', 'content_type', 'object_id', 'view_count', 'download_count', 'application_count']
+    list_filter = ['content_type']
+    date_hierarchy = 'hour'
+    readonly_fields = ['content_type', 'object_id', 'hour', 'view_count', 'download_count', 'application_count']
+
+@admin.register(EngagementDaily)
+class EngagementDailyAdmin(admin.ModelAdmin):
+    list_display = ['day', 'content_type', 'object_id', 'view_count', 'download_count', 'application_count']
+    list_filter = ['content_type']
+    date_hierarchy = 'day'
+    readonly_fields = ['content_type', 'object_id', 'day', 'view_count', 'download_count', 'application_count']
+
+@admin.register(TrendingItem)
+class TrendingItemAdmin(admin.ModelAdmin):
+    list_display = ['list_name', 'rank', 'content_type', 'object_id', 'score', 'computed_at']
+    list_filter = ['list_name']
+    readonly_fields = ['list_name', 'rank', 'content_type', 'object_id', 'score', 'computed_at']
+
 @admin.register(Scholarship)
-class ScholarshipAdmin(admin.ModelAdmin):
-    list_display = ['title', 'amount', 'scholarship_type', 'education_level', 'application_deadline', 'provider_name', 'application_count', 'is_active']
+class ScholarshipAdmin(ContentStatsMixin, admin.ModelAdmin):
+    list_display = ['title', 'amount', 'scholarship_type', 'education_level', 'application_deadline', 'provider_name', 'application_count', 'unique_visitors', 'is_active']
     list_filter = ['scholarship_type', 'education_level', 'is_active', 'application_deadline']
     search_fields = ['title', 'provider_name', 'field_of_study', 'description']
     ordering = ['-application_deadline']
@@ -257,11 +328,11 @@ class ScholarshipAdmin(admin.ModelAdmin):
     mark_as_inactive.short_description = "Mark selected scholarships as inactive"
 
 @admin.register(College)
-class CollegeAdmin(admin.ModelAdmin):
-    list_display = ['name', 'location', 'college_type', 'ranking', 'established_year', 'view_count', 'is_featured']
+class CollegeAdmin(ContentStatsMixin, admin.ModelAdmin):
+    list_display = ['name', 'location', 'college_type', 'ranking', 'established_year', 'view_count', 'unique_visitors', 'is_featured']
     list_filter = ['college_type', 'ranking', 'country', 'is_featured', 'established_year']
     search_fields = ['name', 'location', 'state', 'popular_programs']
-    ordering = ['-view_count', 'name']
+    ordering = ['-stats__view_count', 'name']
     
     fieldsets = (
         ('Basic Information', {
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class ResourcesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'resources'
-    verbose_name = 'Resources Management'
\ No newline at end of file
+    verbose_name = 'Resources Management'
+    
+    def ready(self):
+        import resources.signals
\ No newline at end of file
@@ -0,0 +1,301 @@
+"""Synthetic search corpus, query workload and latency/recall harness.
+
+generate_corpus() bulk-loads reproducible videos, PDFs and articles whose
+text is drawn from a Zipf-distributed vocabulary. For every workload query
+it plants a rare two-word phrase in the titles of a few items (the
+relevant ones) and in the body text of many more (matches that should rank
+below them), so recall@10 measures ranking and not just matching.
+
+run_workload() replays the queries through the search endpoints and
+reports latency percentiles, database queries per request and recall@10.
+"""
+import random
+import time
+from contextlib import contextmanager, nullcontext
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from . import search as search_module, spelling
+from .caching import bump_generation
+from .models import Tag, Video, PDFResource, Article
+from .query_analytics import recording_paused
+from .search import SEARCH_GENERATIONS, SEARCH_MODELS, SEARCH_TYPES, rebuild_index
+from .suggest import SUGGEST_GENERATION
+
+# Generated rows carry this text in a field the app never searches, so a
+# corpus can be found and removed again
+CORPUS_MARKER = 'Synthetic search benchmark content'
+MARKER_FIELDS = {
+    Video: 'ai_generated_summary',
+    PDFResource: 'ai_generated_summary',
+    Article: 'ai_enhanced_content',
+}
+
+# Share of the corpus per model
+CORPUS_SHARES = {Video: 0.35, PDFResource: 0.25, Article: 0.4}
+
+# The file every generated PDF points at; serializing a PDF reads its size,
+# so it lives in the media storage until the corpus is cleared
+CORPUS_PDF = 'pdfs/benchmark_corpus.pdf'
+BATCH_SIZE = 5000
+
+CAREER_WORDS = (
+    'career engineering medical science commerce arts design software data doctor '
+    'engineer teacher lawyer exam entrance college university course degree skills '
+    'interview scholarship guidance student parents future jobs salary research '
+    'management finance biology physics chemistry mathematics computer coding'
+).split()
+TAG_NAMES = [
+    'Engineering', 'Medical', 'Commerce', 'Arts', 'Design', 'Software', 'Data Science',
+    'Law', 'Teaching', 'Entrance Exams', 'Scholarships', 'Study Abroad', 'Interviews',
+    'Parents', 'Class 10', 'Class 12', 'Government Jobs', 'Research', 'Finance', 'Sports',
+]
+
+FILLER_SYLLABLES = ['ka', 'ri', 'mo', 'ten', 'sa', 'lu', 'vi', 'pen', 'do', 'ra', 'ni', 'gol']
+TOPIC_SYLLABLES = ['zor', 'quex', 'blim', 'trav', 'juk', 'frod', 'skel', 'wyn', 'plox', 'drum']
+
+def parse_size(value):
+    """'10k', '100k', '1m' or a plain number of rows"""
+    value = value.strip().lower()
+    multiplier = {'k': 1000, 'm': 1000000}.get(value[-1:], 1)
+    number = value[:-1] if multiplier > 1 else value
+    return int(float(number) * multiplier)
+
+def pseudo_words(rng, syllables, count, lengths=(2, 3)):
+    words, seen = [], set()
+    while len(words) < count:
+        word = ''.join(rng.choice(syllables) for _ in range(rng.choice(lengths)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+class TextSource:
+    """Zipf-distributed filler text"""
+
+    def __init__(self, rng, vocabulary_size=20000):
+        self.rng = rng
+        self.words = CAREER_WORDS + pseudo_words(rng, FILLER_SYLLABLES, vocabulary_size, (2, 3, 4))
+        total, self.cum_weights = 0.0, []
+        for rank in range(1, len(self.words) + 1):
+            total += 1.0 / rank
+            self.cum_weights.append(total)
+
+    def words_between(self, low, high):
+        return self.rng.choices(self.words, cum_weights=self.cum_weights, k=self.rng.randint(low, high))
+
+    def text(self, low, high, phrase=None):
+        words = self.words_between(low, high)
+        if phrase:
+            words.insert(self.rng.randint(0, len(words)), phrase)
+        return ' '.join(words)
+
+def plan_workload(rng, counts, query_count):
+    """Pick the phrase, relevant items and body-text matches of every query.
+
+    Returns (queries, plants) where plants maps (model, row index) to a list
+    of (phrase, in_title) pairs.
+    """
+    topic_words = pseudo_words(rng, TOPIC_SYLLABLES, query_count * 2, (2, 3))
+    slots = [(model, count) for model, count in counts.items() if count]
+    weights = [count for _, count in slots]
+    queries, plants = [], {}
+
+    def pick():
+        model, count = rng.choices(slots, weights=weights)[0]
+        return model, rng.randrange(count)
+
+    for number in range(query_count):
+        phrase = f'{topic_words[2 * number]} {topic_words[2 * number + 1]}'
+        relevant = {pick() for _ in range(rng.randint(1, 6))}
+        matches = {pick() for _ in range(rng.randint(10, 40))} - relevant
+        for slot in relevant:
+            plants.setdefault(slot, []).append((phrase, True))
+        for slot in matches:
+            plants.setdefault(slot, []).append((phrase, False))
+
+        text, variant = phrase, rng.random()
+        if variant < 0.25 and len(phrase.split()[-1]) >= 6:
+            # Partially typed last word, matched as a prefix
+            text = phrase[:-rng.randint(1, 2)]
+        elif variant < 0.4:
+            # Two swapped letters in the first word, left to spelling correction
+            position = rng.randrange(1, len(phrase.split()[0]) - 1)
+            text = phrase[:position] + phrase[position + 1] + phrase[position] + phrase[position + 2:]
+        queries.append({'q': text, 'relevant': sorted(relevant, key=lambda slot: (slot[0].__name__, slot[1]))})
+    return queries, plants
+
+def build_item(model, rng, text, phrases):
+    title_phrases = [phrase for phrase, in_title in phrases if in_title]
+    body_phrases = [phrase for phrase, in_title in phrases if not in_title]
+    fields = {
+        'title': text.text(3, 8, ' '.join(title_phrases)),
+        'description': text.text(15, 35, None if model is Article else ' '.join(body_phrases)),
+        'category': rng.choice(model.CATEGORY_CHOICES)[0],
+        'is_parent_content': rng.random() < 0.15,
+        'is_featured': rng.random() < 0.05,
+        MARKER_FIELDS[model]: CORPUS_MARKER,
+    }
+    if model is Video:
+        fields['youtube_url'] = f'https://www.youtube.com/watch?v={rng.getrandbits(48):012x}'
+    elif model is PDFResource:
+        fields.update(file=CORPUS_PDF, pages=str(rng.randint(2, 80)), file_size='1.0 KB')
+    else:
+        fields.update(content=text.text(80, 200, ' '.join(body_phrases)), is_published=rng.random() < 0.95)
+    return model(**fields)
+
+def generate_corpus(size, seed=0, query_count=200, log=print):
+    """Bulk-load a corpus of about `size` items and return its workload"""
+    rng = random.Random(seed)
+    text = TextSource(rng)
+    counts = {model: int(size * share) for model, share in CORPUS_SHARES.items()}
+    queries, plants = plan_workload(rng, counts, query_count)
+    tags = [Tag.objects.get_or_create(name=name)[0].pk for name in TAG_NAMES]
+    if not default_storage.exists(CORPUS_PDF):
+        default_storage.save(CORPUS_PDF, ContentFile(b'%PDF-1.4\n%%EOF\n'))
+
+    type_keys = {model: key for key, model in SEARCH_MODELS.items()}
+    pks, unpublished = {}, set()
+    with transaction.atomic():
+        for model, count in counts.items():
+            field = model._meta.get_field('tags')
+            Link = field.remote_field.through
+            owner, target = f'{field.m2m_field_name()}_id', f'{field.m2m_reverse_field_name()}_id'
+            for start in range(0, count, BATCH_SIZE):
+                rows = range(start, min(start + BATCH_SIZE, count))
+                objects = model.objects.bulk_create(
+                    [build_item(model, rng, text, plants.get((model, index), [])) for index in rows]
+                )
+                Link.objects.bulk_create([
+                    Link(**{owner: obj.pk, target: tag})
+                    for obj in objects for tag in rng.sample(tags, rng.randint(0, 3))
+                ])
+                for index, obj in zip(rows, objects):
+                    pks[(model, index)] = obj.pk
+                    if model is Article and not obj.is_published:
+                        unpublished.add((model, index))
+                log(f'{model._meta.verbose_name_plural}: {rows.stop}/{count}')
+
+        # Bulk inserts skip the signals, so the index and caches are refreshed here
+        rebuild_index()
+        transaction.on_commit(invalidate_search_caches)
+
+    return {
+        'seed': seed,
+        'size': sum(counts.values()),
+        'queries': [
+            {
+                'q': query['q'],
+                # Unpublished articles can't be found, so they don't count
+                'relevant': [
+                    [type_keys[slot[0]], pks[slot]]
+                    for slot in query['relevant'] if slot not in unpublished
+                ],
+            }
+            for query in queries
+        ],
+    }
+
+def invalidate_search_caches():
+    for name in SEARCH_GENERATIONS.values():
+        bump_generation(name)
+    bump_generation(SUGGEST_GENERATION)
+
+def clear_corpus():
+    """Delete every generated item, returning how many were removed.
+
+    Deleting through the ORM would fire the per-row search and typeahead
+    signals, so the rows are removed with plain DELETEs and the index is
+    rebuilt once afterwards. The shared PDF file goes once they are gone.
+    """
+    removed = 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        for model, marker_field in MARKER_FIELDS.items():
+            field = model._meta.get_field('tags')
+            table = model._meta.db_table
+            cursor.execute(
+                f'DELETE FROM {field.remote_field.through._meta.db_table} '
+                f'WHERE {field.m2m_column_name()} IN (SELECT id FROM {table} WHERE {marker_field} = %s)',
+                [CORPUS_MARKER]
+            )
+            cursor.execute(f'DELETE FROM {table} WHERE {marker_field} = %s', [CORPUS_MARKER])
+            removed += cursor.rowcount
+        rebuild_index()
+        transaction.on_commit(invalidate_search_caches)
+        transaction.on_commit(lambda: default_storage.delete(CORPUS_PDF))
+    return removed
+
+@contextmanager
+def substring_search():
+    """Run the search endpoint as it behaves on databases without FTS5"""
+    available = search_module._available
+    search_module._available = False
+    try:
+        yield
+    finally:
+        search_module._available = available
+
+# name -> (endpoint, context manager that selects the engine)
+ENGINES = {
+    'fts': ('/api/search/', nullcontext),
+    'substring': ('/api/search/', substring_search),
+    'semantic': ('/api/search/semantic/', nullcontext),
+}
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+def run_workload(workload, engine, repeat=1, cached=False, k=10):
+    """Replay the workload through one engine and summarize the results.
+
+    Recall@k counts the relevant items among the first k results of each
+    type, which is what the search page shows. Unless cached is set the
+    response cache is cleared before every request, so each one does the
+    full search. The synthetic queries are kept out of the search analytics.
+    The spelling dictionary is built up front, so misspelled queries don't
+    depend on how far the background build has got.
+    """
+    from .views import search_cache
+
+    endpoint, engine_context = ENGINES[engine]
+    client = APIClient()
+    spelling.rebuild()
+    latencies, query_counts, recalls, errors = [], [], [], 0
+    with engine_context(), recording_paused():
+        search_cache.clear()
+        for _ in range(repeat):
+            for query in workload['queries']:
+                if not cached:
+                    search_cache.clear()
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    response = client.get(endpoint, {'q': query['q']})
+                    latencies.append((time.perf_counter() - started) * 1000)
+                query_counts.append(len(queries))
+                if response.status_code != 200:
+                    errors += 1
+                    continue
+
+                found = {
+                    (content_type, item['id'])
+                    for content_type in SEARCH_TYPES
+                    for item in response.data.get(content_type, [])[:k]
+                }
+                relevant = {tuple(item) for item in query['relevant']}
+                if relevant:
+                    recalls.append(len(relevant & found) / len(relevant))
+
+    return {
+        'engine': engine,
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': percentile(latencies, 0.50),
+        'p95_ms': percentile(latencies, 0.95),
+        'p99_ms': percentile(latencies, 0.99),
+        'queries_per_request': sum(query_counts) / len(query_counts),
+        f'recall@{k}': sum(recalls) / len(recalls) if recalls else None,
+    }
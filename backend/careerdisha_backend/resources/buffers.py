@@ -0,0 +1,115 @@
+import atexit
+import logging
+import threading
+import time
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+_buffers = []
+
+class FlushBuffer:
+    """Collect items in memory and hand them to a flush function in batches.
+
+    Items are flushed from a background thread every `interval` seconds, as
+    soon as `max_size` items are waiting, and once more at interpreter exit.
+    Each worker process keeps its own buffer, so a crash can lose at most
+    one interval's worth of items. Reports built from the flushed tables
+    call the owning module's flush_pending() first, so they include this
+    worker's own items that haven't been flushed yet.
+
+    Subclasses can accumulate into something other than a list by
+    overriding _put, _take, _restore and __len__, and do periodic
+    background work of their own by overriding _after_flush.
+    """
+
+    def __init__(self, flush, interval=10, max_size=1000, name=None):
+        self._flush = flush
+        self.interval = interval
+        self.max_size = max_size
+        self.name = name or getattr(flush, '__name__', 'buffer')
+        self._items = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        _buffers.append(self)
+        atexit.register(self.flush)
+
+    def __len__(self):
+        return len(self._items)
+
+    def _put(self, item):
+        """Store one item (called with the lock held); returns how many are pending"""
+        self._items.append(item)
+        return len(self._items)
+
+    def _take(self):
+        """Detach everything pending (called with the lock held)"""
+        items, self._items = self._items, []
+        return items
+
+    def _restore(self, items):
+        """Put back a batch whose flush failed (called with the lock held)"""
+        self._items[:0] = items
+
+    def _after_flush(self):
+        """Hook run by the background thread after every scheduled flush, even an empty one"""
+
+    def _start(self):
+        """Start the background flusher on first use (called with the lock held)"""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name=f'flush-{self.name}', daemon=True
+            )
+            self._thread.start()
+
+    def add(self, item):
+        with self._lock:
+            pending = self._put(item)
+            self._start()
+        if pending >= self.max_size:
+            self._wakeup.set()
+
+    def wake(self):
+        """Have the background thread run now instead of at the end of its interval"""
+        with self._lock:
+            self._start()
+        self._wakeup.set()
+
+    def flush(self):
+        """Flush whatever is buffered right now; safe to call from any thread"""
+        with self._flush_lock:
+            with self._lock:
+                items = self._take()
+            if not items:
+                return
+            try:
+                self._flush(items)
+            except Exception:
+                # Put the batch back so the next flush retries it
+                logger.exception('Flushing %d buffered %s items failed', len(items), self.name)
+                with self._lock:
+                    self._restore(items)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            started = time.monotonic()
+            self.flush()
+            try:
+                self._after_flush()
+            except Exception:
+                logger.exception('Background work after flushing %s failed', self.name)
+            # There is no request cycle in this thread to recycle its connection
+            close_old_connections()
+            # Don't spin if flushes keep failing while the buffer is full
+            if len(self) >= self.max_size:
+                time.sleep(max(0, 1 - (time.monotonic() - started)))
+
+def flush_all():
+    """Flush every buffer created in this process; returns their names"""
+    for buffer in _buffers:
+        buffer.flush()
+    return [buffer.name for buffer in _buffers]
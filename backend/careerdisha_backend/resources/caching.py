@@ -0,0 +1,122 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from django.core.cache import cache
+
+GENERATION_KEY = 'resources:generation:{}'
+
+def get_generation(name):
+    """Return the current generation token for a named group of cached data.
+
+    Tokens live in Django's cache so that every worker sharing the cache
+    backend sees an edit made in any one of them. A missing token (first
+    use, eviction or cache restart) is replaced by a fresh one, which only
+    ever forces a rebuild and never serves stale data.
+    """
+    key = GENERATION_KEY.format(name)
+    token = cache.get(key)
+    if token is None:
+        token = uuid.uuid4().hex
+        if not cache.add(key, token, timeout=None):
+            token = cache.get(key, token)
+    return token
+
+def bump_generation(name):
+    """Invalidate everything cached under the given generation name, returning the new token"""
+    token = uuid.uuid4().hex
+    cache.set(GENERATION_KEY.format(name), token, timeout=None)
+    return token
+
+class GenerationCache:
+    """Per-process cache of builder(*args) results that empties when a generation changes.
+
+    Each value is built at most once per generation and arguments and then
+    shared between threads, so it must not be mutated. A value built while
+    the generation moved on is returned but not kept, and None results
+    (nothing to build) are never cached.
+    """
+
+    def __init__(self, name, builder):
+        self.name = name
+        self.builder = builder
+        self._values = {}
+        self._generation = None
+        self._lock = threading.Lock()
+
+    def __call__(self, *args):
+        generation = get_generation(self.name)
+        if generation != self._generation:
+            with self._lock:
+                if generation != self._generation:
+                    self._values.clear()
+                    self._generation = generation
+
+        value = self._values.get(args)
+        if value is None:
+            value = self.builder(*args)
+            if value is not None:
+                with self._lock:
+                    if self._generation == generation:
+                        self._values[args] = value
+        return value
+
+def generation_cached(name, builder):
+    """Wrap builder in a GenerationCache invalidated by bump_generation(name)"""
+    return GenerationCache(name, builder)
+
+class LRUCache:
+    """Thread-safe in-process LRU cache whose entries also expire after ttl seconds.
+
+    Keeps hit, miss, eviction and expiry counters so the size and TTL can
+    be tuned from real traffic.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
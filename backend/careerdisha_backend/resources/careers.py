@@ -0,0 +1,41 @@
+from types import MappingProxyType
+from .caching import generation_cached
+from .models import Career
+
+CAREER_GENERATION = 'careers'
+
+class CareerCatalog:
+    """Immutable snapshot of the Career table keyed by career key"""
+
+    def __init__(self, careers):
+        self.entries = MappingProxyType({
+            career.key: MappingProxyType({
+                'name': career.name,
+                'description': career.description,
+                'avg_salary': career.avg_salary,
+                'growth_outlook': career.growth_outlook,
+                'required_skills': tuple(career.required_skills),
+                'education': career.education,
+            })
+            for career in careers
+        })
+
+    def get(self, key):
+        """Return the entry for key, or a generic description for unknown careers"""
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = {
+                'name': key.replace('_', ' ').title(),
+                'description': 'A promising career option based on your interests and skills.',
+                'avg_salary': 'Varies by location and experience',
+                'growth_outlook': 'Positive outlook expected',
+                'required_skills': ('Relevant technical skills', 'Communication', 'Problem-solving'),
+                'education': 'Appropriate degree or certification required'
+            }
+        return entry
+
+_catalog = generation_cached(CAREER_GENERATION, lambda: CareerCatalog(Career.objects.all()))
+
+def get_career_catalog():
+    """Return the process-wide catalog, reloading it after the Career table changes"""
+    return _catalog()
@@ -0,0 +1,123 @@
+"""Engagement over time from the hourly and daily rollup tables.
+
+Counter flushes add every view, download and application to its item's
+EngagementHourly bucket. Hourly rows are kept for HOURLY_RETENTION_DAYS;
+older ones are folded into EngagementDaily, so the hourly table never holds
+more than about a week of buckets and "views this week" or a 90-day series
+reads a bounded number of rows however much traffic there was.
+"""
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, time as day_start, timedelta
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from .models import COUNTER_FIELDS, Article, College, EngagementDaily, EngagementHourly, PDFResource, Scholarship, Video
+
+logger = logging.getLogger(__name__)
+
+HOURLY_RETENTION_DAYS = 7
+COMPACT_INTERVAL = 3600  # seconds between automatic compactions in a worker
+
+# API type -> (model, the counter its items are ranked by)
+ENGAGEMENT_TYPES = {
+    'videos': (Video, 'view_count'),
+    'articles': (Article, 'view_count'),
+    'pdfs': (PDFResource, 'download_count'),
+    'scholarships': (Scholarship, 'application_count'),
+    'colleges': (College, 'view_count'),
+}
+
+def upsert_counts(table, key_columns, deltas):
+    """Add [views, downloads, applications] deltas to the rows of table identified by key_columns"""
+    if not deltas:
+        return
+    qn = connection.ops.quote_name
+    table = qn(table)
+    keys = ', '.join(qn(column) for column in key_columns)
+    sql = (
+        f'INSERT INTO {table} ({keys}, {", ".join(qn(field) for field in COUNTER_FIELDS)}) '
+        f'VALUES ({", ".join(["%s"] * (len(key_columns) + len(COUNTER_FIELDS)))}) '
+        f'ON CONFLICT ({keys}) DO UPDATE SET '
+        + ', '.join(f'{qn(field)} = {table}.{qn(field)} + excluded.{qn(field)}' for field in COUNTER_FIELDS)
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, [(*key, *counts) for key, counts in deltas.items()])
+
+def start_of(day):
+    return timezone.make_aware(datetime.combine(day, day_start.min))
+
+def compact(today=None):
+    """Fold hourly buckets of days past the retention window into daily ones; returns hours compacted"""
+    cutoff = start_of((today or timezone.localdate()) - timedelta(days=HOURLY_RETENTION_DAYS))
+    with transaction.atomic():
+        # Lock the rows first so two workers compacting at once can't both count them
+        pks = list(EngagementHourly.objects.filter(hour__lt=cutoff).select_for_update().values_list('pk', flat=True))
+        if not pks:
+            return 0
+        old = EngagementHourly.objects.filter(hour__lt=cutoff)
+        rows = (
+            old.annotate(day=TruncDate('hour'))
+            .values('content_type_id', 'object_id', 'day')
+            .annotate(**{f'total_{field}': Sum(field) for field in COUNTER_FIELDS})
+        )
+        upsert_counts(EngagementDaily._meta.db_table, ('content_type_id', 'object_id', 'day'), {
+            (row['content_type_id'], row['object_id'], connection.ops.adapt_datefield_value(row['day'])):
+                [row[f'total_{field}'] for field in COUNTER_FIELDS]
+            for row in rows
+        })
+        return old.delete()[0]
+
+_last_compaction = None
+
+def compact_if_due():
+    """Compact at most once per COMPACT_INTERVAL; called after each counter flush"""
+    global _last_compaction
+
+    now = time.monotonic()
+    if _last_compaction is not None and now - _last_compaction < COMPACT_INTERVAL:
+        return
+    _last_compaction = now
+    try:
+        compact()
+    except Exception:
+        # The flushed counts are already committed; retry at the next interval
+        logger.exception('Compacting hourly engagement failed')
+
+def bucket_counts(model, since, object_id=None):
+    """Daily rows from since on, plus the hourly rows not compacted yet, as two querysets"""
+    content_type = ContentType.objects.get_for_model(model)
+    daily = EngagementDaily.objects.filter(content_type=content_type, day__gte=since)
+    hourly = EngagementHourly.objects.filter(content_type=content_type, hour__gte=start_of(since))
+    if object_id is not None:
+        daily, hourly = daily.filter(object_id=object_id), hourly.filter(object_id=object_id)
+    return daily, hourly
+
+def summed(queryset, *group_by):
+    return queryset.values(*group_by).annotate(**{f'total_{field}': Sum(field) for field in COUNTER_FIELDS})
+
+def top_items(model, ranked_by, since, limit=20):
+    """(pk, counts) of the items with the highest ranked_by count since a day"""
+    totals = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+    for queryset in bucket_counts(model, since):
+        for row in summed(queryset, 'object_id'):
+            for field in COUNTER_FIELDS:
+                totals[row['object_id']][field] += row[f'total_{field}']
+    return sorted(totals.items(), key=lambda pair: (-pair[1][ranked_by], pair[0]))[:limit]
+
+def item_series(model, object_id, since, interval='day'):
+    """Per-day (or, within the retention window, per-hour) counts of one item since a day"""
+    daily, hourly = bucket_counts(model, since, object_id)
+    series = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+    if interval == 'day':
+        rows = [(row['day'], row) for row in summed(daily, 'day')]
+        rows += [(row['period'], row) for row in summed(hourly.annotate(period=TruncDate('hour')), 'period')]
+    else:
+        rows = [(row['hour'], row) for row in summed(hourly, 'hour')]
+    for period, row in rows:
+        for field in COUNTER_FIELDS:
+            series[period][field] += row[f'total_{field}']
+    return sorted(series.items(), reverse=True)
@@ -0,0 +1,46 @@
+"""Facet counts for filter chips, derived from one grouped aggregate.
+
+Callers fetch counts grouped by every facet field at once, without the
+facet filters applied, and count_facets() folds those rows into
+per-field counts. Each field is counted under all the *other* active
+filters, so a chip shows how many results selecting it would give.
+"""
+from django.db.models import Count
+
+FACET_FIELDS = ('category', 'is_parent_content', 'is_featured')
+
+def count_facets(rows, filters, fields=FACET_FIELDS):
+    """Fold (values dict, count) rows into {field: [{'value': ..., 'count': ...}]}.
+
+    filters maps the active facet fields to their selected values.
+    """
+    counts = {field: {} for field in fields}
+    for values, count in rows:
+        failing = [field for field, value in filters.items() if values[field] != value]
+        if len(failing) > 1:
+            continue
+        for field in fields:
+            # A row counts for a field if it passes every filter but that field's own
+            if not failing or failing == [field]:
+                counts[field][values[field]] = counts[field].get(values[field], 0) + count
+    return {
+        field: [
+            {'value': value, 'count': count}
+            for value, count in sorted(field_counts.items(), key=lambda item: (-item[1], str(item[0])))
+        ]
+        for field, field_counts in counts.items()
+    }
+
+def matching_total(rows, filters):
+    """Number of items in the grouped rows that pass every active filter"""
+    return sum(
+        count for values, count in rows
+        if all(values[field] == value for field, value in filters.items())
+    )
+
+def grouped_rows(queryset, fields=FACET_FIELDS):
+    """Run the single grouped aggregate for a queryset"""
+    return [
+        ({field: row[field] for field in fields}, row['facet_count'])
+        for row in queryset.order_by().values(*fields).annotate(facet_count=Count('pk'))
+    ]
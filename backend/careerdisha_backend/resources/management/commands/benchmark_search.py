@@ -0,0 +1,40 @@
+import json
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from resources.benchmark import ENGINES, run_workload
+
+class Command(BaseCommand):
+    help = 'Replay a search workload and report p50/p95/p99 latency, queries per request and recall@10'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workload', default='search_workload.json', help='Workload written by generate_search_corpus')
+        parser.add_argument(
+            '--engine', action='append', choices=sorted(ENGINES),
+            help='Engine to benchmark; repeat for several (default: all)'
+        )
+        parser.add_argument('--repeat', type=int, default=1, help='Times to replay the workload')
+        parser.add_argument('--cached', action='store_true', help='Keep the search response cache between requests')
+        parser.add_argument('--output', help='Also write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        try:
+            workload = json.loads(Path(options['workload']).read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read {options['workload']}: {e}")
+
+        results = [
+            run_workload(workload, engine, options['repeat'], options['cached'])
+            for engine in options['engine'] or sorted(ENGINES)
+        ]
+
+        self.stdout.write(f"{workload['size']} items, {len(workload['queries'])} queries")
+        self.stdout.write(f"{'engine':<12}{'requests':>9}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}{'recall@10':>11}")
+        for result in results:
+            recall = result['recall@10']
+            self.stdout.write(
+                f"{result['engine']:<12}{result['requests']:>9}{result['errors']:>8}{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}"
+                f"{result['p99_ms']:>9.2f}{result['queries_per_request']:>9.1f}"
+                f"{'n/a' if recall is None else f'{recall:.3f}':>11}"
+            )
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(results, indent=2), encoding='utf-8')
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from resources.semantic import build_index
+
+class Command(BaseCommand):
+    help = 'Embed all videos, PDFs and articles for /api/search/semantic/ (run periodically, e.g. from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for fitting the projection and the lists')
+
+    def handle(self, *args, **options):
+        summary = build_index(options['seed'], log=self.stdout.write)
+        if summary is None:
+            self.stdout.write('No documents to index')
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Published {summary['build']}: {summary['documents']} documents, {summary['dimensions']} dimensions, "
+            f"{summary['lists']} lists in {summary['seconds']}s"
+        ))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from resources.engagement import HOURLY_RETENTION_DAYS, compact
+
+class Command(BaseCommand):
+    help = (
+        f'Fold hourly engagement buckets older than {HOURLY_RETENTION_DAYS} days into daily ones. '
+        'Workers also do this hourly after flushing their counters; run it from cron on idle sites'
+    )
+
+    def handle(self, *args, **options):
+        compacted = compact()
+        self.stdout.write(self.style.SUCCESS(f'Compacted {compacted} hourly buckets'))
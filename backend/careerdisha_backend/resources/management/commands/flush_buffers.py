@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+# Imported for their module-level buffers
+from accounts import analytics  # noqa: F401
+from resources import counters, percentiles, query_analytics, visitors  # noqa: F401
+from resources.buffers import flush_all
+
+class Command(BaseCommand):
+    help = (
+        'Write out the buffered view counters, visitor sketches, search analytics, score sketches and career trends of this process. '
+        'Buffers are also flushed at interpreter exit; call this from in-process shutdown hooks '
+        '(e.g. call_command("flush_buffers") in a server\'s worker-exit hook) to drain them explicitly'
+    )
+
+    def handle(self, *args, **options):
+        names = flush_all()
+        self.stdout.write(self.style.SUCCESS(f"Flushed {len(names)} buffers: {', '.join(names)}"))
@@ -0,0 +1,35 @@
+import json
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from resources.benchmark import CORPUS_MARKER, MARKER_FIELDS, clear_corpus, generate_corpus, parse_size
+
+class Command(BaseCommand):
+    help = 'Load a reproducible synthetic video/PDF/article corpus and write its search benchmark workload'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', default='10k', help='Number of items, e.g. 10k, 100k or 1m (default: 10k)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; the same seed and size give the same corpus')
+        parser.add_argument('--queries', type=int, default=200, help='Number of workload queries (default: 200)')
+        parser.add_argument('--workload', default='search_workload.json', help='Where to write the workload file')
+        parser.add_argument('--clear', action='store_true', help='Remove a previously generated corpus first')
+        parser.add_argument('--remove', action='store_true', help='Only remove a previously generated corpus and its PDF file')
+
+    def handle(self, *args, **options):
+        try:
+            size = parse_size(options['size'])
+        except ValueError:
+            raise CommandError(f"Invalid size: {options['size']}")
+
+        if options['clear'] or options['remove']:
+            self.stdout.write(f'Removed {clear_corpus()} generated items')
+            if options['remove']:
+                return
+        elif any(model.objects.filter(**{field: CORPUS_MARKER}).exists() for model, field in MARKER_FIELDS.items()):
+            raise CommandError('A generated corpus is already loaded; pass --clear to replace it')
+
+        workload = generate_corpus(size, options['seed'], options['queries'], log=self.stdout.write)
+        path = Path(options['workload'])
+        path.write_text(json.dumps(workload, indent=2), encoding='utf-8')
+        self.stdout.write(self.style.SUCCESS(
+            f"Loaded {workload['size']} items; wrote {len(workload['queries'])} queries to {path}"
+        ))
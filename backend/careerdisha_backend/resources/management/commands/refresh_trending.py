@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from resources.trending import refresh
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the /api/trending/ lists from the decayed trending scores. '
+        'Workers also do this every few minutes after flushing their counters'
+    )
+
+    def handle(self, *args, **options):
+        sizes = refresh()
+        self.stdout.write(self.style.SUCCESS(
+            'Rebuilt trending lists: ' + ', '.join(f'{name} ({size})' for name, size in sizes.items())
+        ))
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0002_college_scholarship'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Career',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.SlugField(help_text='Key used in QuizAnswer.career_weight', max_length=100, unique=True)),
+                ('name', models.CharField(max_length=200)),
+                ('category', models.CharField(blank=True, choices=[('technology', 'Technology & Engineering'), ('healthcare', 'Healthcare & Medical'), ('business', 'Business & Finance'), ('creative', 'Creative & Arts'), ('education', 'Education & Research'), ('social', 'Social Services & Law')], max_length=50)),
+                ('description', models.TextField()),
+                ('avg_salary', models.CharField(blank=True, max_length=100)),
+                ('growth_outlook', models.CharField(blank=True, max_length=100)),
+                ('required_skills', models.JSONField(default=list, help_text='List of key skills')),
+                ('education', models.CharField(blank=True, max_length=200)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0003_career'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='careerquiz',
+            name='definition_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='careerquiz',
+            name='key',
+            field=models.SlugField(blank=True, help_text='Identifier of the quiz definition file', max_length=100, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='careerquiz',
+            name='version',
+            field=models.PositiveIntegerField(default=1, help_text='Incremented whenever the loaded definition changes'),
+        ),
+    ]
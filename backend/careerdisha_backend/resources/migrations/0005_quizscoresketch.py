@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0004_careerquiz_versioning'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizScoreSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('career_key', models.CharField(max_length=100)),
+                ('count', models.PositiveIntegerField(default=0, help_text='Submissions summarized by the sketch')),
+                ('sketch', models.JSONField(default=dict, help_text='Serialized resources.sketches.KLLSketch')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_sketches', to='resources.careerquiz')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='quizscoresketch',
+            constraint=models.UniqueConstraint(fields=('quiz', 'career_key'), name='quizscoresketch_quiz_career'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations
+
+# Keep in sync with resources.search: rowid = object_id * 4 + kind
+CREATE_INDEX = [
+    "CREATE VIRTUAL TABLE resources_search_index USING fts5("
+    "title, description, tags, content, tokenize='unicode61 remove_diacritics 2')",
+    "INSERT INTO resources_search_index (rowid, title, description, tags, content) "
+    "SELECT id * 4 + 1, title, description, tags, '' FROM resources_video",
+    "INSERT INTO resources_search_index (rowid, title, description, tags, content) "
+    "SELECT id * 4 + 2, title, description, tags, '' FROM resources_pdfresource",
+    "INSERT INTO resources_search_index (rowid, title, description, tags, content) "
+    "SELECT id * 4 + 3, title, description, tags, content FROM resources_article WHERE is_published",
+]
+
+
+def create_search_index(apps, schema_editor):
+    """Build the FTS5 index; other databases keep using substring search"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in CREATE_INDEX:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS resources_search_index')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0005_quizscoresketch'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,104 @@
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+def unique_slug(name, taken):
+    base = slugify(name, allow_unicode=True)[:100] or 'tag'
+    slug, number = base, 1
+    while slug in taken:
+        number += 1
+        suffix = f'-{number}'
+        slug = base[:100 - len(suffix)] + suffix
+    return slug
+
+
+def split_tag_strings(apps, schema_editor):
+    """Turn the comma-separated tag strings into Tag rows and links.
+
+    Names are matched case-insensitively; names whose slugs collide ("C"
+    and "C++", "Data-Science" and "Data Science") stay separate tags with
+    numbered slugs.
+    """
+    Tag = apps.get_model('resources', 'Tag')
+    tags, slugs = {}, set()
+
+    for model_name in ['Video', 'PDFResource', 'Article']:
+        model = apps.get_model('resources', model_name)
+        through = model.tags.through
+        owner_field = model._meta.get_field('tags').m2m_field_name() + '_id'
+        links = set()
+
+        for pk, tag_string in model.objects.exclude(legacy_tags='').values_list('pk', 'legacy_tags').iterator():
+            for name in tag_string.split(','):
+                name = name.strip()[:100]
+                if not name:
+                    continue
+                key = name.casefold()
+                if key not in tags:
+                    slug = unique_slug(name, slugs)
+                    slugs.add(slug)
+                    tags[key] = Tag.objects.create(name=name, slug=slug)
+                links.add((pk, tags[key].pk))
+
+        through.objects.bulk_create(
+            [through(**{owner_field: pk, 'tag_id': tag_id}) for pk, tag_id in links],
+            batch_size=1000
+        )
+
+
+def join_tag_strings(apps, schema_editor):
+    """Write each item's tags back as a comma-separated string"""
+    for model_name in ['Video', 'PDFResource', 'Article']:
+        model = apps.get_model('resources', model_name)
+        through = model.tags.through
+        owner_field = model._meta.get_field('tags').m2m_field_name() + '_id'
+        names = {}
+        for pk, name in through.objects.order_by('tag__name').values_list(owner_field, 'tag__name').iterator():
+            names.setdefault(pk, []).append(name)
+        items = list(model.objects.filter(pk__in=names).only('pk'))
+        for item in items:
+            item.legacy_tags = ', '.join(names[item.pk])[:500]
+        model.objects.bulk_update(items, ['legacy_tags'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0006_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('slug', models.SlugField(allow_unicode=True, max_length=100, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.RenameField(model_name='video', old_name='tags', new_name='legacy_tags'),
+        migrations.RenameField(model_name='pdfresource', old_name='tags', new_name='legacy_tags'),
+        migrations.RenameField(model_name='article', old_name='tags', new_name='legacy_tags'),
+        migrations.AddField(
+            model_name='video',
+            name='tags',
+            field=models.ManyToManyField(blank=True, related_name='videos', to='resources.tag'),
+        ),
+        migrations.AddField(
+            model_name='pdfresource',
+            name='tags',
+            field=models.ManyToManyField(blank=True, related_name='pdfs', to='resources.tag'),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='tags',
+            field=models.ManyToManyField(blank=True, related_name='articles', to='resources.tag'),
+        ),
+        migrations.RunPython(split_tag_strings, join_tag_strings),
+        migrations.RemoveField(model_name='video', name='legacy_tags'),
+        migrations.RemoveField(model_name='pdfresource', name='legacy_tags'),
+        migrations.RemoveField(model_name='article', name='legacy_tags'),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations
+
+# Keep in sync with resources.search: rowid = object_id * 4 + kind
+TAG_NAMES = (
+    "(SELECT coalesce(group_concat(t.name, ', '), '') FROM {links} l "
+    "JOIN resources_tag t ON t.id = l.tag_id WHERE l.{owner} = c.id)"
+)
+CREATE_INDEX = [
+    "DROP TABLE IF EXISTS resources_search_index",
+    "CREATE VIRTUAL TABLE resources_search_index USING fts5("
+    "title, description, tags, content, category UNINDEXED, is_parent_content UNINDEXED, "
+    "is_featured UNINDEXED, tokenize='unicode61 remove_diacritics 2')",
+    "INSERT INTO resources_search_index "
+    "(rowid, title, description, tags, content, category, is_parent_content, is_featured) "
+    "SELECT c.id * 4 + 1, c.title, c.description, "
+    + TAG_NAMES.format(links='resources_video_tags', owner='video_id') +
+    ", '', c.category, c.is_parent_content, c.is_featured FROM resources_video c",
+    "INSERT INTO resources_search_index "
+    "(rowid, title, description, tags, content, category, is_parent_content, is_featured) "
+    "SELECT c.id * 4 + 2, c.title, c.description, "
+    + TAG_NAMES.format(links='resources_pdfresource_tags', owner='pdfresource_id') +
+    ", '', c.category, c.is_parent_content, c.is_featured FROM resources_pdfresource c",
+    "INSERT INTO resources_search_index "
+    "(rowid, title, description, tags, content, category, is_parent_content, is_featured) "
+    "SELECT c.id * 4 + 3, c.title, c.description, "
+    + TAG_NAMES.format(links='resources_article_tags', owner='article_id') +
+    ", c.content, c.category, c.is_parent_content, c.is_featured FROM resources_article c WHERE c.is_published",
+]
+
+
+def rebuild_search_index(apps, schema_editor):
+    """Recreate the FTS5 table with the facet columns (FTS5 can't add columns)"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in CREATE_INDEX:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0007_tags'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_search_index, migrations.RunPython.noop),
+    ]
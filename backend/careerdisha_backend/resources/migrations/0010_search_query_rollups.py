@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0009_synonyms'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchQueryRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('query', models.CharField(max_length=200)),
+                ('searches', models.PositiveIntegerField(default=0)),
+                ('zero_results', models.PositiveIntegerField(default=0, help_text='Searches that found nothing')),
+            ],
+            options={
+                'ordering': ['-day', '-searches'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SearchVolumeRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(unique=True)),
+                ('searches', models.PositiveIntegerField(default=0)),
+                ('zero_results', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-hour'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchqueryrollup',
+            constraint=models.UniqueConstraint(fields=('day', 'query'), name='searchqueryrollup_day_query'),
+        ),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+COUNTERS = [
+    ('Article', 'view_count'),
+    ('College', 'view_count'),
+    ('PDFResource', 'download_count'),
+    ('Scholarship', 'application_count'),
+]
+
+
+def copy_counters(apps, schema_editor):
+    """Move the non-zero counters off the content rows into ContentStats"""
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    ContentStats = apps.get_model('resources', 'ContentStats')
+
+    for model_name, field in COUNTERS:
+        model = apps.get_model('resources', model_name)
+        content_type, _ = ContentType.objects.get_or_create(app_label='resources', model=model_name.lower())
+        ContentStats.objects.bulk_create(
+            [
+                ContentStats(content_type=content_type, object_id=pk, **{field: count})
+                for pk, count in model.objects.filter(**{f'{field}__gt': 0}).values_list('pk', field).iterator()
+            ],
+            batch_size=1000
+        )
+
+
+def restore_counters(apps, schema_editor):
+    ContentStats = apps.get_model('resources', 'ContentStats')
+
+    for model_name, field in COUNTERS:
+        model = apps.get_model('resources', model_name)
+        rows = ContentStats.objects.filter(
+            content_type__app_label='resources', content_type__model=model_name.lower()
+        ).values_list('object_id', field)
+        for object_id, count in rows.iterator():
+            model.objects.filter(pk=object_id).update(**{field: count})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('resources', '0010_search_query_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('view_count', models.PositiveIntegerField(default=0)),
+                ('download_count', models.PositiveIntegerField(default=0)),
+                ('application_count', models.PositiveIntegerField(default=0)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'verbose_name_plural': 'content stats',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='contentstats',
+            constraint=models.UniqueConstraint(fields=('content_type', 'object_id'), name='contentstats_object'),
+        ),
+        migrations.RunPython(copy_counters, restore_counters),
+        migrations.RemoveField(
+            model_name='article',
+            name='view_count',
+        ),
+        migrations.RemoveField(
+            model_name='college',
+            name='view_count',
+        ),
+        migrations.RemoveField(
+            model_name='pdfresource',
+            name='download_count',
+        ),
+        migrations.RemoveField(
+            model_name='scholarship',
+            name='application_count',
+        ),
+        migrations.AlterModelOptions(
+            name='college',
+            options={'ordering': ['-stats__view_count', 'name']},
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('resources', '0011_content_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EngagementDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('day', models.DateField()),
+                ('view_count', models.PositiveIntegerField(default=0)),
+                ('download_count', models.PositiveIntegerField(default=0)),
+                ('application_count', models.PositiveIntegerField(default=0)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'verbose_name_plural': 'daily engagement',
+                'ordering': ['-day'],
+            },
+        ),
+        migrations.CreateModel(
+            name='EngagementHourly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('hour', models.DateTimeField()),
+                ('view_count', models.PositiveIntegerField(default=0)),
+                ('download_count', models.PositiveIntegerField(default=0)),
+                ('application_count', models.PositiveIntegerField(default=0)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'verbose_name_plural': 'hourly engagement',
+                'ordering': ['-hour'],
+                'indexes': [models.Index(fields=['hour'], name='resources_e_hour_7e53f0_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='engagementhourly',
+            constraint=models.UniqueConstraint(fields=('content_type', 'object_id', 'hour'), name='engagementhourly_bucket'),
+        ),
+        migrations.AddIndex(
+            model_name='engagementdaily',
+            index=models.Index(fields=['day'], name='resources_e_day_57cdd6_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='engagementdaily',
+            constraint=models.UniqueConstraint(fields=('content_type', 'object_id', 'day'), name='engagementdaily_bucket'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('resources', '0012_engagement_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingEpoch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TrendingItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('list_name', models.CharField(choices=[('all', 'All content'), ('videos', 'Videos'), ('pdfs', 'PDFs'), ('articles', 'Articles'), ('scholarships', 'Scholarships'), ('colleges', 'Colleges')], max_length=20)),
+                ('rank', models.PositiveIntegerField()),
+                ('object_id', models.PositiveIntegerField()),
+                ('score', models.FloatField(help_text='Decayed score when the list was computed')),
+                ('computed_at', models.DateTimeField()),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'ordering': ['list_name', 'rank'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TrendingScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('score', models.FloatField(default=0)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-score'], name='resources_t_score_e0b20c_idx'), models.Index(fields=['content_type', '-score'], name='resources_t_content_c014e3_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='trendingscore',
+            constraint=models.UniqueConstraint(fields=('content_type', 'object_id'), name='trendingscore_object'),
+        ),
+        migrations.AddConstraint(
+            model_name='trendingitem',
+            constraint=models.UniqueConstraint(fields=('list_name', 'rank'), name='trendingitem_list_rank'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('resources', '0013_trending'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contentstats',
+            name='unique_visitors',
+            field=models.PositiveIntegerField(blank=True, help_text='Estimated distinct viewers, about 2% error', null=True),
+        ),
+        migrations.AddField(
+            model_name='contentstats',
+            name='visitors',
+            field=models.BinaryField(help_text='Serialized resources.sketches.HyperLogLog of all viewers', null=True),
+        ),
+        migrations.CreateModel(
+            name='VisitorSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('day', models.DateField()),
+                ('sketch', models.BinaryField(help_text='Serialized resources.sketches.HyperLogLog')),
+                ('unique_visitors', models.PositiveIntegerField(default=0)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'ordering': ['-day'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='visitorsketch',
+            constraint=models.UniqueConstraint(fields=('content_type', 'object_id', 'day'), name='visitorsketch_bucket'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:56
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0014_unique_visitors'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='college',
+            options={'ordering': ['name']},
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 19:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0015_college_ordering'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tag',
+            name='slug',
+            field=models.SlugField(allow_unicode=True, blank=True, help_text='Leave blank to derive it from the name', max_length=100, unique=True),
+        ),
+    ]
@@ -1,15 +1,249 @@
 import re
 import google.generativeai as genai
+from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
+from django.contrib.contenttypes.models import ContentType
 from django.db import models
 from django.core.validators import URLValidator
 from django.conf import settings
 from django.utils.html import strip_tags
+from django.utils.text import slugify
 
 # Configure Google AI
 if settings.GOOGLE_API_KEY:
     genai.configure(api_key=settings.GOOGLE_API_KEY)
 
-class Video(models.Model):
+class Tag(models.Model):
+    """Tag shared by videos, PDFs and articles"""
+    name = models.CharField(max_length=100, unique=True)
+    slug = models.SlugField(
+        max_length=100, unique=True, allow_unicode=True, blank=True,
+        help_text="Leave blank to derive it from the name"
+    )
+    
+    class Meta:
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+    
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            self.slug = unique_slug(self.name, Tag.objects.exclude(pk=self.pk))
+        super().save(*args, **kwargs)
+
+def unique_slug(name, queryset, max_length=100):
+    """Slug of name not used in queryset, numbered (-2, -3...) where names like "C" and "C++" collide"""
+    base = slugify(name, allow_unicode=True)[:max_length] or 'tag'
+    taken = set(queryset.filter(slug__startswith=base[:max_length - 10]).values_list('slug', flat=True))
+    slug, number = base, 1
+    while slug in taken:
+        number += 1
+        suffix = f'-{number}'
+        slug = base[:max_length - len(suffix)] + suffix
+    return slug
+
+class SynonymGroup(models.Model):
+    """Words and phrases that search treats as meaning the same thing"""
+    terms = models.TextField(help_text="Comma-separated words or phrases, e.g. \"mbbs, doctor, medical\"")
+    is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['terms']
+    
+    def __str__(self):
+        return self.terms
+    
+    def term_list(self):
+        """The group's terms, lowercased and without duplicates"""
+        terms = []
+        for term in self.terms.split(','):
+            term = ' '.join(re.findall(r'\w+', term.casefold()))
+            if term and term not in terms:
+                terms.append(term)
+        return terms
+
+# Engagement counters of ContentStats and the engagement rollups
+COUNTER_FIELDS = ('view_count', 'download_count', 'application_count')
+
+class ContentStats(models.Model):
+    """View, download and application counts of one article, PDF, scholarship or college.
+    
+    Kept out of the item's own row so that counting a hit never rewrites
+    the catalog entry or moves its updated_at.
+    """
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    content_object = GenericForeignKey('content_type', 'object_id')
+    view_count = models.PositiveIntegerField(default=0)
+    download_count = models.PositiveIntegerField(default=0)
+    application_count = models.PositiveIntegerField(default=0)
+    visitors = models.BinaryField(null=True, editable=False, help_text="Serialized resources.sketches.HyperLogLog of all viewers")
+    unique_visitors = models.PositiveIntegerField(null=True, blank=True, help_text="Estimated distinct viewers, about 2% error")
+    
+    class Meta:
+        verbose_name_plural = 'content stats'
+        constraints = [
+            models.UniqueConstraint(fields=['content_type', 'object_id'], name='contentstats_object'),
+        ]
+    
+    def __str__(self):
+        return f"{self.content_type.model} {self.object_id}"
+
+class EngagementHourly(models.Model):
+    """Views, downloads and applications of one item during one hour.
+    
+    Written by the counter flushes (see resources.counters); hours older
+    than a week are compacted into EngagementDaily.
+    """
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    hour = models.DateTimeField()
+    view_count = models.PositiveIntegerField(default=0)
+    download_count = models.PositiveIntegerField(default=0)
+    application_count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        ordering = ['-hour']
+        verbose_name_plural = 'hourly engagement'
+        constraints = [
+            models.UniqueConstraint(fields=['content_type', 'object_id', 'hour'], name='engagementhourly_bucket'),
+        ]
+        indexes = [models.Index(fields=['hour'])]
+    
+    def __str__(self):
+        return f"{self.content_type.model} {self.object_id} at {self.hour:%Y-%m-%d %H:00}"
+
+class EngagementDaily(models.Model):
+    """Views, downloads and applications of one item during one day"""
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    day = models.DateField()
+    view_count = models.PositiveIntegerField(default=0)
+    download_count = models.PositiveIntegerField(default=0)
+    application_count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        ordering = ['-day']
+        verbose_name_plural = 'daily engagement'
+        constraints = [
+            models.UniqueConstraint(fields=['content_type', 'object_id', 'day'], name='engagementdaily_bucket'),
+        ]
+        indexes = [models.Index(fields=['day'])]
+    
+    def __str__(self):
+        return f"{self.content_type.model} {self.object_id} on {self.day}"
+
+class VisitorSketch(models.Model):
+    """HyperLogLog sketch of the distinct viewers of one item on one day.
+    
+    Sketches merge, so the viewers of any range of days can be estimated
+    without counting anyone twice (see resources.visitors).
+    """
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    day = models.DateField()
+    sketch = models.BinaryField(help_text="Serialized resources.sketches.HyperLogLog")
+    unique_visitors = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        ordering = ['-day']
+        constraints = [
+            models.UniqueConstraint(fields=['content_type', 'object_id', 'day'], name='visitorsketch_bucket'),
+        ]
+    
+    def __str__(self):
+        return f"{self.content_type.model} {self.object_id} on {self.day} ({self.unique_visitors} visitors)"
+
+class TrendingScore(models.Model):
+    """Exponentially decayed engagement of one item.
+    
+    Stored scaled to the TrendingEpoch rather than to now, so adding new
+    hits is a plain addition and ordering by score is ordering by the
+    current decayed score (see resources.trending).
+    """
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    score = models.FloatField(default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['content_type', 'object_id'], name='trendingscore_object'),
+        ]
+        indexes = [
+            models.Index(fields=['-score']),
+            models.Index(fields=['content_type', '-score']),
+        ]
+    
+    def __str__(self):
+        return f"{self.content_type.model} {self.object_id}: {self.score:.3g}"
+
+class TrendingEpoch(models.Model):
+    """The single row holding the time trending scores are currently scaled to"""
+    started_at = models.DateTimeField()
+    
+    def __str__(self):
+        return f"Trending epoch {self.started_at}"
+
+class TrendingItem(models.Model):
+    """One entry of a precomputed trending list, rebuilt every few minutes"""
+    LIST_CHOICES = [
+        ('all', 'All content'),
+        ('videos', 'Videos'),
+        ('pdfs', 'PDFs'),
+        ('articles', 'Articles'),
+        ('scholarships', 'Scholarships'),
+        ('colleges', 'Colleges'),
+    ]
+    
+    list_name = models.CharField(max_length=20, choices=LIST_CHOICES)
+    rank = models.PositiveIntegerField()
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    score = models.FloatField(help_text="Decayed score when the list was computed")
+    computed_at = models.DateTimeField()
+    
+    class Meta:
+        ordering = ['list_name', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['list_name', 'rank'], name='trendingitem_list_rank'),
+        ]
+    
+    def __str__(self):
+        return f"{self.list_name} #{self.rank}: {self.content_type.model} {self.object_id}"
+
+class CountedContent(models.Model):
+    """Base for models whose engagement counters live in ContentStats"""
+    stats = GenericRelation(ContentStats)
+    hourly_engagement = GenericRelation(EngagementHourly)
+    daily_engagement = GenericRelation(EngagementDaily)
+    trending_score = GenericRelation(TrendingScore)
+    visitor_sketches = GenericRelation(VisitorSketch)
+    
+    class Meta:
+        abstract = True
+    
+    @property
+    def counts(self):
+        """This item's ContentStats row; an unsaved one of zeros if nothing was counted yet.
+        
+        Uses prefetch_related('stats') when the queryset had it.
+        """
+        if not hasattr(self, '_counts'):
+            rows = list(self.stats.all())
+            self._counts = rows[0] if rows else ContentStats(content_object=self)
+        return self._counts
+    
+    @property
+    def unique_visitors(self):
+        return self.counts.unique_visitors or 0
+    
+    def add_to_counter(self, field, count=1):
+        # counters imports this module
+        from .counters import increment
+        increment(self, field, count)
+
+class Video(CountedContent):
     CATEGORY_CHOICES = [
         ('engineering', 'Engineering'),
         ('medical', 'Medical'),
@@ -32,7 +266,7 @@ class Video(models.Model):
     is_parent_content = models.BooleanField(default=False, help_text="Check if this content is for parents")
     is_featured = models.BooleanField(default=False)
     ai_generated_summary = models.TextField(blank=True, help_text="AI-generated content summary")
-    tags = models.CharField(max_length=500, blank=True, help_text="Comma-separated tags")
+    tags = models.ManyToManyField(Tag, related_name='videos', blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -75,6 +309,14 @@ class Video(models.Model):
             return f'https://www.youtube.com/embed/{video_id}'
         return None
     
+    @property
+    def view_count(self):
+        """Views on this site; `views` is the count shown on YouTube"""
+        return self.counts.view_count
+    
+    def increment_view_count(self):
+        self.add_to_counter('view_count')
+    
     def generate_ai_summary(self):
         """Generate AI summary using Google Generative AI"""
         if not settings.GOOGLE_API_KEY:
@@ -117,7 +359,7 @@ class Video(models.Model):
         verbose_name = "Video Resource"
         verbose_name_plural = "Video Resources"
 
-class PDFResource(models.Model):
+class PDFResource(CountedContent):
     CATEGORY_CHOICES = [
         ('career_guides', 'Career Guides'),
         ('academic_planning', 'Academic Planning'),
@@ -137,9 +379,8 @@ class PDFResource(models.Model):
     category = models.CharField(max_length=50, choices=CATEGORY_CHOICES, default='general')
     is_parent_content = models.BooleanField(default=False, help_text="Check if this content is for parents")
     is_featured = models.BooleanField(default=False)
-    download_count = models.PositiveIntegerField(default=0)
     ai_generated_summary = models.TextField(blank=True, help_text="AI-generated content summary")
-    tags = models.CharField(max_length=500, blank=True, help_text="Comma-separated tags")
+    tags = models.ManyToManyField(Tag, related_name='pdfs', blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -155,10 +396,13 @@ class PDFResource(models.Model):
                 return f"{size / (1024 * 1024):.1f} MB"
         return "Unknown"
     
+    @property
+    def download_count(self):
+        return self.counts.download_count
+    
     def increment_download_count(self):
         """Increment download counter"""
-        self.download_count += 1
-        self.save(update_fields=['download_count'])
+        self.add_to_counter('download_count')
     
     def generate_ai_summary(self):
         """Generate AI summary using Google Generative AI"""
@@ -200,7 +444,7 @@ class PDFResource(models.Model):
         verbose_name = "PDF Resource"
         verbose_name_plural = "PDF Resources"
 
-class Article(models.Model):
+class Article(CountedContent):
     CATEGORY_CHOICES = [
         ('career_trends', 'Career Trends'),
         ('job_market', 'Job Market Analysis'),
@@ -222,9 +466,8 @@ class Article(models.Model):
     is_parent_content = models.BooleanField(default=False, help_text="Check if this content is for parents")
     is_featured = models.BooleanField(default=False)
     is_published = models.BooleanField(default=True)
-    view_count = models.PositiveIntegerField(default=0)
     ai_enhanced_content = models.TextField(blank=True, help_text="AI-enhanced version of content")
-    tags = models.CharField(max_length=500, blank=True, help_text="Comma-separated tags")
+    tags = models.ManyToManyField(Tag, related_name='articles', blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -235,10 +478,13 @@ class Article(models.Model):
         minutes = max(1, round(word_count / 200))
         return f"{minutes} min read"
     
+    @property
+    def view_count(self):
+        return self.counts.view_count
+    
     def increment_view_count(self):
         """Increment view counter"""
-        self.view_count += 1
-        self.save(update_fields=['view_count'])
+        self.add_to_counter('view_count')
     
     def get_excerpt(self, word_limit=50):
         """Get excerpt from content"""
@@ -295,9 +541,12 @@ class Article(models.Model):
 
 class CareerQuiz(models.Model):
     """Model for career assessment quizzes"""
+    key = models.SlugField(max_length=100, unique=True, null=True, blank=True, help_text="Identifier of the quiz definition file")
     title = models.CharField(max_length=200)
     description = models.TextField()
     is_active = models.BooleanField(default=True)
+    version = models.PositiveIntegerField(default=1, help_text="Incremented whenever the loaded definition changes")
+    definition_hash = models.CharField(max_length=64, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
@@ -329,7 +578,83 @@ class QuizAnswer(models.Model):
     def __str__(self):
         return f"{self.question} - {self.answer_text}"
 
-class Scholarship(models.Model):
+class Career(models.Model):
+    """Catalog entry describing a career the quiz can recommend"""
+    CATEGORY_CHOICES = [
+        ('technology', 'Technology & Engineering'),
+        ('healthcare', 'Healthcare & Medical'),
+        ('business', 'Business & Finance'),
+        ('creative', 'Creative & Arts'),
+        ('education', 'Education & Research'),
+        ('social', 'Social Services & Law'),
+    ]
+    
+    key = models.SlugField(max_length=100, unique=True, help_text="Key used in QuizAnswer.career_weight")
+    name = models.CharField(max_length=200)
+    category = models.CharField(max_length=50, choices=CATEGORY_CHOICES, blank=True)
+    description = models.TextField()
+    avg_salary = models.CharField(max_length=100, blank=True)
+    growth_outlook = models.CharField(max_length=100, blank=True)
+    required_skills = models.JSONField(default=list, help_text="List of key skills")
+    education = models.CharField(max_length=200, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+
+class QuizScoreSketch(models.Model):
+    """Persisted KLL sketch of one career's scores across a quiz's submissions"""
+    quiz = models.ForeignKey(CareerQuiz, on_delete=models.CASCADE, related_name='score_sketches')
+    career_key = models.CharField(max_length=100)
+    count = models.PositiveIntegerField(default=0, help_text="Submissions summarized by the sketch")
+    sketch = models.JSONField(default=dict, help_text="Serialized resources.sketches.KLLSketch")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['quiz', 'career_key'], name='quizscoresketch_quiz_career'),
+        ]
+    
+    def __str__(self):
+        return f"{self.quiz} - {self.career_key} ({self.count} scores)"
+
+class SearchQueryRollup(models.Model):
+    """Daily search counts for a query that was among a worker's most frequent.
+    
+    Filled from per-worker heavy-hitter sketches (see
+    resources.query_analytics), so counts are estimates and rare queries
+    are not recorded.
+    """
+    day = models.DateField()
+    query = models.CharField(max_length=200)
+    searches = models.PositiveIntegerField(default=0)
+    zero_results = models.PositiveIntegerField(default=0, help_text="Searches that found nothing")
+    
+    class Meta:
+        ordering = ['-day', '-searches']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'query'], name='searchqueryrollup_day_query'),
+        ]
+    
+    def __str__(self):
+        return f"{self.query} on {self.day} ({self.searches} searches)"
+
+class SearchVolumeRollup(models.Model):
+    """Exact number of searches, and of searches that found nothing, per hour"""
+    hour = models.DateTimeField(unique=True)
+    searches = models.PositiveIntegerField(default=0)
+    zero_results = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        ordering = ['-hour']
+    
+    def __str__(self):
+        return f"{self.hour:%Y-%m-%d %H:00}: {self.searches} searches"
+
+class Scholarship(CountedContent):
     ELIGIBILITY_CHOICES = [
         ('undergraduate', 'Undergraduate'),
         ('graduate', 'Graduate'),
@@ -360,7 +685,6 @@ class Scholarship(models.Model):
     provider_website = models.URLField(blank=True)
     application_link = models.URLField()
     is_active = models.BooleanField(default=True)
-    application_count = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -370,11 +694,14 @@ class Scholarship(models.Model):
     def __str__(self):
         return self.title
     
+    @property
+    def application_count(self):
+        return self.counts.application_count
+    
     def increment_application_count(self):
-        self.application_count += 1
-        self.save(update_fields=['application_count'])
+        self.add_to_counter('application_count')
 
-class College(models.Model):
+class College(CountedContent):
     COLLEGE_TYPE_CHOICES = [
         ('public', 'Public University'),
         ('private', 'Private University'),
@@ -412,16 +739,19 @@ class College(models.Model):
     contact_phone = models.CharField(max_length=20, blank=True)
     campus_facilities = models.TextField(blank=True, help_text="Library, Labs, Sports, etc.")
     is_featured = models.BooleanField(default=False)
-    view_count = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
-        ordering = ['-view_count', 'name']
+        # Sorting by popularity joins ContentStats; CollegeListView does that itself
+        ordering = ['name']
     
     def __str__(self):
         return f"{self.name} - {self.location}"
     
+    @property
+    def view_count(self):
+        return self.counts.view_count
+    
     def increment_view_count(self):
-        self.view_count += 1
-        self.save(update_fields=['view_count'])
\ No newline at end of file
+        self.add_to_counter('view_count')
\ No newline at end of file
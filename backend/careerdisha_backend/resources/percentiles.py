@@ -0,0 +1,100 @@
+"""Percentile ranks of quiz career scores backed by persisted KLL sketches.
+
+Every scored submission is buffered in the worker and folded into the
+QuizScoreSketch rows of its quiz every few seconds; workers merge their
+batches into the same rows, so the stored sketches summarize all of them.
+Lookups only read a per-worker copy of the sketches; the flush thread
+reloads it from those rows at most once a minute, so scoring a submission
+never waits on the database.
+"""
+import threading
+import time
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+from .buffers import FlushBuffer
+from .models import QuizScoreSketch
+from .sketches import KLLSketch
+
+FLUSH_INTERVAL = 10  # seconds
+FLUSH_MAX_SIZE = 500
+REFRESH_INTERVAL = 60  # seconds between reloads of a quiz's sketches
+MIN_SKETCH_COUNT = 20  # submissions needed before percentiles are reported
+
+def flush_scores(items):
+    """Merge buffered (quiz_id, careers, score matrix) batches into the stored sketches"""
+    batches = {}
+    for quiz_id, careers, scores in items:
+        batches.setdefault((quiz_id, careers), []).append(scores)
+
+    for (quiz_id, careers), score_batches in batches.items():
+        scores = np.vstack(score_batches)
+        with transaction.atomic():
+            QuizScoreSketch.objects.bulk_create(
+                [QuizScoreSketch(quiz_id=quiz_id, career_key=career) for career in careers],
+                ignore_conflicts=True
+            )
+            rows = list(QuizScoreSketch.objects.select_for_update().filter(quiz_id=quiz_id, career_key__in=careers))
+            columns = {career: column for column, career in enumerate(careers)}
+            for row in rows:
+                sketch = KLLSketch.from_dict(row.sketch)
+                sketch.update_many(scores[:, columns[row.career_key]])
+                row.sketch = sketch.to_dict()
+                row.count = sketch.count
+                row.updated_at = timezone.now()
+            QuizScoreSketch.objects.bulk_update(rows, ['sketch', 'count', 'updated_at'])
+
+class ScoreSketchBuffer(FlushBuffer):
+    """FlushBuffer whose background thread also keeps the workers' sketch copies fresh"""
+
+    def _after_flush(self):
+        refresh_sketches()
+
+_buffer = ScoreSketchBuffer(flush_scores, interval=FLUSH_INTERVAL, max_size=FLUSH_MAX_SIZE, name='score-sketches')
+
+def record_scores(quiz, scores):
+    """Queue one score vector, or an (N, careers) matrix of them, for the quiz's sketches"""
+    _buffer.add((quiz.quiz_id, quiz.careers, np.atleast_2d(scores)))
+
+_sketches = {}  # quiz_id -> (loaded at or None, {career_key: KLLSketch})
+_lock = threading.Lock()
+
+def refresh_sketches(max_age=REFRESH_INTERVAL):
+    """Reload the copies of the quizzes this worker has looked up that are older than max_age"""
+    now = time.monotonic()
+    stale = [
+        quiz_id for quiz_id, (loaded_at, _) in list(_sketches.items())
+        if loaded_at is None or now - loaded_at > max_age
+    ]
+    for quiz_id in stale:
+        sketches = {
+            career_key: KLLSketch.from_dict(sketch)
+            for career_key, sketch in QuizScoreSketch.objects.filter(
+                quiz_id=quiz_id, count__gte=MIN_SKETCH_COUNT
+            ).values_list('career_key', 'sketch')
+        }
+        with _lock:
+            _sketches[quiz_id] = (time.monotonic(), sketches)
+
+def get_quiz_sketches(quiz_id):
+    """Return this worker's copy of a quiz's sketches without touching the database.
+
+    A quiz seen for the first time has no copy yet; it is queued for the
+    flush thread, which loads it right away, and reports no percentiles
+    until then.
+    """
+    entry = _sketches.get(quiz_id)
+    if entry is None:
+        with _lock:
+            entry = _sketches.setdefault(quiz_id, (None, {}))
+        _buffer.wake()
+    return entry[1]
+
+def score_percentiles(quiz, top_careers):
+    """Map each (career_key, score) pair to its percentile, or None without enough data"""
+    sketches = get_quiz_sketches(quiz.quiz_id)
+    percentiles = {}
+    for career_key, score in top_careers:
+        sketch = sketches.get(career_key)
+        percentiles[career_key] = round(sketch.percentile(score)) if sketch is not None else None
+    return percentiles
@@ -0,0 +1,174 @@
+"""Search query analytics collected in bounded memory.
+
+Each worker counts its searches in a QueryWindow: exact per-hour totals
+plus two heavy-hitter sketches (a Count-Min sketch and a top-k heap), one
+for all queries and one for queries that found nothing. A background
+thread swaps the window out every FLUSH_INTERVAL seconds and adds it to
+SearchVolumeRollup and SearchQueryRollup with additive upserts, so a search
+costs a few counter updates and never a database write, however many
+distinct queries come in.
+"""
+import threading
+from contextlib import contextmanager
+from django.db import connection, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from .buffers import FlushBuffer
+from .models import SearchQueryRollup, SearchVolumeRollup
+from .sketches import HeavyHitters
+
+FLUSH_INTERVAL = 60  # seconds
+FLUSH_MAX_SIZE = 50000  # searches per window before an early flush
+TOP_QUERIES = 200  # queries kept per window and kind
+SKETCH_WIDTH = 4096
+MAX_QUERY_LENGTH = 200
+
+def normalize_query(text):
+    return ' '.join(text.casefold().split())[:MAX_QUERY_LENGTH]
+
+class QueryWindow:
+    """One worker's searches since its last flush"""
+
+    def __init__(self):
+        self.volume = {}  # hour -> [searches, zero_results]
+        self.queries = HeavyHitters(TOP_QUERIES, SKETCH_WIDTH)
+        self.zero_result_queries = HeavyHitters(TOP_QUERIES, SKETCH_WIDTH)
+
+    def __len__(self):
+        return len(self.queries)
+
+    def add(self, hour, day, query, found):
+        counts = self.volume.setdefault(hour, [0, 0])
+        counts[0] += 1
+        counts[1] += not found
+        self.queries.add((day, query))
+        if not found:
+            self.zero_result_queries.add((day, query))
+
+    def merge(self, other):
+        for hour, (searches, zero_results) in other.volume.items():
+            counts = self.volume.setdefault(hour, [0, 0])
+            counts[0] += searches
+            counts[1] += zero_results
+        self.queries.merge(other.queries)
+        self.zero_result_queries.merge(other.zero_result_queries)
+
+    def query_rows(self):
+        """(day, query, searches, zero_results) for the window's frequent queries"""
+        items = set(self.queries.top) | set(self.zero_result_queries.top)
+        rows = []
+        for day, query in items:
+            zero_results = self.zero_result_queries.top.get((day, query), 0)
+            searches = max(self.queries.estimate((day, query)), zero_results)
+            rows.append((day, query, searches, zero_results))
+        return rows
+
+class QueryWindowBuffer(FlushBuffer):
+    """FlushBuffer that folds searches into a QueryWindow instead of a list"""
+
+    def __init__(self, flush, **kwargs):
+        super().__init__(flush, **kwargs)
+        self._items = QueryWindow()
+
+    def __len__(self):
+        return len(self._items)
+
+    def _put(self, item):
+        self._items.add(*item)
+        return len(self._items)
+
+    def _take(self):
+        window, self._items = self._items, QueryWindow()
+        return window
+
+    def _restore(self, window):
+        self._items.merge(window)
+
+def flush_window(window):
+    """Add a window's counts to the rollup tables with one upsert per row"""
+    qn = connection.ops.quote_name
+    volume_table = qn(SearchVolumeRollup._meta.db_table)
+    query_table = qn(SearchQueryRollup._meta.db_table)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {volume_table} (hour, searches, zero_results) VALUES (%s, %s, %s) '
+            f'ON CONFLICT (hour) DO UPDATE SET '
+            f'searches = {volume_table}.searches + excluded.searches, '
+            f'zero_results = {volume_table}.zero_results + excluded.zero_results',
+            [
+                (connection.ops.adapt_datetimefield_value(hour), searches, zero_results)
+                for hour, (searches, zero_results) in window.volume.items()
+            ]
+        )
+        cursor.executemany(
+            f'INSERT INTO {query_table} (day, query, searches, zero_results) VALUES (%s, %s, %s, %s) '
+            f'ON CONFLICT (day, query) DO UPDATE SET '
+            f'searches = {query_table}.searches + excluded.searches, '
+            f'zero_results = {query_table}.zero_results + excluded.zero_results',
+            [
+                (connection.ops.adapt_datefield_value(day), query, searches, zero_results)
+                for day, query, searches, zero_results in window.query_rows()
+            ]
+        )
+
+_buffer = QueryWindowBuffer(flush_window, interval=FLUSH_INTERVAL, max_size=FLUSH_MAX_SIZE, name='search-queries')
+
+_local = threading.local()
+
+@contextmanager
+def recording_paused():
+    """Don't count the searches this thread makes inside the block, e.g. benchmark traffic"""
+    paused = getattr(_local, 'paused', False)
+    _local.paused = True
+    try:
+        yield
+    finally:
+        _local.paused = paused
+
+def record_search(query, found):
+    """Count one search; found is whether it returned any results"""
+    if getattr(_local, 'paused', False):
+        return
+    now = timezone.now()
+    hour = now.replace(minute=0, second=0, microsecond=0)
+    _buffer.add((hour, timezone.localdate(now), normalize_query(query), found))
+
+def flush_pending():
+    """Write this worker's counts now"""
+    _buffer.flush()
+
+def query_report(since, limit=20, interval='day'):
+    """Top queries, top zero-result queries and search volume per day or hour since a date"""
+    queries = (
+        SearchQueryRollup.objects.filter(day__gte=since)
+        .values('query')
+        .annotate(total_searches=Sum('searches'), total_zero_results=Sum('zero_results'))
+    )
+    volume = SearchVolumeRollup.objects.filter(hour__date__gte=since)
+    if interval == 'day':
+        volume = (
+            volume.annotate(period=TruncDate('hour'))
+            .values('period')
+            .annotate(total_searches=Sum('searches'), total_zero_results=Sum('zero_results'))
+            .order_by('-period')
+        )
+    else:
+        volume = volume.values(period=F('hour'), total_searches=F('searches'), total_zero_results=F('zero_results'))
+    
+    def serialize(row, key):
+        return {key: row[key], 'searches': row['total_searches'], 'zero_results': row['total_zero_results']}
+    
+    return {
+        'top_queries': [
+            serialize(row, 'query') for row in queries.order_by('-total_searches', 'query')[:limit]
+        ],
+        'zero_result_queries': [
+            serialize(row, 'query')
+            for row in queries.filter(zero_results__gt=0).order_by('-total_zero_results', 'query')[:limit]
+        ],
+        'volume': [
+            {interval: row['period'], 'searches': row['total_searches'], 'zero_results': row['total_zero_results']}
+            for row in volume
+        ],
+    }
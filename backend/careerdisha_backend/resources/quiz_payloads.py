@@ -0,0 +1,34 @@
+import hashlib
+from rest_framework.renderers import JSONRenderer
+from .caching import generation_cached
+from .models import CareerQuiz
+from .scoring import QUIZ_GENERATION
+from .serializers import CareerQuizSerializer
+
+class QuizPayload:
+    """Rendered quiz JSON plus the strong ETag derived from it"""
+
+    def __init__(self, body):
+        self.body = body
+        self.etag = '"%s"' % hashlib.sha256(body).hexdigest()[:40]
+
+def render_quiz_payload(quiz_id):
+    """Serialize an active quiz with its questions and answers, or None if missing"""
+    quiz = (
+        CareerQuiz.objects.filter(pk=quiz_id, is_active=True)
+        .prefetch_related('questions__answers')
+        .first()
+    )
+    if quiz is None:
+        return None
+    return QuizPayload(JSONRenderer().render(CareerQuizSerializer(quiz).data))
+
+_payloads = generation_cached(QUIZ_GENERATION, render_quiz_payload)
+
+def get_quiz_payload(quiz_id):
+    """Return the cached QuizPayload for quiz_id, rendering it once per quiz generation"""
+    try:
+        quiz_id = int(quiz_id)
+    except (TypeError, ValueError):
+        return None
+    return _payloads(quiz_id)
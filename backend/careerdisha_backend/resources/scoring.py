@@ -0,0 +1,191 @@
+import numpy as np
+from .caching import generation_cached
+from .models import CareerQuiz, QuizAnswer
+
+QUIZ_GENERATION = 'quizzes'
+
+# Adaptive mode tuning: softmax temperature applied to career scores and
+# answer weights, how many leading careers the next question should separate,
+# and when the ranking counts as settled.
+ADAPTIVE_TEMPERATURE = 5.0
+ADAPTIVE_CANDIDATES = 10
+ADAPTIVE_MIN_ANSWERS = 4
+ADAPTIVE_STABLE_TOP_K = 3
+ADAPTIVE_STABLE_STEPS = 2
+
+class CompiledQuiz:
+    """Dense answer x career weight matrix for one active quiz.
+
+    Rows follow the quiz's answers (ordered by question), columns follow the
+    careers in the order they first appear in the answers' career_weight
+    dicts. Instances are read-only once built and shared between threads.
+    """
+
+    def __init__(self, quiz, answers, question_count):
+        self.quiz_id = quiz.id
+        self.title = quiz.title
+        self.question_count = question_count
+
+        career_columns = {}
+        for answer in answers:
+            for career in answer.career_weight:
+                career_columns.setdefault(career, len(career_columns))
+        self.careers = tuple(career_columns)
+        self.answer_rows = {answer.id: row for row, answer in enumerate(answers)}
+
+        self.weights = np.zeros((len(answers), len(self.careers)), dtype=np.float64)
+        for row, answer in enumerate(answers):
+            for career, weight in answer.career_weight.items():
+                self.weights[row, career_columns[career]] = weight
+        self.weights.setflags(write=False)
+
+        # Questions in display order with their answer rows, padded into a
+        # (questions, max answers) table where -1 marks a missing answer
+        question_rows = {}
+        self.questions = []
+        for row, answer in enumerate(answers):
+            if answer.question_id not in question_rows:
+                question_rows[answer.question_id] = []
+                self.questions.append({
+                    'id': answer.question_id,
+                    'question_text': answer.question.question_text,
+                    'question_type': answer.question.question_type,
+                    'order': answer.question.order,
+                    'answers': [],
+                })
+            question_rows[answer.question_id].append(row)
+            self.questions[-1]['answers'].append({
+                'id': answer.id,
+                'answer_text': answer.answer_text,
+                'career_weight': answer.career_weight,
+            })
+        max_answers = max((len(rows) for rows in question_rows.values()), default=0)
+        self.answer_table = np.full((len(self.questions), max_answers), -1, dtype=np.intp)
+        self.row_questions = np.empty(len(answers), dtype=np.intp)
+        for index, rows in enumerate(question_rows.values()):
+            self.answer_table[index, :len(rows)] = rows
+            self.row_questions[rows] = index
+
+        # p(answer | question, career): softmax of each answer's weight for a
+        # career over the answers of the same question
+        self.answer_likelihood = np.zeros(self.answer_table.shape + (len(self.careers),))
+        if self.answer_table.size:
+            padded = np.where(
+                (self.answer_table >= 0)[:, :, None],
+                self.weights[self.answer_table] / ADAPTIVE_TEMPERATURE,
+                -np.inf
+            )
+            padded -= padded.max(axis=1, keepdims=True)
+            likelihood = np.exp(padded)
+            self.answer_likelihood = likelihood / likelihood.sum(axis=1, keepdims=True)
+
+    def rows_for(self, answer_ids):
+        """Map submitted answer IDs to matrix rows, skipping unknown IDs"""
+        rows = []
+        for answer_id in answer_ids:
+            try:
+                row = self.answer_rows.get(int(answer_id))
+            except (TypeError, ValueError):
+                continue
+            if row is not None:
+                rows.append(row)
+        return np.asarray(rows, dtype=np.intp)
+
+    def score(self, answer_ids):
+        """Sum the weight rows of the submitted answers into a career score vector"""
+        return self.weights[self.rows_for(answer_ids)].sum(axis=0)
+
+    def score_batch(self, answer_sets):
+        """Score many submissions at once, returning an (N, careers) matrix.
+
+        Submissions are turned into an answer-count matrix so the whole batch
+        is scored with a single matrix product.
+        """
+        counts = np.zeros((len(answer_sets), len(self.answer_rows)), dtype=np.float64)
+        for index, answer_ids in enumerate(answer_sets):
+            np.add.at(counts[index], self.rows_for(answer_ids), 1)
+        return counts @ self.weights
+
+    def top_careers(self, scores, k=5):
+        """Return the k best (career_key, score) pairs, highest score first.
+
+        Like the original scoring loop, k careers come back whenever the quiz
+        has that many, even if some of them scored nothing.
+        """
+        # Break ties by column so results are stable between requests
+        ordered = np.lexsort((np.arange(len(scores)), -scores))[:k]
+        return [(self.careers[column], scores[column].item()) for column in ordered]
+
+    def next_question(self, answer_ids, k=ADAPTIVE_STABLE_TOP_K):
+        """Pick the unanswered question with the highest expected information gain.
+
+        The current scores define a softmax belief over the leading careers
+        (a uniform one over all careers before the first answer); each
+        candidate question is scored by how much answering it is expected to
+        reduce the entropy of that belief. Returns (question index, done),
+        where done means the top-k careers have stopped moving or nothing is
+        left to ask.
+        """
+        rows = self.rows_for(answer_ids)
+        answered = np.zeros(len(self.questions), dtype=bool)
+        answered[self.row_questions[rows]] = True
+        if answered.all():
+            return None, True
+
+        prefix_scores = np.cumsum(self.weights[rows], axis=0)
+        if len(rows) >= max(ADAPTIVE_MIN_ANSWERS, ADAPTIVE_STABLE_STEPS + 1):
+            recent = [
+                frozenset(career for career, _ in self.top_careers(scores, k))
+                for scores in prefix_scores[-(ADAPTIVE_STABLE_STEPS + 1):]
+            ]
+            if all(top == recent[-1] for top in recent):
+                return None, True
+
+        if len(rows):
+            scores = prefix_scores[-1]
+            belief = np.zeros(len(self.careers))
+            leaders = np.argsort(-scores, kind='stable')[:ADAPTIVE_CANDIDATES]
+            belief[leaders] = np.exp((scores[leaders] - scores[leaders].max()) / ADAPTIVE_TEMPERATURE)
+        else:
+            # No evidence yet, so no leaders either: every career is equally likely
+            belief = np.ones(len(self.careers))
+        belief /= belief.sum()
+
+        # joint[q, a, c] = p(c) p(a | q, c); p(a | q) sums out the careers
+        joint = self.answer_likelihood * belief
+        answer_probability = joint.sum(axis=2)
+        posterior = joint / np.where(answer_probability > 0, answer_probability, 1)[:, :, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            posterior_entropy = -np.where(posterior > 0, posterior * np.log(posterior), 0).sum(axis=2)
+            prior_entropy = -np.sum(belief[belief > 0] * np.log(belief[belief > 0]))
+        gain = prior_entropy - (answer_probability * posterior_entropy).sum(axis=1)
+        gain[answered] = -np.inf
+        return int(np.argmax(gain)), False
+
+def compile_quiz(quiz_id):
+    """Build a CompiledQuiz from the database, or None if there is no such active quiz"""
+    try:
+        quiz = CareerQuiz.objects.get(pk=quiz_id, is_active=True)
+    except (CareerQuiz.DoesNotExist, TypeError, ValueError):
+        return None
+
+    answers = list(
+        QuizAnswer.objects.filter(question__quiz=quiz)
+        .select_related('question')
+        .order_by('question__order', 'question_id', 'id')
+    )
+    return CompiledQuiz(quiz, answers, quiz.questions.count())
+
+_compiled_quizzes = generation_cached(QUIZ_GENERATION, compile_quiz)
+
+def get_compiled_quiz(quiz_id):
+    """Return the cached CompiledQuiz for quiz_id, compiling it on first use.
+
+    The cache is dropped whenever the quiz generation changes, i.e. after any
+    quiz, question or answer is saved or deleted (see resources.signals).
+    """
+    try:
+        quiz_id = int(quiz_id)
+    except (TypeError, ValueError):
+        return None
+    return _compiled_quizzes(quiz_id)
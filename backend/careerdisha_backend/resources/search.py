@@ -0,0 +1,228 @@
+"""Full-text search over videos, PDFs and articles using SQLite FTS5.
+
+All searchable content lives in one FTS5 table. A row's rowid encodes both
+the model and the object id (object_id * 4 + kind), so the signal handlers
+that keep the index in sync can replace a document by rowid without
+scanning the table. Synonyms of the words in a document are written to
+its expansions column (see resources.synonyms). Category and the
+parent/featured flags are stored as unindexed columns for filtering and
+facet counts. Results are ranked with BM25, title matches weighing most. On databases without FTS5 the index is
+absent and callers fall back to substring filters.
+"""
+import re
+from django.db import connection
+from .facets import FACET_FIELDS, count_facets, matching_total
+from .models import Tag, Video, PDFResource, Article
+from .synonyms import expansion_text, get_synonym_map, load_groups
+
+SEARCH_TABLE = 'resources_search_index'
+
+# kind code -> (result key, model); codes are part of the stored rowids
+SEARCH_KINDS = {
+    1: ('videos', Video),
+    2: ('pdfs', PDFResource),
+    3: ('articles', Article),
+}
+KIND_CODES = {model: code for code, (_, model) in SEARCH_KINDS.items()}
+SEARCH_TYPES = tuple(key for key, _ in SEARCH_KINDS.values())
+SEARCH_MODELS = {key: model for key, model in SEARCH_KINDS.values()}
+
+# Generation names bumped whenever a model's searchable content changes
+SEARCH_GENERATIONS = {model: f'search:{key}' for key, model in SEARCH_KINDS.values()}
+
+# BM25 weights for the title, description, tags, content and expansions columns
+COLUMN_WEIGHTS = (10.0, 4.0, 6.0, 1.0, 2.0)
+TEXT_COLUMNS = ('title', 'description', 'tags', 'content')
+
+# Relations the serialized results show: tags, and the counters of PDFs and articles
+RESULT_PREFETCH = {Video: ('tags',), PDFResource: ('tags', 'stats'), Article: ('tags', 'stats')}
+
+# Facets of search results; the last three are unindexed columns of the table
+SEARCH_FACET_FIELDS = ('type',) + FACET_FIELDS
+
+_available = None
+
+def search_available():
+    """True when the FTS5 index exists on the default database"""
+    global _available
+    if _available is None:
+        _available = (
+            connection.vendor == 'sqlite'
+            and SEARCH_TABLE in connection.introspection.table_names()
+        )
+    return _available
+
+def document_rowid(model, pk):
+    return pk * 4 + KIND_CODES[model]
+
+def is_searchable(instance):
+    return not isinstance(instance, Article) or instance.is_published
+
+def index_document(instance):
+    """Insert or replace the index entry for a saved video, PDF or article"""
+    if not search_available():
+        return
+    rowid = document_rowid(type(instance), instance.pk)
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [rowid])
+        if is_searchable(instance):
+            text = [
+                instance.title, instance.description,
+                ', '.join(tag.name for tag in instance.tags.all()),
+                getattr(instance, 'content', ''),
+            ]
+            cursor.execute(
+                f'INSERT INTO {SEARCH_TABLE} (rowid, title, description, tags, content, expansions, '
+                f'category, is_parent_content, is_featured) '
+                f'VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)',
+                [rowid, *text, get_synonym_map().expansions(*text),
+                 instance.category, instance.is_parent_content, instance.is_featured]
+            )
+
+def remove_document(model, pk):
+    if not search_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [document_rowid(model, pk)])
+
+def rebuild_index():
+    """Refill the whole index from the content tables.
+
+    For bulk loads, which skip the signals that normally keep it in sync.
+    """
+    if not search_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        for code, (_, model) in SEARCH_KINDS.items():
+            tags = model._meta.get_field('tags')
+            links = tags.remote_field.through._meta.db_table
+            content = 'c.content' if model is Article else "''"
+            published = 'WHERE c.is_published' if model is Article else ''
+            cursor.execute(
+                f'INSERT INTO {SEARCH_TABLE} (rowid, title, description, tags, content, expansions, '
+                f'category, is_parent_content, is_featured) '
+                f'SELECT c.id * 4 + %s, c.title, c.description, '
+                f"(SELECT coalesce(group_concat(t.name, ', '), '') FROM {links} l "
+                f'JOIN {Tag._meta.db_table} t ON t.id = l.{tags.m2m_reverse_name()} '
+                f'WHERE l.{tags.m2m_column_name()} = c.id), '
+                f"{content}, '', c.category, c.is_parent_content, c.is_featured "
+                f'FROM {model._meta.db_table} c {published}',
+                [code]
+            )
+    refresh_expansions()
+    with connection.cursor() as cursor:
+        # Merge the segments written by the bulk insert into one b-tree
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+
+def refresh_expansions():
+    """Rewrite the synonym expansions of every indexed document.
+
+    Run after the synonym groups change. The documents mentioning each term
+    are found through the index itself, so the cost depends on how many
+    documents use the terms, not on the size of the corpus.
+    """
+    if not search_available():
+        return
+    groups = [tuple(terms) for terms in load_groups() if len(terms) > 1]
+    matched, present = {}, {}
+    with connection.cursor() as cursor:
+        for number, terms in enumerate(groups):
+            for term in terms:
+                cursor.execute(
+                    f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s',
+                    [f'{{{" ".join(TEXT_COLUMNS)}}} : "{term}"']
+                )
+                for (rowid,) in cursor.fetchall():
+                    matched.setdefault(rowid, set()).add(number)
+                    present.setdefault(rowid, set()).add(term)
+
+        cursor.execute(f"UPDATE {SEARCH_TABLE} SET expansions = '' WHERE expansions != ''")
+        cursor.executemany(
+            f'UPDATE {SEARCH_TABLE} SET expansions = %s WHERE rowid = %s',
+            [
+                (expansion_text(groups, numbers, present[rowid].__contains__), rowid)
+                for rowid, numbers in matched.items()
+            ]
+        )
+
+# Only the last word is prefix-matched, and only once it is this long;
+# short prefixes expand to so many terms that ranking them gets slow
+MIN_PREFIX_LENGTH = 4
+
+def build_match_query(text):
+    """Turn free text into an FTS5 query requiring every word.
+
+    Words are quoted so user input can't inject FTS5 syntax; the last one
+    also matches as a prefix to keep partially typed queries useful.
+    """
+    words = re.findall(r'\w+', text.lower())
+    terms = [f'"{word}"' for word in words]
+    if words and len(words[-1]) >= MIN_PREFIX_LENGTH:
+        terms[-1] += '*'
+    return ' '.join(terms)
+
+def search(text, limit=10, types=SEARCH_TYPES, filters=None):
+    """Search the index, returning (results, total, facets).
+
+    results maps each requested type to its best `limit` objects in rank
+    order. filters may hold category, is_parent_content and is_featured
+    values. One grouped statement over the matches yields the total and
+    the facet counts, including the content type facet, and one ranking
+    statement picks the top hits; the objects are then loaded by primary
+    key.
+    """
+    filters = dict(filters or {})
+    if len(types) == 1:
+        filters['type'] = types[0]
+    results = {key: [] for key in types}
+    match = build_match_query(text)
+    if not match:
+        return results, 0, count_facets([], filters, SEARCH_FACET_FIELDS)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid %% 4, category, is_parent_content, is_featured, COUNT(*) '
+            f'FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s GROUP BY 1, 2, 3, 4',
+            [match]
+        )
+        facet_rows = [
+            ({
+                'type': SEARCH_KINDS[kind][0],
+                'category': category,
+                'is_parent_content': bool(is_parent_content),
+                'is_featured': bool(is_featured),
+            }, count)
+            for kind, category, is_parent_content, is_featured, count in cursor.fetchall()
+        ]
+        total = matching_total(facet_rows, filters)
+
+        rows = []
+        if total:
+            codes = [code for code, (key, _) in SEARCH_KINDS.items() if key in types]
+            conditions = [f'rowid %% 4 IN ({", ".join(["%s"] * len(codes))})']
+            params = [*COLUMN_WEIGHTS, match, *codes]
+            for field in FACET_FIELDS:
+                if field in filters:
+                    conditions.append(f'{field} = %s')
+                    params.append(filters[field])
+            cursor.execute(
+                f'SELECT kind, object_id FROM ('
+                f'  SELECT rowid %% 4 AS kind, rowid / 4 AS object_id,'
+                f'    ROW_NUMBER() OVER (PARTITION BY rowid %% 4 ORDER BY score) AS position'
+                f'  FROM (SELECT rowid, bm25({SEARCH_TABLE}, {", ".join(["%s"] * len(COLUMN_WEIGHTS))}) AS score'
+                f'        FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s'
+                f'        AND {" AND ".join(conditions)})'
+                f') WHERE position <= %s ORDER BY kind, position',
+                [*params, limit]
+            )
+            rows = cursor.fetchall()
+
+    ranked = {}
+    for kind, object_id in rows:
+        ranked.setdefault(kind, []).append(object_id)
+    for kind, object_ids in ranked.items():
+        key, model = SEARCH_KINDS[kind]
+        objects = model.objects.prefetch_related(*RESULT_PREFETCH[model]).in_bulk(object_ids)
+        results[key] = [objects[object_id] for object_id in object_ids if object_id in objects]
+    return results, total, count_facets(facet_rows, filters, SEARCH_FACET_FIELDS)
@@ -0,0 +1,357 @@
+"""Semantic search over videos, PDFs and articles with latent semantic vectors.
+
+No embedding model ships with the app, so documents are embedded with
+latent semantic analysis: words are hashed into HASH_BUCKETS TF-IDF
+features and projected onto the top singular vectors of a sample of the
+corpus, which puts documents with related vocabulary close together.
+build_index() runs as a batch job (the build_semantic_index command), never
+on save, and writes a build directory holding:
+
+- vectors.f32: unit-length float32 rows, memory-mapped by every worker
+- meta.npz: the rowid of each vector (as in the search index), the idf
+  weights, the projection and the inverted-file (IVF) centroids and list
+  boundaries
+
+Queries are embedded the same way and scored by dot product. Small indexes
+are scanned in full; larger ones only scan the NPROBE lists whose centroids
+are closest to the query.
+"""
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+import zlib
+import numpy as np
+from django.conf import settings
+from .models import Article
+from .search import KIND_CODES, RESULT_PREFETCH, SEARCH_MODELS, SEARCH_TYPES, document_rowid
+
+HASH_BUCKETS = 1 << 16
+DIMENSIONS = 128
+OVERSAMPLING = 16  # extra random directions for the randomized SVD
+POWER_ITERATIONS = 2
+SAMPLE_SIZE = 20000  # documents used to fit the projection
+IVF_MIN_ROWS = 20000  # smaller indexes are scanned in full
+IVF_TRAINING_ROWS = 100000
+KMEANS_ITERATIONS = 10
+NPROBE = 16
+TITLE_WEIGHT = 2  # title words count this many times
+CHUNK_SIZE = 2000
+REFRESH_INTERVAL = 60  # seconds between checks for a newer build
+KEEP_BUILDS = 2
+
+CURRENT_FILE = 'CURRENT'
+
+_buckets = {}
+
+def bucket(word):
+    """Stable hash bucket of a word (the builtin hash() differs between processes)"""
+    number = _buckets.get(word)
+    if number is None:
+        if len(_buckets) > 1000000:
+            _buckets.clear()
+        number = _buckets[word] = zlib.crc32(word.encode()) % HASH_BUCKETS
+    return number
+
+def term_counts(weighted_texts):
+    """Sorted bucket numbers and their weighted counts for [(text, weight)]"""
+    counts = {}
+    for text, weight in weighted_texts:
+        for word in re.findall(r'\w+', text.casefold()):
+            if len(word) > 1:
+                number = bucket(word)
+                counts[number] = counts.get(number, 0) + weight
+    numbers = np.fromiter(sorted(counts), dtype=np.int32, count=len(counts))
+    return numbers, np.array([counts[number] for number in numbers.tolist()], dtype=np.float32)
+
+def document_texts(title, description, tags, content=''):
+    return [(title, TITLE_WEIGHT), (description, 1), (tags, 1), (content, 1)]
+
+def iter_documents():
+    """Yield (rowid, bucket numbers, counts) for every searchable document"""
+    for model in SEARCH_MODELS.values():
+        field = model._meta.get_field('tags')
+        owner = f'{field.m2m_field_name()}_id'
+        tag_names = {}
+        for pk, name in field.remote_field.through.objects.values_list(owner, 'tag__name').iterator(chunk_size=10000):
+            tag_names.setdefault(pk, []).append(name)
+
+        queryset = model.objects.all()
+        fields = ['pk', 'title', 'description']
+        if model is Article:
+            queryset = queryset.filter(is_published=True)
+            fields.append('content')
+        for pk, *text in queryset.values_list(*fields).iterator(chunk_size=CHUNK_SIZE):
+            text.insert(2, ', '.join(tag_names.get(pk, ())))
+            yield (document_rowid(model, pk), *term_counts(document_texts(*text)))
+
+def tfidf(indptr, indices, counts, idf):
+    """Sublinear tf times idf, each row scaled to unit length"""
+    data = (1 + np.log(counts)) * idf[indices]
+    rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    lengths = np.sqrt(np.bincount(rows, weights=data ** 2, minlength=len(indptr) - 1))
+    data /= np.maximum(lengths[rows], 1e-12)
+    return data.astype(np.float32)
+
+def sparse_dot(indptr, indices, data, dense):
+    """(rows x buckets sparse matrix) @ dense, a block of rows at a time"""
+    result = np.zeros((len(indptr) - 1, dense.shape[1]), dtype=np.float32)
+    for start in range(0, len(indptr) - 1, CHUNK_SIZE):
+        stop = min(start + CHUNK_SIZE, len(indptr) - 1)
+        begin, end = indptr[start], indptr[stop]
+        if begin == end:
+            continue
+        contributions = dense[indices[begin:end]] * data[begin:end, None]
+        lengths = np.diff(indptr[start:stop + 1])
+        filled = lengths > 0
+        result[start:stop][filled] = np.add.reduceat(contributions, indptr[start:stop][filled] - begin, axis=0)
+    return result
+
+def sparse_t_dot(indptr, indices, data, dense):
+    """(rows x buckets sparse matrix).T @ dense, summing by bucket"""
+    rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    order = np.argsort(indices, kind='stable')
+    result = np.zeros((HASH_BUCKETS, dense.shape[1]), dtype=np.float32)
+    for start in range(0, len(order), CHUNK_SIZE * 50):
+        block = order[start:start + CHUNK_SIZE * 50]
+        columns, starts = np.unique(indices[block], return_index=True)
+        result[columns] += np.add.reduceat(dense[rows[block]] * data[block, None], starts, axis=0)
+    return result
+
+def fit_projection(indptr, indices, data, rng):
+    """Top right singular vectors of the sample matrix, by randomized SVD"""
+    width = min(DIMENSIONS + OVERSAMPLING, len(indptr) - 1)
+    omega = rng.standard_normal((HASH_BUCKETS, width)).astype(np.float32)
+    y = sparse_dot(indptr, indices, data, omega)
+    for _ in range(POWER_ITERATIONS):
+        q, _ = np.linalg.qr(y)
+        z, _ = np.linalg.qr(sparse_t_dot(indptr, indices, data, q))
+        y = sparse_dot(indptr, indices, data, z)
+    q, _ = np.linalg.qr(y)
+    u, _, _ = np.linalg.svd(sparse_t_dot(indptr, indices, data, q), full_matrices=False)
+    return np.ascontiguousarray(u[:, :DIMENSIONS], dtype=np.float32)
+
+def normalize_rows(vectors):
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    return vectors
+
+def train_centroids(vectors, count, rng):
+    """Spherical k-means on a sample of the vectors"""
+    sample = vectors[np.sort(rng.choice(len(vectors), min(len(vectors), IVF_TRAINING_ROWS), replace=False))]
+    centroids = sample[rng.choice(len(sample), count, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assignment = np.concatenate([
+            (sample[start:start + CHUNK_SIZE] @ centroids.T).argmax(axis=1)
+            for start in range(0, len(sample), CHUNK_SIZE)
+        ])
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        empty = np.bincount(assignment, minlength=count) == 0
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()), replace=False)]
+        centroids = normalize_rows(sums)
+    return centroids
+
+def read_spilled(path, dtype):
+    # numpy can't memory-map an empty file
+    if path.stat().st_size == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r')
+
+def index_root():
+    return settings.SEMANTIC_INDEX_DIR
+
+def build_index(seed=0, log=print):
+    """Embed every document and publish a new build; returns its summary, or None if there is nothing to index"""
+    started = time.monotonic()
+    rng = np.random.default_rng(seed)
+    root = index_root()
+    build = root / f'build-{time.strftime("%Y%m%d%H%M%S")}-{uuid.uuid4().hex[:8]}'
+    build.mkdir(parents=True)
+    try:
+        # Pass 1: tokenize once, spilling the term counts to disk, and
+        # gather document frequencies and a reservoir sample for fitting
+        rowids, lengths, sample = [], [], []
+        document_frequency = np.zeros(HASH_BUCKETS, dtype=np.int64)
+        with open(build / 'terms.i32', 'wb') as terms, open(build / 'counts.f32', 'wb') as counts:
+            for number, (rowid, indices, values) in enumerate(iter_documents()):
+                rowids.append(rowid)
+                lengths.append(len(indices))
+                document_frequency[indices] += 1
+                terms.write(indices.tobytes())
+                counts.write(values.tobytes())
+                if number < SAMPLE_SIZE:
+                    sample.append((indices, values))
+                else:
+                    slot = rng.integers(number + 1)
+                    if slot < SAMPLE_SIZE:
+                        sample[slot] = (indices, values)
+        if not rowids:
+            shutil.rmtree(build)
+            return None
+        total = len(rowids)
+        log(f'Tokenized {total} documents')
+
+        idf = (np.log((1 + total) / (1 + document_frequency)) + 1).astype(np.float32)
+        sample_indptr = np.concatenate([[0], np.cumsum([len(indices) for indices, _ in sample])])
+        sample_indices = np.concatenate([indices for indices, _ in sample])
+        sample_data = tfidf(sample_indptr, sample_indices, np.concatenate([values for _, values in sample]), idf)
+        projection = fit_projection(sample_indptr, sample_indices, sample_data, rng)
+        dimensions = projection.shape[1]
+        log(f'Fitted a {dimensions}-dimensional projection on {len(sample)} documents')
+
+        # Pass 2: embed the spilled term counts a block at a time
+        indptr = np.concatenate([[0], np.cumsum(lengths)])
+        all_terms = read_spilled(build / 'terms.i32', np.int32)
+        all_counts = read_spilled(build / 'counts.f32', np.float32)
+        unordered = np.memmap(build / 'unordered.f32', dtype=np.float32, mode='w+', shape=(total, dimensions))
+        for start in range(0, total, CHUNK_SIZE * 10):
+            stop = min(start + CHUNK_SIZE * 10, total)
+            begin, end = indptr[start], indptr[stop]
+            block_indptr = indptr[start:stop + 1] - begin
+            data = tfidf(block_indptr, all_terms[begin:end], all_counts[begin:end], idf)
+            unordered[start:stop] = normalize_rows(sparse_dot(block_indptr, all_terms[begin:end], data, projection))
+        del all_terms, all_counts
+
+        # Group the rows by inverted list so each list is one contiguous slice
+        if total >= IVF_MIN_ROWS:
+            list_count = int(np.sqrt(total))
+            centroids = train_centroids(unordered, list_count, rng)
+            assignment = np.concatenate([
+                (unordered[start:start + CHUNK_SIZE] @ centroids.T).argmax(axis=1)
+                for start in range(0, total, CHUNK_SIZE)
+            ])
+            order = np.argsort(assignment, kind='stable')
+            offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=list_count))])
+        else:
+            centroids = np.zeros((0, dimensions), dtype=np.float32)
+            order = np.arange(total)
+            offsets = np.array([0, total])
+
+        vectors = np.memmap(build / 'vectors.f32', dtype=np.float32, mode='w+', shape=(total, dimensions))
+        for start in range(0, total, CHUNK_SIZE * 10):
+            vectors[start:start + CHUNK_SIZE * 10] = unordered[order[start:start + CHUNK_SIZE * 10]]
+        vectors.flush()
+        del vectors, unordered
+        np.savez(
+            build / 'meta.npz', rowids=np.array(rowids, dtype=np.int64)[order], idf=idf,
+            projection=projection, centroids=centroids, offsets=offsets
+        )
+        for name in ('terms.i32', 'counts.f32', 'unordered.f32'):
+            (build / name).unlink()
+    except BaseException:
+        shutil.rmtree(build, ignore_errors=True)
+        raise
+
+    publish(root, build.name)
+    return {
+        'build': build.name,
+        'documents': total,
+        'dimensions': dimensions,
+        'lists': len(centroids) or 1,
+        'seconds': round(time.monotonic() - started, 1),
+    }
+
+def publish(root, name):
+    """Point CURRENT at a finished build and delete the oldest ones"""
+    pointer = root / f'{CURRENT_FILE}.{uuid.uuid4().hex}'
+    pointer.write_text(name)
+    os.replace(pointer, root / CURRENT_FILE)
+    builds = sorted(path for path in root.glob('build-*') if path.is_dir())
+    for path in builds[:-KEEP_BUILDS]:
+        if path.name != name:
+            shutil.rmtree(path, ignore_errors=True)
+
+class SemanticIndex:
+    """A published build: the memory-mapped vectors plus what is needed to embed queries"""
+
+    def __init__(self, path):
+        with np.load(path / 'meta.npz') as meta:
+            self.rowids = meta['rowids']
+            self.idf = meta['idf']
+            self.projection = meta['projection']
+            self.centroids = meta['centroids']
+            self.offsets = meta['offsets']
+        self.vectors = np.memmap(
+            path / 'vectors.f32', dtype=np.float32, mode='r',
+            shape=(len(self.rowids), self.projection.shape[1])
+        )
+
+    def __len__(self):
+        return len(self.rowids)
+
+    def embed(self, text):
+        """Unit query vector, or None when no word of the text carries any weight"""
+        indices, counts = term_counts([(text, 1)])
+        if not len(indices):
+            return None
+        data = tfidf(np.array([0, len(indices)]), indices, counts, self.idf)
+        vector = sparse_dot(np.array([0, len(indices)]), indices, data, self.projection)[0]
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else None
+
+    def nearest(self, text, limit=10, types=SEARCH_TYPES):
+        """Map each requested type to its best (object_id, score) pairs"""
+        query = self.embed(text)
+        if query is None:
+            return {key: [] for key in types}
+        if len(self.centroids):
+            probed = np.argsort(-(self.centroids @ query))[:NPROBE]
+            ranges = [(self.offsets[number], self.offsets[number + 1]) for number in probed]
+        else:
+            ranges = [(0, len(self.rowids))]
+
+        rows = np.concatenate([np.arange(start, stop) for start, stop in ranges])
+        scores = np.concatenate([self.vectors[start:stop] @ query for start, stop in ranges])
+        kinds = self.rowids[rows] % 4
+        matches = {}
+        for key in types:
+            selected = np.flatnonzero(kinds == KIND_CODES[SEARCH_MODELS[key]])
+            if len(selected) > limit:
+                selected = selected[np.argpartition(-scores[selected], limit)[:limit]]
+            selected = selected[np.argsort(-scores[selected])]
+            matches[key] = [(int(self.rowids[rows[i]] // 4), float(scores[i])) for i in selected]
+        return matches
+
+_loaded = None  # (checked at, build name, SemanticIndex or None)
+_lock = threading.Lock()
+
+def get_semantic_index():
+    """Return the latest published build, or None before the first one"""
+    global _loaded
+
+    entry = _loaded
+    if entry is None or time.monotonic() - entry[0] > REFRESH_INTERVAL:
+        try:
+            name = (index_root() / CURRENT_FILE).read_text().strip()
+        except FileNotFoundError:
+            name = None
+        if entry is not None and entry[1] == name:
+            index = entry[2]
+        else:
+            index = SemanticIndex(index_root() / name) if name else None
+        entry = (time.monotonic(), name, index)
+        with _lock:
+            _loaded = entry
+    return entry[2]
+
+def semantic_search(text, limit=10, types=SEARCH_TYPES):
+    """Return {type: [(object, score)]} for the documents closest in meaning to text, or None without an index.
+
+    Objects deleted or unpublished since the last build are skipped.
+    """
+    index = get_semantic_index()
+    if index is None:
+        return None
+    # A few spare candidates cover objects that have gone since the build
+    matches = index.nearest(text, limit + 5, types)
+    results = {}
+    for key in types:
+        model = SEARCH_MODELS[key]
+        queryset = model.objects.prefetch_related(*RESULT_PREFETCH[model])
+        if model is Article:
+            queryset = queryset.filter(is_published=True)
+        objects = queryset.in_bulk([pk for pk, _ in matches[key]])
+        results[key] = [(objects[pk], score) for pk, score in matches[key] if pk in objects][:limit]
+    return results
@@ -1,7 +1,19 @@
 from rest_framework import serializers
 from .models import Video, PDFResource, Article, CareerQuiz, QuizQuestion, QuizAnswer, Scholarship, College
 
+class TagNamesField(serializers.Field):
+    """An item's tag names joined with commas, the shape tags had before they became a model"""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, tags):
+        return ', '.join(tag.name for tag in tags.all())
+
 class VideoSerializer(serializers.ModelSerializer):
+    tags = TagNamesField()
+    tag_slugs = serializers.SlugRelatedField(source='tags', many=True, read_only=True, slug_field='slug')
     thumbnail_url = serializers.SerializerMethodField()
     embed_url = serializers.SerializerMethodField()
     video_id = serializers.SerializerMethodField()
@@ -11,7 +23,7 @@ class VideoSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'title', 'youtube_url', 'description', 'duration', 'views',
             'category', 'is_parent_content', 'is_featured', 'ai_generated_summary',
-            'tags', 'uploaded_at', 'thumbnail_url', 'embed_url', 'video_id'
+            'tags', 'tag_slugs', 'uploaded_at', 'thumbnail_url', 'embed_url', 'video_id'
         ]
     
     def get_thumbnail_url(self, obj):
@@ -24,6 +36,8 @@ class VideoSerializer(serializers.ModelSerializer):
         return obj.get_video_id()
 
 class PDFResourceSerializer(serializers.ModelSerializer):
+    tags = TagNamesField()
+    tag_slugs = serializers.SlugRelatedField(source='tags', many=True, read_only=True, slug_field='slug')
     file_size_display = serializers.SerializerMethodField()
     download_url = serializers.SerializerMethodField()
     
@@ -32,7 +46,7 @@ class PDFResourceSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'title', 'file', 'description', 'pages', 'file_size',
             'category', 'is_parent_content', 'is_featured', 'download_count',
-            'ai_generated_summary', 'tags', 'uploaded_at', 'file_size_display',
+            'ai_generated_summary', 'tags', 'tag_slugs', 'uploaded_at', 'file_size_display',
             'download_url'
         ]
     
@@ -47,6 +61,8 @@ class PDFResourceSerializer(serializers.ModelSerializer):
         return None
 
 class ArticleSerializer(serializers.ModelSerializer):
+    tags = TagNamesField()
+    tag_slugs = serializers.SlugRelatedField(source='tags', many=True, read_only=True, slug_field='slug')
     excerpt = serializers.SerializerMethodField()
     
     class Meta:
@@ -54,7 +70,7 @@ class ArticleSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'title', 'description', 'content', 'read_time', 'author',
             'category', 'is_parent_content', 'is_featured', 'is_published',
-            'view_count', 'ai_enhanced_content', 'tags', 'uploaded_at',
+            'view_count', 'ai_enhanced_content', 'tags', 'tag_slugs', 'uploaded_at',
             'excerpt'
         ]
     
@@ -68,7 +84,7 @@ class ArticleListSerializer(ArticleSerializer):
         fields = [
             'id', 'title', 'description', 'read_time', 'author',
             'category', 'is_parent_content', 'is_featured', 'is_published',
-            'view_count', 'tags', 'uploaded_at', 'excerpt'
+            'view_count', 'tags', 'tag_slugs', 'uploaded_at', 'excerpt'
         ]
 
 class QuizAnswerSerializer(serializers.ModelSerializer):
@@ -89,16 +105,19 @@ class CareerQuizSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = CareerQuiz
-        fields = ['id', 'title', 'description', 'is_active', 'created_at', 'questions', 'question_count']
+        fields = ['id', 'title', 'description', 'is_active', 'version', 'created_at', 'questions', 'question_count']
     
     def get_question_count(self, obj):
+        # Reuse prefetched questions instead of issuing another COUNT
+        if 'questions' in getattr(obj, '_prefetched_objects_cache', {}):
+            return len(obj.questions.all())
         return obj.questions.count()
 
 class CareerQuizListSerializer(CareerQuizSerializer):
     """Serializer for quiz list view (excludes questions)"""
     class Meta:
         model = CareerQuiz
-        fields = ['id', 'title', 'description', 'is_active', 'created_at', 'question_count']
+        fields = ['id', 'title', 'description', 'is_active', 'version', 'created_at', 'question_count']
 
 class ScholarshipSerializer(serializers.ModelSerializer):
     formatted_amount = serializers.SerializerMethodField()
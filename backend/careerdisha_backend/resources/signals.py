@@ -0,0 +1,104 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from .caching import bump_generation
+from .careers import CAREER_GENERATION
+from .models import Tag, SynonymGroup, Video, PDFResource, Article, College, Scholarship, Career, CareerQuiz, QuizQuestion, QuizAnswer
+from .scoring import QUIZ_GENERATION
+from .search import SEARCH_GENERATIONS, index_document, refresh_expansions, remove_document
+from .suggest import update_suggestions
+from .synonyms import SYNONYM_GENERATION
+
+@receiver([post_save, post_delete], sender=CareerQuiz)
+@receiver([post_save, post_delete], sender=QuizQuestion)
+@receiver([post_save, post_delete], sender=QuizAnswer)
+def invalidate_compiled_quizzes(sender, **kwargs):
+    """Drop compiled quiz matrices whenever quiz content changes"""
+    bump_generation(QUIZ_GENERATION)
+
+@receiver([post_save, post_delete], sender=Career)
+def invalidate_career_catalog(sender, **kwargs):
+    """Reload the career catalog on the next recommendation after an edit"""
+    bump_generation(CAREER_GENERATION)
+
+@receiver(post_save, sender=Video)
+@receiver(post_save, sender=PDFResource)
+@receiver(post_save, sender=Article)
+def update_search_index(sender, instance, **kwargs):
+    """Re-index content whose searchable text may have changed"""
+    index_document(instance)
+    bump_generation(SEARCH_GENERATIONS[sender])
+
+def reindex_tagged_content(instance):
+    """Refresh the search and typeahead entries of an item whose tags changed"""
+    index_document(instance)
+    bump_generation(SEARCH_GENERATIONS[type(instance)])
+    transaction.on_commit(lambda: update_suggestions(instance))
+
+@receiver(m2m_changed, sender=Video.tags.through)
+@receiver(m2m_changed, sender=PDFResource.tags.through)
+@receiver(m2m_changed, sender=Article.tags.through)
+def update_content_tags(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        reindex_tagged_content(instance)
+    elif pk_set:
+        # tag.videos.add(...) and friends: instance is the Tag
+        for item in model.objects.filter(pk__in=pk_set):
+            reindex_tagged_content(item)
+
+@receiver(post_save, sender=Tag)
+def rename_tag(sender, instance, created, **kwargs):
+    if created:
+        return
+    for model in SEARCH_GENERATIONS:
+        for item in model.objects.filter(tags=instance):
+            reindex_tagged_content(item)
+
+@receiver(pre_delete, sender=Tag)
+def collect_tagged_content(sender, instance, **kwargs):
+    # The links are gone by post_delete, so remember who used the tag
+    instance._tagged_content = [
+        item for model in SEARCH_GENERATIONS for item in model.objects.filter(tags=instance)
+    ]
+
+@receiver(post_delete, sender=Tag)
+def delete_tag(sender, instance, **kwargs):
+    for item in getattr(instance, '_tagged_content', []):
+        reindex_tagged_content(item)
+
+@receiver(post_delete, sender=Video)
+@receiver(post_delete, sender=PDFResource)
+@receiver(post_delete, sender=Article)
+def remove_from_search_index(sender, instance, **kwargs):
+    remove_document(sender, instance.pk)
+    bump_generation(SEARCH_GENERATIONS[sender])
+
+@receiver(post_save, sender=Video)
+@receiver(post_save, sender=PDFResource)
+@receiver(post_save, sender=Article)
+@receiver(post_save, sender=College)
+@receiver(post_save, sender=Scholarship)
+def update_suggest_index(sender, instance, **kwargs):
+    """Keep typeahead suggestions in step with titles, tags and names"""
+    transaction.on_commit(lambda: update_suggestions(instance))
+
+@receiver(post_delete, sender=Video)
+@receiver(post_delete, sender=PDFResource)
+@receiver(post_delete, sender=Article)
+@receiver(post_delete, sender=College)
+@receiver(post_delete, sender=Scholarship)
+def remove_from_suggest_index(sender, instance, **kwargs):
+    transaction.on_commit(lambda: update_suggestions(instance, deleted=True))
+
+def apply_synonyms():
+    bump_generation(SYNONYM_GENERATION)
+    refresh_expansions()
+    for name in SEARCH_GENERATIONS.values():
+        bump_generation(name)
+
+@receiver([post_save, post_delete], sender=SynonymGroup)
+def update_synonyms(sender, **kwargs):
+    """Re-expand the indexed documents once the synonym edit is committed"""
+    transaction.on_commit(apply_synonyms)
@@ -0,0 +1,276 @@
+"""Mergeable streaming sketches: KLL quantiles, Count-Min counts, heavy hitters and HyperLogLog.
+
+A KLL sketch summarizes a stream of numbers in O(k log(n/k)) space and
+answers rank queries with an error of roughly 1.7/k of the stream size.
+Items live in a stack of compactors: an item at level h stands for 2**h
+original values, and a full level is sorted and every other item promoted
+to the level above. Sketches built separately (e.g. by different workers)
+merge into a sketch of the combined stream.
+
+A Count-Min sketch estimates how often each item of a stream occurred in a
+fixed-size table of counters; HeavyHitters pairs one with a heap to keep
+the k most frequent items.
+
+A HyperLogLog sketch estimates how many distinct items a stream contained
+from 2**precision one-byte registers, each holding the longest run of
+leading zero bits seen among the hashes routed to it; the relative error
+is about 1.04 / sqrt(2**precision). Merging is a register-wise maximum.
+"""
+import hashlib
+import heapq
+import math
+import random
+import numpy as np
+
+DEFAULT_K = 200
+CAPACITY_DECAY = 2 / 3
+
+class KLLSketch:
+    """Mergeable, JSON-serializable quantile sketch"""
+
+    def __init__(self, k=DEFAULT_K, levels=None, count=0):
+        self.k = k
+        self.levels = [list(level) for level in levels] if levels else [[]]
+        self.count = count
+        self._random = random.Random()
+        self._ranks = None
+
+    def __len__(self):
+        return self.count
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * CAPACITY_DECAY ** depth)))
+
+    def _compress(self):
+        while sum(len(level) for level in self.levels) > sum(self._capacity(h) for h in range(len(self.levels))):
+            for h, items in enumerate(self.levels):
+                if len(items) >= self._capacity(h):
+                    if h + 1 == len(self.levels):
+                        self.levels.append([])
+                    items.sort()
+                    leftover = [items.pop()] if len(items) % 2 else []
+                    self.levels[h + 1].extend(items[self._random.getrandbits(1)::2])
+                    self.levels[h] = leftover
+                    break
+        self._ranks = None
+
+    def update(self, value):
+        self.levels[0].append(float(value))
+        self.count += 1
+        if len(self.levels[0]) >= self._capacity(0):
+            self._compress()
+        self._ranks = None
+
+    def update_many(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        self.levels[0].extend(values.tolist())
+        self.count += len(values)
+        self._compress()
+
+    def merge(self, other):
+        """Fold another sketch into this one"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for h, items in enumerate(other.levels):
+            self.levels[h].extend(items)
+        self.count += other.count
+        self._compress()
+
+    def _rank_table(self):
+        if self._ranks is None:
+            values = np.fromiter(
+                (value for level in self.levels for value in level), dtype=np.float64
+            )
+            weights = np.concatenate([
+                np.full(len(level), 2 ** h, dtype=np.float64) for h, level in enumerate(self.levels)
+            ])
+            order = np.argsort(values, kind='stable')
+            self._ranks = (values[order], np.concatenate([[0.0], np.cumsum(weights[order])]))
+        return self._ranks
+
+    def percentile(self, value):
+        """Percentage of the stream below value, counting ties as half below"""
+        values, cumulative = self._rank_table()
+        if not len(values):
+            return None
+        below = cumulative[np.searchsorted(values, value, side='left')]
+        through = cumulative[np.searchsorted(values, value, side='right')]
+        return (below + through) / 2 / cumulative[-1] * 100
+
+    def quantile(self, q):
+        """Approximate value at quantile q (0 to 1)"""
+        values, cumulative = self._rank_table()
+        if not len(values):
+            return None
+        position = np.searchsorted(cumulative[1:], q * cumulative[-1], side='left')
+        return values[min(position, len(values) - 1)].item()
+
+    def to_dict(self):
+        return {'k': self.k, 'count': self.count, 'levels': self.levels}
+
+    @classmethod
+    def from_dict(cls, data):
+        data = data or {}
+        return cls(k=data.get('k', DEFAULT_K), levels=data.get('levels'), count=data.get('count', 0))
+
+class CountMinSketch:
+    """Approximate item counts in depth x width counters.
+
+    Estimates never undercount, and overcount by more than e/width of the
+    stream total with probability at most e**-depth.
+    """
+
+    def __init__(self, width=2048, depth=4):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+        self._rows = np.arange(depth)
+
+    def __len__(self):
+        return self.total
+
+    def _columns(self, item):
+        digest = hashlib.blake2b(repr(item).encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return [(first + row * second) % self.width for row in range(self.depth)]
+
+    def add(self, item, count=1):
+        """Count an item and return its new estimate"""
+        columns = self._columns(item)
+        self.table[self._rows, columns] += count
+        self.total += count
+        return int(self.table[self._rows, columns].min())
+
+    def estimate(self, item):
+        return int(self.table[self._rows, self._columns(item)].min())
+
+    def merge(self, other):
+        if self.table.shape != other.table.shape:
+            raise ValueError('Count-Min sketches of different sizes cannot be merged')
+        self.table += other.table
+        self.total += other.total
+
+class HeavyHitters:
+    """The k most frequent items of a stream, by Count-Min estimate.
+
+    Candidates sit in a min-heap keyed by their estimate; a new item only
+    displaces the smallest candidate once its own estimate is larger.
+    Updating a candidate pushes a fresh heap entry and the outdated one is
+    skipped when it reaches the top.
+    """
+
+    def __init__(self, k=100, width=2048, depth=4):
+        self.k = k
+        self.sketch = CountMinSketch(width, depth)
+        self.top = {}  # candidate -> current estimate
+        self._heap = []
+
+    def __len__(self):
+        return len(self.sketch)
+
+    def _rebuild_heap(self):
+        self._heap = [(estimate, item) for item, estimate in self.top.items()]
+        heapq.heapify(self._heap)
+
+    def _smallest(self):
+        while self._heap and self.top.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0]
+
+    def add(self, item, count=1):
+        estimate = self.sketch.add(item, count)
+        if item not in self.top and len(self.top) >= self.k:
+            smallest, evicted = self._smallest()
+            if estimate <= smallest:
+                return
+            heapq.heappop(self._heap)
+            del self.top[evicted]
+        self.top[item] = estimate
+        heapq.heappush(self._heap, (estimate, item))
+        if len(self._heap) > 4 * self.k:
+            self._rebuild_heap()
+
+    def estimate(self, item):
+        return self.sketch.estimate(item)
+
+    def items(self):
+        """(item, estimated count) pairs, most frequent first"""
+        return sorted(self.top.items(), key=lambda pair: -pair[1])
+
+    def merge(self, other):
+        """Fold in another tracker built with the same k and sketch size"""
+        self.sketch.merge(other.sketch)
+        candidates = set(self.top) | set(other.top)
+        estimates = {item: self.sketch.estimate(item) for item in candidates}
+        self.top = dict(sorted(estimates.items(), key=lambda pair: -pair[1])[:self.k])
+        self._rebuild_heap()
+
+HLL_PRECISION = 12  # 4096 registers, about 1.6% error
+
+class HyperLogLog:
+    """Distinct-count sketch over 64-bit hashes, serializable to a few bytes when sparse"""
+
+    DENSE, SPARSE = 0, 1
+
+    def __init__(self, precision=HLL_PRECISION, registers=None):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = registers if registers is not None else np.zeros(self.size, dtype=np.uint8)
+
+    def __len__(self):
+        return self.count()
+
+    def add_hash(self, value):
+        """Add an item by its 64-bit hash"""
+        rest_bits = 64 - self.precision
+        index = value >> rest_bits
+        rest = value & ((1 << rest_bits) - 1)
+        rank = rest_bits - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def add(self, item):
+        self.add_hash(hash64(item))
+
+    def merge(self, other):
+        if self.precision != other.precision:
+            raise ValueError('HyperLogLog sketches of different precisions cannot be merged')
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self):
+        """Estimated number of distinct items added"""
+        m = self.size
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / np.ldexp(1.0, -self.registers.astype(np.int64)).sum()
+        zeros = m - np.count_nonzero(self.registers)
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate while many registers are still empty
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self):
+        """Precision byte, format byte, then all registers or (index, value) pairs of the set ones"""
+        indexes = np.flatnonzero(self.registers)
+        if len(indexes) * 3 < self.size:
+            pairs = np.zeros(len(indexes), dtype=[('index', '<u2'), ('value', 'u1')])
+            pairs['index'], pairs['value'] = indexes, self.registers[indexes]
+            return bytes([self.precision, self.SPARSE]) + pairs.tobytes()
+        return bytes([self.precision, self.DENSE]) + self.registers.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        if not data:
+            return cls()
+        data = bytes(data)
+        sketch = cls(precision=data[0])
+        if data[1] == cls.SPARSE:
+            pairs = np.frombuffer(data, dtype=[('index', '<u2'), ('value', 'u1')], offset=2)
+            sketch.registers[pairs['index']] = pairs['value']
+        else:
+            sketch.registers[:] = np.frombuffer(data, dtype=np.uint8, offset=2)
+        return sketch
+
+def hash64(item, key=b''):
+    """64-bit hash of an item; with a key, the hash can't be recomputed without it"""
+    return int.from_bytes(hashlib.blake2b(repr(item).encode(), digest_size=8, key=key).digest(), 'little')
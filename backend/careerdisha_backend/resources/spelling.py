@@ -0,0 +1,190 @@
+"""Spelling correction for search queries using a symmetric-delete dictionary.
+
+Every word of the content titles, tag names, career names and synonyms is
+stored together with the strings obtained by deleting up to MAX_DISTANCE of
+its characters. A misspelled term generates its own deletes and looks them up,
+so finding candidates is a handful of dict lookups rather than a scan of
+the vocabulary; only those few candidates get a real edit distance check.
+Deletes are taken from the first PREFIX_LENGTH characters only, which keeps
+the dictionary small without losing corrections of long words.
+
+Like the typeahead index, the dictionary is only built in a background
+thread per worker, at most once per MIN_REBUILD_INTERVAL after content
+edits and every MAX_INDEX_AGE; corrections keep using the current one
+meanwhile.
+"""
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from django.db import close_old_connections
+from .caching import get_generation
+from .careers import CAREER_GENERATION
+from .models import Tag, SynonymGroup, Video, PDFResource, Article, Career
+from .search import SEARCH_GENERATIONS
+
+logger = logging.getLogger(__name__)
+
+MAX_DISTANCE = 2
+PREFIX_LENGTH = 7
+MIN_WORD_LENGTH = 4  # shorter terms are too ambiguous to correct
+MIN_REBUILD_INTERVAL = 60  # seconds between rebuilds after content edits
+MAX_INDEX_AGE = 3600
+CHECK_INTERVAL = 5  # seconds between the refresher thread's generation checks
+
+def words_in(text):
+    return re.findall(r'\w+', text.casefold())
+
+def delete_levels(word, distance):
+    """Strings made by removing characters from word, grouped by how many were removed"""
+    levels, seen = [{word}], {word}
+    for _ in range(distance):
+        level = {text[:i] + text[i + 1:] for text in levels[-1] if len(text) > 1 for i in range(len(text))} - seen
+        seen |= level
+        levels.append(level)
+    return levels
+
+def deletes(word, distance):
+    """Every string made by removing up to distance characters from word"""
+    return set().union(*delete_levels(word, distance))
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance (adjacent swaps count as one edit), capped at limit + 1.
+
+    Only the diagonal band of cells within limit of each other is filled
+    in, since anything outside it is already over the limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    over = limit + 1
+    before, previous_row = None, [j if j <= limit else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        row = [i if i <= limit else over] + [over] * len(b)
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            distance = min(previous_row[j] + 1, row[j - 1] + 1, previous_row[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                distance = min(distance, before[j - 2] + 1)
+            row[j] = min(distance, over)
+        if min(row) > limit:
+            return over
+        before, previous_row = previous_row, row
+    return previous_row[-1]
+
+def max_distance_for(word):
+    return 1 if len(word) <= 5 else MAX_DISTANCE
+
+def is_correctable(word):
+    return len(word) >= MIN_WORD_LENGTH and not any(char.isdigit() for char in word)
+
+class SpellingIndex:
+    """Word frequencies plus the delete -> words map used to find candidates"""
+
+    def __init__(self, generation, counts):
+        self.generation = generation
+        self.built_at = time.monotonic()
+        self.counts = counts
+        self.candidates = {}
+        for word in counts:
+            if is_correctable(word):
+                for variant in deletes(word[:PREFIX_LENGTH], MAX_DISTANCE):
+                    self.candidates.setdefault(variant, []).append(word)
+
+    def __len__(self):
+        return len(self.counts)
+
+    def correct_word(self, word):
+        """The closest, then most frequent, known word within range; word itself if known or hopeless"""
+        if word in self.counts or not is_correctable(word):
+            return word
+        limit = max_distance_for(word)
+        best, checked = None, set()
+        for removed, variants in enumerate(delete_levels(word[:PREFIX_LENGTH], limit)):
+            # Words found through more deletes can't be closer than one already found
+            if best is not None and removed > best[0]:
+                break
+            for variant in variants:
+                for candidate in self.candidates.get(variant, ()):
+                    # A word is usually reachable through several of the deletes
+                    if candidate in checked:
+                        continue
+                    checked.add(candidate)
+                    distance = edit_distance(word, candidate, limit if best is None else best[0])
+                    if distance <= limit:
+                        rank = (distance, -self.counts[candidate], candidate)
+                        if best is None or rank < best:
+                            best = rank
+        return best[2] if best else word
+
+    def correct(self, text):
+        """Return the corrected query, or None when every word is already known"""
+        words = words_in(text)
+        corrected = [self.correct_word(word) for word in words]
+        return ' '.join(corrected) if corrected != words else None
+
+def build_index(generation):
+    counts = Counter()
+    sources = [
+        Video.objects.values_list('title', flat=True),
+        PDFResource.objects.values_list('title', flat=True),
+        Article.objects.filter(is_published=True).values_list('title', flat=True),
+        Tag.objects.values_list('name', flat=True),
+        Career.objects.values_list('name', flat=True),
+        SynonymGroup.objects.filter(is_active=True).values_list('terms', flat=True),
+    ]
+    for queryset in sources:
+        for text in queryset.iterator(chunk_size=5000):
+            counts.update(words_in(text))
+    return SpellingIndex(generation, counts)
+
+_index = None
+_lock = threading.Lock()
+_wakeup = threading.Event()
+_thread = None
+
+def current_generation():
+    return tuple(get_generation(name) for name in (*SEARCH_GENERATIONS.values(), CAREER_GENERATION))
+
+def is_stale(index):
+    if index is None:
+        return True
+    age = time.monotonic() - index.built_at
+    return age > MAX_INDEX_AGE or (index.generation != current_generation() and age > MIN_REBUILD_INTERVAL)
+
+def rebuild():
+    """Build a fresh dictionary from the database and swap it in"""
+    global _index
+
+    _index = build_index(current_generation())
+
+def _run():
+    while True:
+        try:
+            if is_stale(_index):
+                rebuild()
+        except Exception:
+            logger.exception('Rebuilding the spelling dictionary failed')
+        finally:
+            # There is no request cycle in this thread to recycle its connection
+            close_old_connections()
+        _wakeup.wait(CHECK_INTERVAL)
+        _wakeup.clear()
+
+def start_refresher():
+    """Start this worker's refresher thread on first use"""
+    global _thread
+
+    if _thread is None:
+        with _lock:
+            if _thread is None:
+                _thread = threading.Thread(target=_run, name='spelling-refresher', daemon=True)
+                _thread.start()
+
+def get_spelling_index():
+    """Return this worker's current dictionary; empty (correcting nothing) until the first build finishes"""
+    start_refresher()
+    index = _index
+    return index if index is not None else SpellingIndex(None, Counter())
+
+def correct_query(text):
+    return get_spelling_index().correct(text)
@@ -0,0 +1,234 @@
+"""In-memory typeahead index over titles, tags, college names and scholarships.
+
+Phrases are stored in one sorted list of (key, type, text) entries, with a
+key for the whole phrase and one for every later word in it, so a prefix
+lookup is a bisect plus a short forward scan and never touches the
+database. Each worker updates its index in place from the save/delete
+signals. Builds only happen in a background thread per worker, which
+swaps in a fresh index when another worker's edit has bumped the
+generation token or the index is MAX_INDEX_AGE old; lookups keep using
+the current index meanwhile.
+"""
+import bisect
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from django.db import close_old_connections
+from .caching import bump_generation, get_generation
+from .models import Video, PDFResource, Article, College, Scholarship
+
+logger = logging.getLogger(__name__)
+
+SUGGEST_GENERATION = 'suggest'
+MAX_INDEX_AGE = 600  # seconds before a full rebuild, catching missed updates
+CHECK_INTERVAL = 5  # seconds between the refresher thread's generation checks
+MAX_WORD_KEYS = 8  # word-start keys per phrase
+MAX_SCANNED = 200  # entries examined per lookup
+
+SUGGEST_TYPES = {
+    Video: 'video',
+    PDFResource: 'pdf',
+    Article: 'article',
+    College: 'college',
+    Scholarship: 'scholarship',
+}
+
+def normalize(text):
+    return ' '.join(re.findall(r'\w+', text.casefold()))
+
+def phrases_for(instance):
+    """The (type, text) phrases an object contributes to the index"""
+    if isinstance(instance, College):
+        return [('college', instance.name)]
+    if isinstance(instance, Scholarship):
+        return [('scholarship', instance.title)] if instance.is_active else []
+    if isinstance(instance, Article) and not instance.is_published:
+        return []
+    phrases = [(SUGGEST_TYPES[type(instance)], instance.title)]
+    phrases.extend(('tag', tag.name) for tag in instance.tags.all())
+    return phrases
+
+class SuggestIndex:
+    """Sorted-array prefix index; phrases shared by several objects are counted"""
+
+    def __init__(self, generation):
+        self.generation = generation
+        self.built_at = time.monotonic()
+        self.entries = []
+        self.counts = Counter()  # (type, text) -> number of objects using it
+        self.sources = {}  # (model label, pk) -> tuple of phrases
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.counts)
+
+    @staticmethod
+    def keys_for(phrase):
+        words = normalize(phrase[1]).split()
+        return [' '.join(words[start:]) for start in range(min(len(words), MAX_WORD_KEYS))]
+
+    def load(self, sources):
+        """Bulk-load {(model label, pk): phrases} into an empty index"""
+        self.sources = {source: tuple(phrases) for source, phrases in sources.items()}
+        for phrases in self.sources.values():
+            self.counts.update(phrases)
+        self.entries = sorted(
+            (key, phrase_type, text)
+            for phrase_type, text in self.counts
+            for key in self.keys_for((phrase_type, text))
+        )
+
+    def _add(self, phrase):
+        self.counts[phrase] += 1
+        if self.counts[phrase] == 1:
+            for key in self.keys_for(phrase):
+                bisect.insort(self.entries, (key, *phrase))
+
+    def _remove(self, phrase):
+        self.counts[phrase] -= 1
+        if self.counts[phrase] <= 0:
+            del self.counts[phrase]
+            for key in self.keys_for(phrase):
+                position = bisect.bisect_left(self.entries, (key, *phrase))
+                if position < len(self.entries) and self.entries[position] == (key, *phrase):
+                    del self.entries[position]
+
+    def replace(self, source, phrases):
+        """Swap the phrases of one object; returns whether anything changed"""
+        phrases = tuple(phrases)
+        with self.lock:
+            previous = self.sources.get(source, ())
+            if previous == phrases:
+                return False
+            for phrase in previous:
+                self._remove(phrase)
+            for phrase in phrases:
+                self._add(phrase)
+            if phrases:
+                self.sources[source] = phrases
+            else:
+                self.sources.pop(source, None)
+            return True
+
+    def suggest(self, prefix, limit=10, types=None):
+        """Phrases with a word starting with prefix, whole-phrase matches first"""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        with self.lock:
+            start = bisect.bisect_left(self.entries, (prefix,))
+            matches = []
+            for key, phrase_type, text in self.entries[start:start + MAX_SCANNED]:
+                if not key.startswith(prefix):
+                    break
+                if types is None or phrase_type in types:
+                    phrase = (phrase_type, text)
+                    matches.append((key != normalize(text), -self.counts[phrase], len(text), text, phrase_type))
+
+        suggestions, seen = [], set()
+        for _, _, _, text, phrase_type in sorted(matches):
+            if (phrase_type, text) not in seen:
+                seen.add((phrase_type, text))
+                suggestions.append({'text': text, 'type': phrase_type})
+                if len(suggestions) == limit:
+                    break
+        return suggestions
+
+def source_key(instance):
+    return (instance._meta.label, instance.pk)
+
+def build_index(generation):
+    index = SuggestIndex(generation)
+    querysets = [
+        Video.objects.only('title').prefetch_related('tags'),
+        PDFResource.objects.only('title').prefetch_related('tags'),
+        Article.objects.filter(is_published=True).only('title', 'is_published').prefetch_related('tags'),
+        College.objects.only('name'),
+        Scholarship.objects.filter(is_active=True).only('title', 'is_active'),
+    ]
+    index.load({
+        source_key(instance): phrases_for(instance)
+        for queryset in querysets
+        for instance in queryset.iterator(chunk_size=2000)
+    })
+    return index
+
+_index = None
+_lock = threading.Lock()
+_replay = None  # edits this worker made while a rebuild was running
+_wakeup = threading.Event()
+_thread = None
+
+def is_stale(index):
+    return (
+        index is None
+        or index.generation != get_generation(SUGGEST_GENERATION)
+        or time.monotonic() - index.built_at > MAX_INDEX_AGE
+    )
+
+def rebuild():
+    """Build a fresh index from the database and swap it in"""
+    global _index, _replay
+
+    with _lock:
+        _replay = []
+    try:
+        index = build_index(get_generation(SUGGEST_GENERATION))
+    except Exception:
+        with _lock:
+            _replay = None
+        raise
+    with _lock:
+        # The build may have read the database before these edits committed
+        for source, phrases in _replay:
+            index.replace(source, phrases)
+        _index, _replay = index, None
+
+def _run():
+    while True:
+        try:
+            if is_stale(_index):
+                rebuild()
+        except Exception:
+            logger.exception('Rebuilding the suggestion index failed')
+        finally:
+            # There is no request cycle in this thread to recycle its connection
+            close_old_connections()
+        _wakeup.wait(CHECK_INTERVAL)
+        _wakeup.clear()
+
+def start_refresher():
+    """Start this worker's refresher thread on first use"""
+    global _thread
+
+    if _thread is None:
+        with _lock:
+            if _thread is None:
+                _thread = threading.Thread(target=_run, name='suggest-refresher', daemon=True)
+                _thread.start()
+
+def get_suggest_index():
+    """Return this worker's current index; empty until the first background build finishes"""
+    start_refresher()
+    index = _index
+    return index if index is not None else SuggestIndex(None)
+
+def update_suggestions(instance, deleted=False):
+    """Apply a saved or deleted object to this worker's index.
+
+    Never rebuilds anything here. Other workers are told to rebuild (in
+    their refresher threads) only when the object's phrases actually
+    changed, or when this worker has no index to compare against yet.
+    """
+    source, phrases = source_key(instance), [] if deleted else phrases_for(instance)
+    with _lock:
+        index = _index
+        if _replay is not None:
+            _replay.append((source, tuple(phrases)))
+    if index is None:
+        bump_generation(SUGGEST_GENERATION)
+    elif index.replace(source, phrases):
+        # This worker is already up to date with its own change
+        index.generation = bump_generation(SUGGEST_GENERATION)
@@ -0,0 +1,59 @@
+"""Synonym expansion applied when documents are indexed.
+
+An indexed document that mentions any term of a synonym group gets the
+group's other terms written to the expansions column of the search index,
+so a query for "doctor" finds a video that only says "MBBS". The work
+happens once per document at index time; queries stay plain single-term
+lookups however many synonyms a term has.
+"""
+import re
+from .caching import generation_cached
+from .models import SynonymGroup
+
+SYNONYM_GENERATION = 'synonyms'
+
+def normalize(text):
+    return ' '.join(re.findall(r'\w+', text.casefold()))
+
+class SynonymMap:
+    """Compiled synonym groups: single words by lookup, phrases by substring test"""
+
+    def __init__(self, groups):
+        self.groups = [tuple(terms) for terms in groups if len(terms) > 1]
+        self.words = {}  # word -> indexes of the groups containing it
+        self.phrases = []  # (' phrase ', group index) for multi-word terms
+        for number, terms in enumerate(self.groups):
+            for term in terms:
+                if ' ' in term:
+                    self.phrases.append((f' {term} ', number))
+                else:
+                    self.words.setdefault(term, []).append(number)
+
+    def __len__(self):
+        return len(self.groups)
+
+    def expansions(self, *texts):
+        """The synonyms to index for a document made of texts, as one string"""
+        if not self.groups:
+            return ''
+        words = normalize(' '.join(texts)).split()
+        padded = f" {' '.join(words)} "
+        matched = {number for word in set(words) for number in self.words.get(word, ())}
+        matched.update(number for phrase, number in self.phrases if phrase in padded)
+        return expansion_text(self.groups, matched, lambda term: f' {term} ' in padded)
+
+def expansion_text(groups, matched, is_present):
+    """Join the terms of the matched groups that the document doesn't already contain"""
+    terms = []
+    for number in sorted(matched):
+        terms.extend(term for term in groups[number] if not is_present(term) and term not in terms)
+    return ' '.join(terms)
+
+def load_groups():
+    return [group.term_list() for group in SynonymGroup.objects.filter(is_active=True)]
+
+_map = generation_cached(SYNONYM_GENERATION, lambda: SynonymMap(load_groups()))
+
+def get_synonym_map():
+    """Return this worker's compiled synonyms, reloading them after admin edits"""
+    return _map()
@@ -0,0 +1,277 @@
+import json
+import math
+from collections import Counter
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+import numpy as np
+from django.contrib.contenttypes.models import ContentType
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from . import counters, trending
+from .models import (
+    Article, Career, CareerQuiz, ContentStats, EngagementHourly, QuizAnswer, QuizQuestion,
+    TrendingEpoch, TrendingItem, TrendingScore,
+)
+from .scoring import ADAPTIVE_CANDIDATES, CompiledQuiz
+from .search import build_match_query
+from .sketches import CountMinSketch, HeavyHitters, HyperLogLog, KLLSketch
+from .spelling import SpellingIndex, edit_distance
+from .views import BATCH_SUBMIT_MAX_SIZE
+
+def compiled_quiz(questions):
+    """CompiledQuiz built from [[career_weight dict per answer] per question] without the database"""
+    answers = []
+    for question_id, weights in enumerate(questions, start=1):
+        question = SimpleNamespace(question_text=f'Question {question_id}', question_type='multiple_choice', order=question_id)
+        for career_weight in weights:
+            answers.append(SimpleNamespace(
+                id=len(answers) + 1, answer_text=f'Answer {len(answers) + 1}', career_weight=career_weight,
+                question_id=question_id, question=question
+            ))
+    return CompiledQuiz(SimpleNamespace(id=1, title='Quiz'), answers, len(questions))
+
+class AdaptiveFirstQuestionTests(SimpleTestCase):
+    def test_first_question_depends_on_every_careers_weights(self):
+        careers = [f'career_{number}' for number in range(ADAPTIVE_CANDIDATES + 2)]
+        # The first question tells nobody apart; it also fixes the column order
+        uninformative = [dict.fromkeys(careers, 1), dict.fromkeys(careers, 1)]
+        for career in careers:
+            quiz = compiled_quiz([uninformative, [{career: 10}, {}]])
+            question_index, done = quiz.next_question([])
+            self.assertFalse(done)
+            self.assertEqual(question_index, 1, f'the question separating {career} was not chosen first')
+
+class KLLSketchTests(SimpleTestCase):
+    def test_percentiles_stay_within_the_rank_error(self):
+        rng = np.random.default_rng(0)
+        values = rng.permutation(100000)
+        sketch = KLLSketch()
+        sketch.update_many(values[:50000])
+        # A sketch built elsewhere and merged in covers the rest of the stream
+        other = KLLSketch()
+        for value in values[50000:]:
+            other.update(value)
+        sketch.merge(other)
+
+        self.assertEqual(len(sketch), 100000)
+        for value in (1000, 25000, 50000, 75000, 99000):
+            self.assertAlmostEqual(sketch.percentile(value), value / 1000, delta=2)
+        self.assertAlmostEqual(sketch.quantile(0.5), 50000, delta=2000)
+
+    def test_round_trips_through_a_dict(self):
+        sketch = KLLSketch()
+        sketch.update_many(range(1000))
+        copy = KLLSketch.from_dict(sketch.to_dict())
+        self.assertEqual(len(copy), 1000)
+        self.assertEqual(copy.percentile(500), sketch.percentile(500))
+
+    def test_empty_sketch_has_no_percentiles(self):
+        self.assertIsNone(KLLSketch().percentile(1))
+        self.assertIsNone(KLLSketch().quantile(0.5))
+
+class HeavyHittersTests(SimpleTestCase):
+    def test_finds_the_most_frequent_items(self):
+        rng = np.random.default_rng(0)
+        stream = rng.zipf(1.5, 50000)
+        counts = Counter(stream.tolist())
+        tracker = HeavyHitters(k=10)
+        for item in stream.tolist():
+            tracker.add(item)
+
+        expected = [item for item, _ in counts.most_common(5)]
+        self.assertEqual([item for item, _ in tracker.items()[:5]], expected)
+        for item, count in counts.most_common(20):
+            # Count-Min never undercounts and overcounts by at most e/width of the stream
+            self.assertGreaterEqual(tracker.estimate(item), count)
+            self.assertLessEqual(tracker.estimate(item), count + math.e / 2048 * len(stream))
+
+    def test_merged_trackers_match_one_over_the_whole_stream(self):
+        first, second = HeavyHitters(k=3), HeavyHitters(k=3)
+        for item, count in {'a': 50, 'b': 5, 'c': 1}.items():
+            first.add(item, count)
+        for item, count in {'b': 60, 'd': 40, 'c': 2}.items():
+            second.add(item, count)
+        first.merge(second)
+        self.assertEqual(first.items(), [('b', 65), ('a', 50), ('d', 40)])
+
+    def test_sketches_of_different_sizes_do_not_merge(self):
+        with self.assertRaises(ValueError):
+            CountMinSketch(width=64).merge(CountMinSketch(width=128))
+
+class HyperLogLogTests(SimpleTestCase):
+    def test_distinct_count_stays_within_the_expected_error(self):
+        for distinct in (100, 5000, 100000):
+            sketch = HyperLogLog()
+            for item in range(distinct):
+                sketch.add(item)
+                # Repeats don't count
+                sketch.add(item)
+            # About 1.6% standard error at the default precision
+            self.assertAlmostEqual(sketch.count() / distinct, 1, delta=0.05)
+
+    def test_merge_counts_the_union(self):
+        first, second = HyperLogLog(), HyperLogLog()
+        for item in range(20000):
+            first.add(item)
+        for item in range(10000, 30000):
+            second.add(item)
+        first.merge(second)
+        self.assertAlmostEqual(first.count() / 30000, 1, delta=0.05)
+
+    def test_round_trips_through_sparse_and_dense_bytes(self):
+        for distinct in (10, 50000):
+            sketch = HyperLogLog()
+            for item in range(distinct):
+                sketch.add(item)
+            data = sketch.to_bytes()
+            self.assertEqual(data[1], HyperLogLog.SPARSE if distinct == 10 else HyperLogLog.DENSE)
+            self.assertEqual(HyperLogLog.from_bytes(data).count(), sketch.count())
+        self.assertEqual(HyperLogLog.from_bytes(None).count(), 0)
+
+class MatchQueryTests(SimpleTestCase):
+    def test_every_word_is_quoted_and_the_last_matches_as_a_prefix(self):
+        self.assertEqual(build_match_query('Data Scien'), '"data" "scien"*')
+
+    def test_short_last_words_are_not_prefixes(self):
+        self.assertEqual(build_match_query('career in'), '"career" "in"')
+
+    def test_fts_syntax_in_the_input_is_dropped(self):
+        self.assertEqual(build_match_query('medical OR "law" NEAR(x*'), '"medical" "or" "law" "near" "x"')
+        self.assertEqual(build_match_query('-^*'), '')
+
+class SpellingTests(SimpleTestCase):
+    def setUp(self):
+        self.index = SpellingIndex(None, Counter({
+            'engineering': 5, 'medical': 3, 'medicine': 1, 'scholarship': 2, 'design': 4, 'desig': 1, 'class': 2,
+        }))
+
+    def test_corrects_misspelled_words(self):
+        self.assertEqual(self.index.correct('engineerign scholarsip'), 'engineering scholarship')
+        # Swapped neighbours are one edit
+        self.assertEqual(self.index.correct('mdeical'), 'medical')
+
+    def test_prefers_the_closer_then_the_more_frequent_word(self):
+        self.assertEqual(self.index.correct_word('medicak'), 'medical')
+        self.assertEqual(self.index.correct_word('desigm'), 'design')
+
+    def test_leaves_known_short_and_numeric_words_alone(self):
+        self.assertIsNone(self.index.correct('medical design'))
+        self.assertIsNone(self.index.correct('cls 12th'))
+        self.assertEqual(self.index.correct_word('zzzzzzzz'), 'zzzzzzzz')
+
+    def test_edit_distance_stops_at_the_limit(self):
+        self.assertEqual(edit_distance('career', 'caerer', 2), 1)
+        self.assertEqual(edit_distance('career', 'science', 2), 3)
+
+class CounterFlushTests(TestCase):
+    def test_flushed_increments_add_up_in_the_stats_and_hourly_rows(self):
+        article = Article.objects.create(title='Counting views', description='d', content='c', is_published=True)
+        for _ in range(3):
+            counters.increment(article, 'view_count')
+        # The response serialized from the instance already includes the hits
+        self.assertEqual(article.view_count, 3)
+        self.assertFalse(ContentStats.objects.exists())
+
+        counters.flush_pending()
+        counters.increment(article, 'view_count', 2)
+        counters.flush_pending()
+
+        stats = ContentStats.objects.get(object_id=article.pk)
+        self.assertEqual((stats.view_count, stats.download_count), (5, 0))
+        self.assertEqual(sum(EngagementHourly.objects.filter(object_id=article.pk).values_list('view_count', flat=True)), 5)
+        self.assertTrue(TrendingScore.objects.filter(object_id=article.pk).exists())
+
+class TrendingTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.older = Article.objects.create(title='Older', description='d', content='c', is_published=True)
+        self.newer = Article.objects.create(title='Newer', description='d', content='c', is_published=True)
+        self.content_type = ContentType.objects.get_for_model(Article)
+
+    def hits(self, article, count, age):
+        return {(self.content_type.pk, article.pk, 'view_count', self.now - age): count}
+
+    def test_hits_lose_half_their_weight_every_half_life(self):
+        TrendingEpoch.objects.create(pk=1, started_at=self.now - timedelta(days=1))
+        trending.add_hits(self.hits(self.older, 10, timedelta(seconds=2 * trending.HALF_LIFE)))
+        trending.add_hits(self.hits(self.newer, 4, timedelta(0)))
+        Article.objects.create(title='Hidden', description='d', content='c', is_published=False)
+
+        trending.refresh()
+        ranked = TrendingItem.objects.filter(list_name='articles').order_by('rank')
+        self.assertEqual([item.object_id for item in ranked], [self.newer.pk, self.older.pk])
+        self.assertAlmostEqual(ranked[0].score, 4, places=2)
+        self.assertAlmostEqual(ranked[1].score, 2.5, places=2)
+        self.assertEqual(TrendingItem.objects.filter(list_name='all').count(), 2)
+
+    def test_unpublished_articles_do_not_trend(self):
+        TrendingEpoch.objects.create(pk=1, started_at=self.now)
+        Article.objects.filter(pk=self.newer.pk).update(is_published=False)
+        trending.add_hits(self.hits(self.newer, 100, timedelta(0)))
+        trending.add_hits(self.hits(self.older, 1, timedelta(0)))
+        trending.refresh()
+        self.assertEqual(set(TrendingItem.objects.values_list('object_id', flat=True)), {self.older.pk})
+
+    def test_rebase_moves_the_epoch_and_drops_decayed_items(self):
+        TrendingEpoch.objects.create(pk=1, started_at=self.now - timedelta(seconds=(trending.REBASE_AFTER + 5) * trending.HALF_LIFE))
+        trending.add_hits(self.hits(self.older, 1, timedelta(seconds=(trending.REBASE_AFTER + 4) * trending.HALF_LIFE)))
+        trending.add_hits(self.hits(self.newer, 3, timedelta(0)))
+
+        trending.refresh()
+        self.assertLess(abs((TrendingEpoch.objects.get().started_at - timezone.now()).total_seconds()), 60)
+        self.assertEqual(list(TrendingScore.objects.values_list('object_id', flat=True)), [self.newer.pk])
+        self.assertAlmostEqual(TrendingScore.objects.get().score, 3, places=2)
+
+class BatchSubmitTests(TestCase):
+    url = '/api/quizzes/submit/batch/'
+
+    def setUp(self):
+        Career.objects.create(key='engineer', name='Engineer')
+        self.quiz = CareerQuiz.objects.create(title='Quiz', description='d')
+        self.answers = {}
+        for order, weights in enumerate([[{'engineer': 3}, {'doctor': 3}], [{'engineer': 1, 'lawyer': 2}, {'doctor': 1}]], 1):
+            question = QuizQuestion.objects.create(quiz=self.quiz, question_text=f'Question {order}', order=order)
+            for position, career_weight in enumerate(weights):
+                answer = QuizAnswer.objects.create(question=question, answer_text=f'Answer {position}', career_weight=career_weight)
+                self.answers[(order, position)] = answer.pk
+
+    def post(self, data):
+        # Keep the score sketches' flush thread, which has its own connection, out of the test transaction
+        with mock.patch('resources.views.score_percentiles', return_value={}), \
+                mock.patch('resources.views.record_scores') as record_scores:
+            response = APIClient().post(self.url, data, format='json')
+            if response.streaming:
+                response.lines = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+            self.recorded = record_scores.call_args_list
+        return response
+
+    def test_streams_one_line_per_submission_in_order(self):
+        response = self.post({'quiz_id': self.quiz.pk, 'submissions': [
+            [self.answers[(1, 0)], self.answers[(2, 0)]],
+            {'id': 'student-2', 'answers': [self.answers[(1, 1)], self.answers[(2, 1)]]},
+            {'id': 'student-3', 'answers': []},
+        ]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = response.lines
+
+        self.assertEqual([(line['index'], line['id']) for line in lines], [(0, None), (1, 'student-2'), (2, 'student-3')])
+        first = lines[0]['top_careers']
+        self.assertEqual([career['career'] for career in first[:2]], ['Engineer', 'Lawyer'])
+        self.assertEqual(first[0]['match_score'], 100.0)
+        # Every career of the quiz comes back, even those that scored nothing
+        self.assertEqual(len(first), 3)
+        self.assertEqual(lines[1]['top_careers'][0]['career'], 'Doctor')
+        self.assertEqual(lines[2]['error'], 'Answers are required')
+        # Only the scored submissions feed the percentile sketches
+        [(quiz, scores), _] = self.recorded[0]
+        self.assertEqual(quiz.quiz_id, self.quiz.pk)
+        self.assertEqual(scores.shape, (2, 3))
+
+    def test_rejects_bad_batches(self):
+        self.assertEqual(self.post({'quiz_id': self.quiz.pk, 'submissions': []}).status_code, 400)
+        self.assertEqual(self.post({'submissions': [[1]]}).status_code, 400)
+        self.assertEqual(self.post({'quiz_id': self.quiz.pk, 'submissions': [[1]] * (BATCH_SUBMIT_MAX_SIZE + 1)}).status_code, 400)
+        self.assertEqual(self.post({'quiz_id': self.quiz.pk + 1, 'submissions': [[1]]}).status_code, 404)
@@ -0,0 +1,139 @@
+"""Trending content from exponentially decayed engagement scores.
+
+A hit of weight w at time t is worth w * 2 ** -((now - t) / HALF_LIFE) now.
+TrendingScore keeps sum(w * 2 ** ((t - epoch) / HALF_LIFE)) instead: the
+current score times a factor every item shares. New hits are then a plain
+addition, done by the counter flushes with the same additive upsert as the
+other counters, and the items with the highest stored score are the items
+with the highest current score. refresh() moves the epoch forward every
+REBASE_AFTER half-lives, rescaling the rows once and dropping the ones that
+have decayed away, so the factors never grow large.
+
+The trending lists are rebuilt from the scores every REFRESH_INTERVAL
+seconds, after a counter flush; /api/trending/ only reads them.
+"""
+import logging
+import time
+from collections import defaultdict
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from .caching import bump_generation
+from .models import Article, College, PDFResource, Scholarship, TrendingEpoch, TrendingItem, TrendingScore, Video
+
+logger = logging.getLogger(__name__)
+
+HALF_LIFE = 24 * 3600  # seconds for a hit to lose half its weight
+WEIGHTS = {'view_count': 1.0, 'download_count': 3.0, 'application_count': 5.0}
+LIST_SIZE = 50
+REFRESH_INTERVAL = 300  # seconds between list rebuilds in a worker
+REBASE_AFTER = 30  # half-lives between epoch moves
+MIN_SCORE = 0.01  # current score below which an item is dropped at a rebase
+
+TRENDING_GENERATION = 'trending'
+
+TRENDING_TYPES = {
+    'videos': Video,
+    'pdfs': PDFResource,
+    'articles': Article,
+    'scholarships': Scholarship,
+    'colleges': College,
+}
+TYPE_NAMES = {model: name for name, model in TRENDING_TYPES.items()}
+
+# Items hidden from the site never trend
+VISIBLE = {
+    Article: {'is_published': True},
+    Scholarship: {'is_active': True},
+}
+
+def half_lives(start, end):
+    return (end - start).total_seconds() / HALF_LIFE
+
+def get_epoch():
+    """The epoch row, locked for the rest of the transaction where the database supports it"""
+    epoch = TrendingEpoch.objects.select_for_update().filter(pk=1).first()
+    if epoch is None:
+        epoch, _ = TrendingEpoch.objects.get_or_create(pk=1, defaults={'started_at': timezone.now()})
+    return epoch
+
+def add_hits(pending):
+    """Add (content_type_id, object_id, field, hour) -> count increments to the scores.
+
+    Runs inside the counter flush's transaction.
+    """
+    epoch = get_epoch().started_at
+    scores = defaultdict(float)
+    for (content_type_id, object_id, field, hour), count in pending.items():
+        scores[(content_type_id, object_id)] += count * WEIGHTS[field] * 2 ** half_lives(epoch, hour)
+    qn = connection.ops.quote_name
+    table = qn(TrendingScore._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {table} (content_type_id, object_id, score) VALUES (%s, %s, %s) '
+            f'ON CONFLICT (content_type_id, object_id) DO UPDATE SET score = {table}.score + excluded.score',
+            [(*key, score) for key, score in scores.items()]
+        )
+
+def rebase(epoch, now):
+    """Rescale every score to an epoch of now and drop the decayed ones (inside refresh's transaction)"""
+    TrendingScore.objects.update(score=F('score') * 2 ** -half_lives(epoch.started_at, now))
+    TrendingScore.objects.filter(score__lt=MIN_SCORE).delete()
+    epoch.started_at = now
+    epoch.save(update_fields=['started_at'])
+
+def top_scores(model, epoch, now):
+    """(object_id, current score) of the model's best visible items"""
+    candidates = list(
+        TrendingScore.objects.filter(content_type=ContentType.objects.get_for_model(model))
+        .order_by('-score').values_list('object_id', 'score')[:LIST_SIZE * 2]
+    )
+    visible = set(
+        model.objects.filter(pk__in=[pk for pk, _ in candidates], **VISIBLE.get(model, {}))
+        .values_list('pk', flat=True)
+    )
+    factor = 2 ** -half_lives(epoch, now)
+    return [(pk, score * factor) for pk, score in candidates if pk in visible][:LIST_SIZE]
+
+def refresh():
+    """Rebuild the trending lists from the current scores"""
+    now = timezone.now()
+    with transaction.atomic():
+        epoch = get_epoch()
+        if half_lives(epoch.started_at, now) > REBASE_AFTER:
+            rebase(epoch, now)
+        lists = {}
+        for name, model in TRENDING_TYPES.items():
+            content_type = ContentType.objects.get_for_model(model)
+            lists[name] = [(content_type, pk, score) for pk, score in top_scores(model, epoch.started_at, now)]
+        # The overall top items are among the top items of their type
+        lists['all'] = sorted(
+            (entry for entries in lists.values() for entry in entries), key=lambda entry: -entry[2]
+        )[:LIST_SIZE]
+        TrendingItem.objects.all().delete()
+        TrendingItem.objects.bulk_create([
+            TrendingItem(
+                list_name=name, rank=rank, content_type=content_type, object_id=pk, score=score, computed_at=now
+            )
+            for name, entries in lists.items()
+            for rank, (content_type, pk, score) in enumerate(entries, start=1)
+        ])
+        transaction.on_commit(lambda: bump_generation(TRENDING_GENERATION))
+    return {name: len(entries) for name, entries in lists.items()}
+
+_last_refresh = None
+
+def refresh_if_due():
+    """Rebuild the lists at most once per REFRESH_INTERVAL; called after each counter flush"""
+    global _last_refresh
+
+    now = time.monotonic()
+    if _last_refresh is not None and now - _last_refresh < REFRESH_INTERVAL:
+        return
+    _last_refresh = now
+    try:
+        refresh()
+    except Exception:
+        # The flushed counts are already committed; retry at the next interval
+        logger.exception('Refreshing the trending lists failed')
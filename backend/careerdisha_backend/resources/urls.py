@@ -21,6 +21,8 @@ urlpatterns = [
     path('quizzes/', views.CareerQuizListView.as_view(), name='quiz-list'),
     path('quizzes/<int:pk>/', views.CareerQuizDetailView.as_view(), name='quiz-detail'),
     path('quizzes/submit/', views.submit_quiz, name='quiz-submit'),
+    path('quizzes/submit/batch/', views.submit_quiz_batch, name='quiz-submit-batch'),
+    path('quizzes/adaptive/', views.adaptive_quiz_step, name='quiz-adaptive'),
     
     # Scholarships
     path('scholarships/', views.ScholarshipListView.as_view(), name='scholarship-list'),
@@ -32,6 +34,13 @@ urlpatterns = [
     
     # Utility endpoints
     path('featured/', views.featured_content, name='featured-content'),
+    path('trending/', views.trending_content, name='trending-content'),
+    path('engagement/', views.engagement, name='engagement'),
+    path('engagement/visitors/', views.visitor_counts, name='engagement-visitors'),
     path('statistics/', views.content_statistics, name='content-statistics'),
     path('search/', views.search_content, name='search-content'),
+    path('search/suggest/', views.search_suggestions, name='search-suggest'),
+    path('search/semantic/', views.search_by_meaning, name='search-semantic'),
+    path('search/cache-stats/', views.search_cache_stats, name='search-cache-stats'),
+    path('search/analytics/', views.search_analytics, name='search-analytics'),
 ]
\ No newline at end of file
@@ -1,57 +1,120 @@
+import json
+from datetime import timedelta
 from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
+from django.db.models import Count, F, Q
 from django.shortcuts import get_object_or_404
-from django.http import JsonResponse
+from django.http import Http404, HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.http import parse_etags
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
-from .models import Video, PDFResource, Article, CareerQuiz, Scholarship, College
+from .models import Video, PDFResource, Article, CareerQuiz, Scholarship, College, Tag, TrendingItem
 from .serializers import (
     VideoSerializer, PDFResourceSerializer, 
     ArticleSerializer, ArticleListSerializer,
     CareerQuizSerializer, CareerQuizListSerializer,
     ScholarshipSerializer, CollegeSerializer
 )
+from .caching import LRUCache, get_generation
+from .careers import get_career_catalog
+from .counters import flush_pending as flush_counters
+from .engagement import ENGAGEMENT_TYPES, HOURLY_RETENTION_DAYS, item_series, top_items
+from .facets import count_facets, grouped_rows, matching_total
+from .percentiles import record_scores, score_percentiles
+from .query_analytics import flush_pending, query_report, record_search
+from .quiz_payloads import get_quiz_payload
+from .search import (
+    RESULT_PREFETCH, SEARCH_FACET_FIELDS, SEARCH_GENERATIONS, SEARCH_MODELS, SEARCH_TYPES, search, search_available
+)
+from .scoring import get_compiled_quiz
+from .semantic import semantic_search
+from .spelling import correct_query
+from .suggest import get_suggest_index
+from .trending import LIST_SIZE, TRENDING_GENERATION, TRENDING_TYPES, TYPE_NAMES, VISIBLE
+from .visitors import flush_pending as flush_visitors, record_visitor, unique_visitors
 
-# Video Views
-class VideoListView(generics.ListAPIView):
-    serializer_class = VideoSerializer
-    permission_classes = [AllowAny]
+class ContentListMixin:
+    """Filtering and facet counts shared by the video, PDF and article list views.
+
+    get_queryset() only sets the view's scope; ?category=, ?featured= and
+    ?tag=<slug> (repeat it to require several tags) are applied here so the
+    facet counts can be computed with the facet filters left out.
+    """
+    tag_facet_limit = 20
     
-    def get_queryset(self):
-        queryset = Video.objects.filter(is_parent_content=False)
+    def get_facet_filters(self):
+        filters = {}
         category = self.request.query_params.get('category', None)
         featured = self.request.query_params.get('featured', None)
         
         if category:
-            queryset = queryset.filter(category=category)
+            filters['category'] = category
         if featured:
-            queryset = queryset.filter(is_featured=True)
-            
+            filters['is_featured'] = True
+        return filters
+    
+    def filter_tags(self, queryset):
+        # Slugs are numbered where names collide ("c", "c-2"), so match the slug or the name itself
+        for tag in self.request.query_params.getlist('tag'):
+            queryset = queryset.filter(tags__in=Tag.objects.filter(Q(slug=tag) | Q(name__iexact=tag)))
         return queryset
+    
+    def filter_queryset(self, queryset):
+        queryset = self.filter_tags(super().filter_queryset(queryset))
+        return queryset.filter(**self.get_facet_filters()).prefetch_related(*RESULT_PREFETCH[queryset.model])
+    
+    def get_tag_facets(self, queryset):
+        """Most used tags among the filtered items, counted on the tag link table"""
+        field = queryset.model._meta.get_field('tags')
+        links = field.remote_field.through.objects.filter(
+            **{f'{field.m2m_field_name()}__in': queryset.order_by().values('pk')}
+        )
+        return list(
+            links.values(name=F('tag__name'), slug=F('tag__slug'))
+            .annotate(count=Count('pk'))
+            .order_by('-count', 'name')[:self.tag_facet_limit]
+        )
+    
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if isinstance(response.data, dict):
+            # One grouped query over the scope gives every facet's counts
+            scope = self.filter_tags(self.get_queryset())
+            response.data['facets'] = count_facets(grouped_rows(scope), self.get_facet_filters())
+            response.data['tag_facets'] = self.get_tag_facets(self.filter_queryset(self.get_queryset()))
+        return response
+
+# Video Views
+class VideoListView(ContentListMixin, generics.ListAPIView):
+    serializer_class = VideoSerializer
+    permission_classes = [AllowAny]
+    
+    def get_queryset(self):
+        return Video.objects.filter(is_parent_content=False)
 
 class VideoDetailView(generics.RetrieveAPIView):
     queryset = Video.objects.all()
     serializer_class = VideoSerializer
     permission_classes = [AllowAny]
+    
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        # Count the view for trending
+        instance.increment_view_count()
+        record_visitor(request, instance)
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
 
 # PDF Resource Views
-class PDFResourceListView(generics.ListAPIView):
+class PDFResourceListView(ContentListMixin, generics.ListAPIView):
     serializer_class = PDFResourceSerializer
     permission_classes = [AllowAny]
     
     def get_queryset(self):
-        queryset = PDFResource.objects.filter(is_parent_content=False)
-        category = self.request.query_params.get('category', None)
-        featured = self.request.query_params.get('featured', None)
-        
-        if category:
-            queryset = queryset.filter(category=category)
-        if featured:
-            queryset = queryset.filter(is_featured=True)
-            
-        return queryset
+        return PDFResource.objects.filter(is_parent_content=False)
 
 class PDFResourceDetailView(generics.RetrieveAPIView):
     queryset = PDFResource.objects.all()
@@ -62,25 +125,17 @@ class PDFResourceDetailView(generics.RetrieveAPIView):
         instance = self.get_object()
         # Increment download count when PDF is accessed
         instance.increment_download_count()
+        record_visitor(request, instance)
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
 
 # Article Views
-class ArticleListView(generics.ListAPIView):
+class ArticleListView(ContentListMixin, generics.ListAPIView):
     serializer_class = ArticleListSerializer
     permission_classes = [AllowAny]
     
     def get_queryset(self):
-        queryset = Article.objects.filter(is_parent_content=False, is_published=True)
-        category = self.request.query_params.get('category', None)
-        featured = self.request.query_params.get('featured', None)
-        
-        if category:
-            queryset = queryset.filter(category=category)
-        if featured:
-            queryset = queryset.filter(is_featured=True)
-            
-        return queryset
+        return Article.objects.filter(is_parent_content=False, is_published=True)
 
 class ArticleDetailView(generics.RetrieveAPIView):
     queryset = Article.objects.filter(is_published=True)
@@ -91,37 +146,26 @@ class ArticleDetailView(generics.RetrieveAPIView):
         instance = self.get_object()
         # Increment view count when article is accessed
         instance.increment_view_count()
+        record_visitor(request, instance)
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
 
 # Parent Section Views
-class ParentVideoListView(generics.ListAPIView):
+class ParentVideoListView(ContentListMixin, generics.ListAPIView):
     serializer_class = VideoSerializer
     permission_classes = [AllowAny]
     
     def get_queryset(self):
-        queryset = Video.objects.filter(is_parent_content=True)
-        category = self.request.query_params.get('category', None)
-        
-        if category:
-            queryset = queryset.filter(category=category)
-            
-        return queryset
+        return Video.objects.filter(is_parent_content=True)
 
-class ParentArticleListView(generics.ListAPIView):
+class ParentArticleListView(ContentListMixin, generics.ListAPIView):
     serializer_class = ArticleListSerializer
     permission_classes = [AllowAny]
     
     def get_queryset(self):
-        queryset = Article.objects.filter(is_parent_content=True, is_published=True)
-        category = self.request.query_params.get('category', None)
-        
-        if category:
-            queryset = queryset.filter(category=category)
-            
-        return queryset
+        return Article.objects.filter(is_parent_content=True, is_published=True)
 
-class ParentPDFListView(generics.ListAPIView):
+class ParentPDFListView(ContentListMixin, generics.ListAPIView):
     serializer_class = PDFResourceSerializer
     permission_classes = [AllowAny]
     
@@ -138,6 +182,52 @@ class CareerQuizDetailView(generics.RetrieveAPIView):
     queryset = CareerQuiz.objects.filter(is_active=True)
     serializer_class = CareerQuizSerializer
     permission_classes = [AllowAny]
+    
+    def retrieve(self, request, *args, **kwargs):
+        # Serve the pre-rendered payload; clients revalidate with If-None-Match
+        payload = get_quiz_payload(kwargs['pk'])
+        if payload is None:
+            raise Http404('No active quiz matches the given query.')
+        
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match and (if_none_match.strip() == '*' or payload.etag in parse_etags(if_none_match)):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(payload.body, content_type='application/json')
+        response['ETag'] = payload.etag
+        response['Cache-Control'] = 'no-cache'
+        return response
+
+def parse_limit(request, default, maximum, param='limit'):
+    """Read a positive integer query parameter, clamped to maximum; default when missing or malformed"""
+    try:
+        return min(max(int(request.query_params.get(param, default)), 1), maximum)
+    except ValueError:
+        return default
+
+def build_recommendations(top_careers, percentiles=None):
+    """Turn ranked (career_key, score) pairs into recommendation dicts.
+
+    percentiles, when given, maps career keys to the score's percentile
+    among past submissions of the same quiz.
+    """
+    catalog = get_career_catalog()
+    recommendations = []
+    for career_key, score in top_careers:
+        career_data = catalog.get(career_key)
+        
+        recommendations.append({
+            'career': career_data['name'],
+            'match_score': round((score / top_careers[0][1] * 100), 1) if top_careers[0][1] > 0 else 0.0,
+            'description': career_data['description'],
+            'avg_salary': career_data['avg_salary'],
+            'growth_outlook': career_data['growth_outlook'],
+            'required_skills': career_data['required_skills'],
+            'education': career_data['education']
+        })
+        if percentiles is not None:
+            recommendations[-1]['percentile'] = percentiles.get(career_key)
+    return recommendations
 
 @csrf_exempt
 @api_view(['POST'])
@@ -153,141 +243,26 @@ def submit_quiz(request):
                 {'error': 'Quiz ID and answers are required'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
+        if not isinstance(answers, list):
+            return Response(
+                {'error': 'answers must be a list of answer IDs'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # Get the quiz
-        quiz = get_object_or_404(CareerQuiz, id=quiz_id, is_active=True)
-        
-        # Calculate career scores
-        career_scores = {}
-        
-        from .models import QuizAnswer
-        for answer_id in answers:
-            try:
-                answer = QuizAnswer.objects.get(id=answer_id, question__quiz=quiz)
-                career_weights = answer.career_weight
-                
-                for career, weight in career_weights.items():
-                    if career in career_scores:
-                        career_scores[career] += weight
-                    else:
-                        career_scores[career] = weight
-                        
-            except QuizAnswer.DoesNotExist:
-                continue
-        
-        # Sort careers by score and get top 5
-        sorted_careers = sorted(career_scores.items(), key=lambda x: x[1], reverse=True)
-        top_careers = sorted_careers[:5]
+        # Score against the cached answer x career matrix (no queries once compiled)
+        quiz = get_compiled_quiz(quiz_id)
+        if quiz is None:
+            return Response({'error': 'Quiz not found'}, status=status.HTTP_404_NOT_FOUND)
         
-        # Career information mapping
-        career_info = {
-            'software_engineer': {
-                'name': 'Software Engineer',
-                'description': 'Design, develop, and maintain software applications and systems.',
-                'avg_salary': '$85,000 - $150,000',
-                'growth_outlook': 'Excellent (22% growth expected)',
-                'required_skills': ['Programming', 'Problem-solving', 'Teamwork', 'Continuous learning'],
-                'education': 'Bachelor\'s degree in Computer Science or related field'
-            },
-            'data_scientist': {
-                'name': 'Data Scientist',
-                'description': 'Analyze complex data to help organizations make informed decisions.',
-                'avg_salary': '$95,000 - $165,000',
-                'growth_outlook': 'Excellent (35% growth expected)',
-                'required_skills': ['Statistics', 'Python/R', 'Machine Learning', 'Data Visualization'],
-                'education': 'Master\'s degree in Data Science, Statistics, or related field'
-            },
-            'cybersecurity_specialist': {
-                'name': 'Cybersecurity Specialist',
-                'description': 'Protect organizations from cyber threats and security breaches.',
-                'avg_salary': '$90,000 - $160,000',
-                'growth_outlook': 'Excellent (33% growth expected)',
-                'required_skills': ['Network Security', 'Risk Assessment', 'Ethical Hacking', 'Compliance'],
-                'education': 'Bachelor\'s degree in Cybersecurity or Computer Science'
-            },
-            'web_developer': {
-                'name': 'Web Developer',
-                'description': 'Create and maintain websites and web applications.',
-                'avg_salary': '$60,000 - $120,000',
-                'growth_outlook': 'Very Good (13% growth expected)',
-                'required_skills': ['HTML/CSS', 'JavaScript', 'Responsive Design', 'Version Control'],
-                'education': 'Associate or Bachelor\'s degree in Web Development'
-            },
-            'doctor': {
-                'name': 'Medical Doctor',
-                'description': 'Diagnose, treat, and prevent illnesses and injuries.',
-                'avg_salary': '$200,000 - $400,000',
-                'growth_outlook': 'Good (4% growth expected)',
-                'required_skills': ['Medical Knowledge', 'Empathy', 'Communication', 'Problem-solving'],
-                'education': 'Medical degree (MD) plus residency training'
-            },
-            'nurse': {
-                'name': 'Registered Nurse',
-                'description': 'Provide patient care and support in healthcare settings.',
-                'avg_salary': '$65,000 - $90,000',
-                'growth_outlook': 'Excellent (7% growth expected)',
-                'required_skills': ['Patient Care', 'Communication', 'Critical Thinking', 'Compassion'],
-                'education': 'Associate or Bachelor\'s degree in Nursing'
-            },
-            'teacher': {
-                'name': 'Teacher',
-                'description': 'Educate and inspire students in various subjects and grade levels.',
-                'avg_salary': '$45,000 - $75,000',
-                'growth_outlook': 'Good (5% growth expected)',
-                'required_skills': ['Subject Expertise', 'Communication', 'Patience', 'Creativity'],
-                'education': 'Bachelor\'s degree in Education or subject area'
-            },
-            'business_analyst': {
-                'name': 'Business Analyst',
-                'description': 'Analyze business processes and recommend improvements.',
-                'avg_salary': '$70,000 - $110,000',
-                'growth_outlook': 'Good (14% growth expected)',
-                'required_skills': ['Analytical Thinking', 'Communication', 'Process Mapping', 'Data Analysis'],
-                'education': 'Bachelor\'s degree in Business or related field'
-            },
-            'graphic_designer': {
-                'name': 'Graphic Designer',
-                'description': 'Create visual concepts to communicate ideas and inspire audiences.',
-                'avg_salary': '$40,000 - $70,000',
-                'growth_outlook': 'Average (3% growth expected)',
-                'required_skills': ['Creative Design', 'Adobe Creative Suite', 'Typography', 'Branding'],
-                'education': 'Bachelor\'s degree in Graphic Design or related field'
-            },
-            'marketing_manager': {
-                'name': 'Marketing Manager',
-                'description': 'Develop and implement marketing strategies to promote products or services.',
-                'avg_salary': '$75,000 - $130,000',
-                'growth_outlook': 'Good (10% growth expected)',
-                'required_skills': ['Strategic Planning', 'Digital Marketing', 'Analytics', 'Leadership'],
-                'education': 'Bachelor\'s degree in Marketing or Business'
-            }
-        }
+        career_scores = quiz.score(answers)
+        top_careers = quiz.top_careers(career_scores, k=5)
         
-        # Prepare recommendations
-        recommendations = []
-        for career_key, score in top_careers:
-            career_data = career_info.get(career_key, {
-                'name': career_key.replace('_', ' ').title(),
-                'description': 'A promising career option based on your interests and skills.',
-                'avg_salary': 'Varies by location and experience',
-                'growth_outlook': 'Positive outlook expected',
-                'required_skills': ['Relevant technical skills', 'Communication', 'Problem-solving'],
-                'education': 'Appropriate degree or certification required'
-            })
-            
-            recommendations.append({
-                'career': career_data['name'],
-                'match_score': round((score / max(career_scores.values()) * 100), 1),
-                'description': career_data['description'],
-                'avg_salary': career_data['avg_salary'],
-                'growth_outlook': career_data['growth_outlook'],
-                'required_skills': career_data['required_skills'],
-                'education': career_data['education']
-            })
+        recommendations = build_recommendations(top_careers, score_percentiles(quiz, top_careers))
+        record_scores(quiz, career_scores)
         
         return Response({
             'quiz_title': quiz.title,
-            'total_questions': quiz.questions.count(),
+            'total_questions': quiz.question_count,
             'answers_submitted': len(answers),
             'top_careers': recommendations,
             'message': f'Based on your responses, here are your top {len(recommendations)} career matches!'
@@ -299,14 +274,125 @@ def submit_quiz(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+@csrf_exempt
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def adaptive_quiz_step(request):
+    """Adaptive quiz mode: return the most informative next question, or the results.
+
+    The client posts the answer IDs given so far, in the order they were
+    answered; the flow stops early once the top careers stop changing.
+    """
+    quiz_id = request.data.get('quiz_id')
+    answers = request.data.get('answers', [])
+    
+    if not quiz_id or not isinstance(answers, list):
+        return Response(
+            {'error': 'Quiz ID is required and answers must be a list'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    quiz = get_compiled_quiz(quiz_id)
+    if quiz is None:
+        return Response({'error': 'Quiz not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    question_index, done = quiz.next_question(answers)
+    if not done:
+        return Response({
+            'done': False,
+            'question': quiz.questions[question_index],
+            'answers_submitted': len(answers),
+            'total_questions': quiz.question_count,
+        })
+    
+    top_careers = quiz.top_careers(quiz.score(answers), k=5)
+    recommendations = build_recommendations(top_careers, score_percentiles(quiz, top_careers))
+    return Response({
+        'done': True,
+        'quiz_title': quiz.title,
+        'answers_submitted': len(answers),
+        'total_questions': quiz.question_count,
+        'top_careers': recommendations,
+        'message': f'Based on your responses, here are your top {len(recommendations)} career matches!'
+    })
+
+BATCH_SUBMIT_MAX_SIZE = 5000
+BATCH_SUBMIT_CHUNK_SIZE = 250
+
+def _stream_batch_results(quiz, submissions):
+    """Yield one NDJSON line per submission, scoring a chunk at a time"""
+    for start in range(0, len(submissions), BATCH_SUBMIT_CHUNK_SIZE):
+        chunk = submissions[start:start + BATCH_SUBMIT_CHUNK_SIZE]
+        chunk_scores = quiz.score_batch([answers for _, answers in chunk])
+
+        lines = []
+        for offset, ((submission_id, answers), career_scores) in enumerate(zip(chunk, chunk_scores)):
+            result = {'index': start + offset, 'id': submission_id}
+            if answers:
+                top_careers = quiz.top_careers(career_scores, k=5)
+                recommendations = build_recommendations(top_careers, score_percentiles(quiz, top_careers))
+                result.update({
+                    'answers_submitted': len(answers),
+                    'top_careers': recommendations,
+                })
+            else:
+                result['error'] = 'Answers are required'
+            lines.append(json.dumps(result))
+        submitted = [index for index, (_, answers) in enumerate(chunk) if answers]
+        if submitted:
+            record_scores(quiz, chunk_scores[submitted])
+        yield '\n'.join(lines) + '\n'
+
+@csrf_exempt
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def submit_quiz_batch(request):
+    """Score a whole classroom's answer sets for one quiz, streamed back as NDJSON.
+
+    Expects {"quiz_id": 1, "submissions": [...]} where each submission is
+    either a list of answer IDs or {"id": "<student ref>", "answers": [...]}.
+    """
+    quiz_id = request.data.get('quiz_id')
+    submissions = request.data.get('submissions', [])
+
+    if not quiz_id or not isinstance(submissions, list) or not submissions:
+        return Response(
+            {'error': 'Quiz ID and submissions are required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(submissions) > BATCH_SUBMIT_MAX_SIZE:
+        return Response(
+            {'error': f'At most {BATCH_SUBMIT_MAX_SIZE} submissions can be sent per batch'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    normalized = []
+    for submission in submissions:
+        if isinstance(submission, dict):
+            answers = submission.get('answers') or []
+            normalized.append((submission.get('id'), answers if isinstance(answers, list) else []))
+        elif isinstance(submission, list):
+            normalized.append((None, submission))
+        else:
+            normalized.append((None, []))
+
+    quiz = get_compiled_quiz(quiz_id)
+    if quiz is None:
+        return Response({'error': 'Quiz not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    return StreamingHttpResponse(
+        _stream_batch_results(quiz, normalized),
+        content_type='application/x-ndjson'
+    )
+
 # API endpoints for statistics and featured content
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def featured_content(request):
     """Get featured content from all categories"""
-    featured_videos = Video.objects.filter(is_featured=True)[:3]
-    featured_pdfs = PDFResource.objects.filter(is_featured=True)[:3]
-    featured_articles = Article.objects.filter(is_featured=True, is_published=True)[:3]
+    featured_videos = Video.objects.filter(is_featured=True).prefetch_related('tags')[:3]
+    featured_pdfs = PDFResource.objects.filter(is_featured=True).prefetch_related('tags', 'stats')[:3]
+    featured_articles = Article.objects.filter(is_featured=True, is_published=True).prefetch_related('tags', 'stats')[:3]
     
     data = {
         'videos': VideoSerializer(featured_videos, many=True, context={'request': request}).data,
@@ -316,6 +402,62 @@ def featured_content(request):
     
     return Response(data)
 
+TRENDING_SERIALIZERS = {
+    'videos': VideoSerializer,
+    'pdfs': PDFResourceSerializer,
+    'articles': ArticleListSerializer,
+    'scholarships': ScholarshipSerializer,
+    'colleges': CollegeSerializer,
+}
+
+# Rendered trending lists; a list rebuild bumps the generation
+trending_cache = LRUCache(maxsize=64, ttl=300)
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def trending_content(request):
+    """Content with the most recent views, downloads and applications; ?type= narrows it to one kind.
+    
+    Reads the lists precomputed from the decayed trending scores every few
+    minutes, so new hits show up after the next rebuild.
+    """
+    list_name = request.query_params.get('type', 'all')
+    if list_name != 'all' and list_name not in TRENDING_TYPES:
+        return Response({'error': f'type must be one of all, {", ".join(TRENDING_TYPES)}'},
+                       status=status.HTTP_400_BAD_REQUEST)
+    limit = parse_limit(request, 10, LIST_SIZE)
+    
+    cache_key = (list_name, limit, request.build_absolute_uri('/'), get_generation(TRENDING_GENERATION))
+    data = trending_cache.get(cache_key)
+    if data is None:
+        entries = list(TrendingItem.objects.filter(list_name=list_name).select_related('content_type')[:limit])
+        objects = {}
+        for content_type in {entry.content_type for entry in entries}:
+            model = content_type.model_class()
+            queryset = model.objects.filter(**VISIBLE.get(model, {}))
+            objects[content_type.pk] = queryset.prefetch_related(*RESULT_PREFETCH.get(model, ('stats',))).in_bulk(
+                [entry.object_id for entry in entries if entry.content_type == content_type]
+            )
+        results = []
+        for entry in entries:
+            item = objects[entry.content_type_id].get(entry.object_id)
+            # Skip items deleted or hidden since the list was built
+            if item is not None:
+                type_name = TYPE_NAMES[type(item)]
+                results.append({
+                    'type': type_name,
+                    'score': round(entry.score, 3),
+                    'item': TRENDING_SERIALIZERS[type_name](item, context={'request': request}).data,
+                })
+        data = {
+            'type': list_name,
+            'computed_at': entries[0].computed_at if entries else None,
+            'results': results,
+        }
+        trending_cache.set(cache_key, data)
+    
+    return Response(data)
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def content_statistics(request):
@@ -331,60 +473,261 @@ def content_statistics(request):
     
     return Response(stats)
 
+SEARCH_SERIALIZERS = {
+    'videos': VideoSerializer,
+    'pdfs': PDFResourceSerializer,
+    'articles': ArticleListSerializer,
+}
+
+# Per-worker cache of rendered search responses. Keys include the search
+# generation of every content type involved, so any save or delete of a
+# video, PDF or article makes the old entries unreachable.
+search_cache = LRUCache(maxsize=1024, ttl=300)
+
+def find_matches(query, types, filters):
+    """Return (results, total, facets) for a query, with the top 10 results of each type"""
+    if search_available():
+        # BM25-ranked matches from the full-text index; one grouped pass gives the counts
+        results, total, facets = search(query, limit=10, types=types, filters=filters)
+    else:
+        # Substring search for databases without the full-text index
+        querysets = {
+            'videos': Video.objects.filter(
+                Q(title__icontains=query) | Q(description__icontains=query) | Q(tags__name__icontains=query)
+            ).distinct(),
+            'pdfs': PDFResource.objects.filter(
+                Q(title__icontains=query) | Q(description__icontains=query) | Q(tags__name__icontains=query)
+            ).distinct(),
+            'articles': Article.objects.filter(is_published=True).filter(
+                Q(title__icontains=query) | Q(description__icontains=query)
+                | Q(content__icontains=query) | Q(tags__name__icontains=query)
+            ).distinct(),
+        }
+        # One grouped aggregate per type supplies both the facets and the total
+        rows = [
+            ({'type': content_type, **values}, count)
+            for content_type, queryset in querysets.items()
+            # The tag join can repeat rows, so group over the matching ids instead
+            for values, count in grouped_rows(queryset.model.objects.filter(pk__in=queryset.values('pk')))
+        ]
+        facet_filters = dict(filters, **({'type': types[0]} if len(types) == 1 else {}))
+        total = matching_total(rows, facet_filters)
+        facets = count_facets(rows, facet_filters, SEARCH_FACET_FIELDS)
+        results = {
+            content_type: querysets[content_type].filter(**filters).prefetch_related(*RESULT_PREFETCH[SEARCH_MODELS[content_type]])[:10]
+            for content_type in types
+        }
+    return results, total, facets
+
+def run_search(request, query, types, filters):
+    """Search the requested content types and serialize the top 10 of each, with facet counts.
+
+    When nothing matches, the query is spell-corrected against the words
+    of the indexed content and the corrected query's results are returned
+    instead, with corrected_query set.
+    """
+    results, total, facets = find_matches(query, types, filters)
+    corrected_query = None
+    if not total:
+        correction = correct_query(query)
+        if correction:
+            corrected = find_matches(correction, types, filters)
+            if corrected[1]:
+                (results, total, facets), corrected_query = corrected, correction
+    
+    data = {
+        content_type: SEARCH_SERIALIZERS[content_type](
+            results[content_type], many=True, context={'request': request}
+        ).data
+        for content_type in types
+    }
+    data['total_results'] = total
+    data['facets'] = facets
+    data['corrected_query'] = corrected_query
+    return data
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def search_content(request):
-    """Search across all content types"""
+    """Search across all content types, or one of them with ?type=videos|pdfs|articles.
+
+    ?category=, ?featured= and ?parent=true|false narrow the results; the
+    facet counts show what each of those filters would leave.
+    """
     query = request.query_params.get('q', '')
-    if not query:
+    if not query.strip():
         return Response({'error': 'Search query is required'}, status=status.HTTP_400_BAD_REQUEST)
     
-    # Search videos
-    videos = Video.objects.filter(
-        title__icontains=query
-    ) | Video.objects.filter(
-        description__icontains=query
-    ) | Video.objects.filter(
-        tags__icontains=query
-    )
+    content_type = request.query_params.get('type')
+    if content_type and content_type not in SEARCH_TYPES:
+        return Response({'error': f'type must be one of {", ".join(SEARCH_TYPES)}'},
+                       status=status.HTTP_400_BAD_REQUEST)
+    types = (content_type,) if content_type else SEARCH_TYPES
     
-    # Search PDFs
-    pdfs = PDFResource.objects.filter(
-        title__icontains=query
-    ) | PDFResource.objects.filter(
-        description__icontains=query
-    ) | PDFResource.objects.filter(
-        tags__icontains=query
-    )
+    filters = {}
+    category = request.query_params.get('category')
+    featured = request.query_params.get('featured')
+    parent = request.query_params.get('parent', '').lower()
+    if category:
+        filters['category'] = category
+    if featured:
+        filters['is_featured'] = True
+    if parent in ('true', '1', 'false', '0'):
+        filters['is_parent_content'] = parent in ('true', '1')
     
-    # Search articles
-    articles = Article.objects.filter(
-        is_published=True
-    ).filter(
-        title__icontains=query
-    ) | Article.objects.filter(
-        is_published=True
-    ).filter(
-        description__icontains=query
-    ) | Article.objects.filter(
-        is_published=True
-    ).filter(
-        content__icontains=query
-    ) | Article.objects.filter(
-        is_published=True
-    ).filter(
-        tags__icontains=query
+    # Serialized URLs are absolute, so the host is part of the key; the
+    # type facet counts every type, so every type's generation is too
+    cache_key = (
+        ' '.join(query.casefold().split()),
+        content_type,
+        tuple(sorted(filters.items())),
+        request.build_absolute_uri('/'),
+        tuple(get_generation(SEARCH_GENERATIONS[SEARCH_MODELS[t]]) for t in SEARCH_TYPES),
     )
+    data = search_cache.get(cache_key)
+    if data is None:
+        data = run_search(request, query, types, filters)
+        search_cache.set(cache_key, data)
+    record_search(query, data['total_results'] > 0)
     
-    data = {
-        'videos': VideoSerializer(videos[:10], many=True, context={'request': request}).data,
-        'pdfs': PDFResourceSerializer(pdfs[:10], many=True, context={'request': request}).data,
-        'articles': ArticleListSerializer(articles[:10], many=True, context={'request': request}).data,
-        'total_results': videos.count() + pdfs.count() + articles.count()
-    }
+    return Response(data)
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def search_by_meaning(request):
+    """Find content close in meaning to a query, e.g. "jobs that involve helping people".
+
+    Uses the vectors written by the build_semantic_index command, so content
+    added since its last run is not found yet.
+    """
+    query = request.query_params.get('q', '')
+    if not query.strip():
+        return Response({'error': 'Search query is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    content_type = request.query_params.get('type')
+    if content_type and content_type not in SEARCH_TYPES:
+        return Response({'error': f'type must be one of {", ".join(SEARCH_TYPES)}'},
+                       status=status.HTTP_400_BAD_REQUEST)
+    types = (content_type,) if content_type else SEARCH_TYPES
+    
+    results = semantic_search(query, limit=10, types=types)
+    if results is None:
+        return Response({'error': 'Semantic search index has not been built yet'},
+                       status=status.HTTP_503_SERVICE_UNAVAILABLE)
     
+    data = {}
+    for content_type in types:
+        items = SEARCH_SERIALIZERS[content_type](
+            [obj for obj, _ in results[content_type]], many=True, context={'request': request}
+        ).data
+        for item, (_, score) in zip(items, results[content_type]):
+            item['score'] = round(score, 4)
+        data[content_type] = items
     return Response(data)
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def search_suggestions(request):
+    """Typeahead completions for the search box, served from memory"""
+    query = request.query_params.get('q', '')
+    limit = parse_limit(request, 10, 25)
+    
+    suggestions = get_suggest_index().suggest(query, limit=limit) if query.strip() else []
+    return Response({'query': query, 'suggestions': suggestions})
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def search_cache_stats(request):
+    """Hit/miss counters of this worker's search result cache"""
+    return Response(search_cache.stats())
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def search_analytics(request):
+    """Most searched queries, queries that found nothing and search volume by ?interval=day|hour"""
+    days = parse_limit(request, 7, 366, param='days')
+    limit = parse_limit(request, 20, 200)
+    interval = request.query_params.get('interval', 'day')
+    if interval not in ('day', 'hour'):
+        return Response({'error': 'interval must be day or hour'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    flush_pending()
+    since = timezone.localdate() - timedelta(days=days - 1)
+    return Response({'since': since, 'days': days, **query_report(since, limit, interval)})
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def engagement(request):
+    """Views, downloads and applications over the last ?days= for ?type=videos|articles|pdfs|scholarships|colleges.
+    
+    Lists the most viewed (downloaded, applied to) items of the type, or
+    with ?id= the per-day counts of one item; ?interval=hour gives hourly
+    counts for up to the last week.
+    """
+    content_type = request.query_params.get('type')
+    if content_type not in ENGAGEMENT_TYPES:
+        return Response({'error': f'type must be one of {", ".join(ENGAGEMENT_TYPES)}'},
+                       status=status.HTTP_400_BAD_REQUEST)
+    model, ranked_by = ENGAGEMENT_TYPES[content_type]
+    interval = request.query_params.get('interval', 'day')
+    if interval not in ('day', 'hour'):
+        return Response({'error': 'interval must be day or hour'}, status=status.HTTP_400_BAD_REQUEST)
+    max_days = 366 if interval == 'day' else HOURLY_RETENTION_DAYS
+    days = parse_limit(request, 7, max_days, param='days')
+    limit = parse_limit(request, 20, 100)
+    
+    flush_counters()
+    since = timezone.localdate() - timedelta(days=days - 1)
+    data = {'type': content_type, 'since': since, 'days': days}
+    
+    object_id = request.query_params.get('id')
+    if object_id:
+        if not object_id.isdigit():
+            return Response({'error': 'id must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        item = get_object_or_404(model, pk=object_id)
+        data['id'] = item.pk
+        data['title'] = str(item)
+        data['series'] = [{interval: period, **counts} for period, counts in item_series(model, item.pk, since, interval)]
+        return Response(data)
+    
+    top = top_items(model, ranked_by, since, limit)
+    titles = {item.pk: str(item) for item in model.objects.filter(pk__in=[pk for pk, _ in top])}
+    data['items'] = [{'id': pk, 'title': titles[pk], **counts} for pk, counts in top if pk in titles]
+    return Response(data)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def visitor_counts(request):
+    """Approximate distinct viewers of ?type=&id= over the last ?days=, per day and in total.
+    
+    Estimates come from HyperLogLog sketches and are typically within 2%
+    of the exact count.
+    """
+    content_type = request.query_params.get('type')
+    if content_type not in ENGAGEMENT_TYPES:
+        return Response({'error': f'type must be one of {", ".join(ENGAGEMENT_TYPES)}'},
+                       status=status.HTTP_400_BAD_REQUEST)
+    object_id = request.query_params.get('id', '')
+    if not object_id.isdigit():
+        return Response({'error': 'id must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+    days = parse_limit(request, 30, 366, param='days')
+    model, _ = ENGAGEMENT_TYPES[content_type]
+    item = get_object_or_404(model, pk=object_id)
+    
+    flush_visitors()
+    since = timezone.localdate() - timedelta(days=days - 1)
+    total, per_day = unique_visitors(model, item.pk, since)
+    return Response({
+        'type': content_type,
+        'id': item.pk,
+        'title': str(item),
+        'since': since,
+        'days': days,
+        'unique_visitors': total,
+        'all_time_unique_visitors': item.unique_visitors,
+        'series': [{'day': day, 'unique_visitors': count} for day, count in per_day],
+    })
+
 # Scholarship Views
 class ScholarshipListView(generics.ListAPIView):
     serializer_class = ScholarshipSerializer
@@ -403,19 +746,20 @@ class ScholarshipListView(generics.ListAPIView):
         if field_of_study:
             queryset = queryset.filter(field_of_study__icontains=field_of_study)
             
-        return queryset.order_by('application_deadline')
+        return queryset.order_by('application_deadline').prefetch_related('stats')
 
 class ScholarshipDetailView(generics.RetrieveAPIView):
     queryset = Scholarship.objects.filter(is_active=True)
     serializer_class = ScholarshipSerializer
     permission_classes = [AllowAny]
 
-    def get(self, request, *args, **kwargs):
+    def retrieve(self, request, *args, **kwargs):
         scholarship = self.get_object()
         # Increment application count when viewed
-        scholarship.application_count += 1
-        scholarship.save()
-        return super().get(request, *args, **kwargs)
+        scholarship.increment_application_count()
+        record_visitor(request, scholarship)
+        serializer = self.get_serializer(scholarship)
+        return Response(serializer.data)
 
 # College Views
 class CollegeListView(generics.ListAPIView):
@@ -438,16 +782,17 @@ class CollegeListView(generics.ListAPIView):
         if featured:
             queryset = queryset.filter(is_featured=True)
             
-        return queryset.order_by('-view_count', 'name')
+        return queryset.order_by('-stats__view_count', 'name').prefetch_related('stats')
 
 class CollegeDetailView(generics.RetrieveAPIView):
     queryset = College.objects.all()
     serializer_class = CollegeSerializer
     permission_classes = [AllowAny]
 
-    def get(self, request, *args, **kwargs):
+    def retrieve(self, request, *args, **kwargs):
         college = self.get_object()
         # Increment view count when accessed
-        college.view_count += 1
-        college.save()
-        return super().get(request, *args, **kwargs)
\ No newline at end of file
+        college.increment_view_count()
+        record_visitor(request, college)
+        serializer = self.get_serializer(college)
+        return Response(serializer.data)
\ No newline at end of file
@@ -0,0 +1,109 @@
+"""Approximate unique viewers per item from HyperLogLog sketches.
+
+Detail views hash the visitor (user id, or IP address for anonymous
+visitors) with a key derived from SECRET_KEY, so neither ids nor addresses
+are stored, and buffer the hash. Each flush folds the hashes into the
+item's all-time sketch on ContentStats and into a VisitorSketch per day.
+A sketch takes at most 4 KB, and only a few bytes per viewer while small,
+however many times the same people reload the page; day sketches merge
+into the distinct viewers of any range of days.
+"""
+import hashlib
+from collections import defaultdict
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.utils import timezone
+from .buffers import FlushBuffer
+from .models import COUNTER_FIELDS, ContentStats, VisitorSketch
+from .sketches import HyperLogLog, hash64
+
+FLUSH_INTERVAL = 30  # seconds
+FLUSH_MAX_SIZE = 20000
+
+_hash_key = hashlib.sha256(f'visitors:{settings.SECRET_KEY}'.encode()).digest()
+
+def visitor_hash(request):
+    if request.user.is_authenticated:
+        return hash64(('user', request.user.pk), _hash_key)
+    return hash64(('ip', request.META.get('REMOTE_ADDR', '')), _hash_key)
+
+def merged_sketch(existing, hashes):
+    sketch = HyperLogLog.from_bytes(existing)
+    for value in hashes:
+        sketch.add_hash(value)
+    return sketch
+
+def flush_visitors(visits):
+    """Fold buffered (content_type_id, object_id, day, visitor hash) visits into the stored sketches"""
+    totals, daily = defaultdict(set), defaultdict(set)
+    for content_type_id, object_id, day, value in visits:
+        totals[(content_type_id, object_id)].add(value)
+        daily[(content_type_id, object_id, day)].add(value)
+    content_type_ids = {content_type_id for content_type_id, _ in totals}
+    object_ids = {object_id for _, object_id in totals}
+
+    qn = connection.ops.quote_name
+    table = qn(ContentStats._meta.db_table)
+    with transaction.atomic():
+        # The counter flushes may not have created an item's row yet
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {table} (content_type_id, object_id, {", ".join(qn(f) for f in COUNTER_FIELDS)}) '
+                f'VALUES (%s, %s, {", ".join(["0"] * len(COUNTER_FIELDS))}) '
+                f'ON CONFLICT (content_type_id, object_id) DO NOTHING',
+                list(totals)
+            )
+        rows = [
+            row for row in ContentStats.objects.select_for_update().filter(
+                content_type_id__in=content_type_ids, object_id__in=object_ids
+            ).only('content_type_id', 'object_id', 'visitors')
+            if (row.content_type_id, row.object_id) in totals
+        ]
+        for row in rows:
+            sketch = merged_sketch(row.visitors, totals[(row.content_type_id, row.object_id)])
+            row.visitors, row.unique_visitors = sketch.to_bytes(), sketch.count()
+        ContentStats.objects.bulk_update(rows, ['visitors', 'unique_visitors'])
+
+        existing = {
+            (row.content_type_id, row.object_id, row.day): row
+            for row in VisitorSketch.objects.select_for_update().filter(
+                content_type_id__in=content_type_ids, object_id__in=object_ids,
+                day__in={day for _, _, day in daily}
+            )
+        }
+        changed, created = [], []
+        for key, hashes in daily.items():
+            row = existing.get(key)
+            if row is None:
+                content_type_id, object_id, day = key
+                row = VisitorSketch(content_type_id=content_type_id, object_id=object_id, day=day)
+                created.append(row)
+            else:
+                changed.append(row)
+            sketch = merged_sketch(row.sketch, hashes)
+            row.sketch, row.unique_visitors = sketch.to_bytes(), sketch.count()
+        VisitorSketch.objects.bulk_update(changed, ['sketch', 'unique_visitors'])
+        VisitorSketch.objects.bulk_create(created)
+
+_buffer = FlushBuffer(flush_visitors, interval=FLUSH_INTERVAL, max_size=FLUSH_MAX_SIZE, name='visitors')
+
+def record_visitor(request, instance):
+    """Note that the requesting visitor viewed instance"""
+    content_type = ContentType.objects.get_for_model(instance)
+    _buffer.add((content_type.pk, instance.pk, timezone.localdate(), visitor_hash(request)))
+
+def flush_pending():
+    """Write this worker's buffered visits now"""
+    _buffer.flush()
+
+def unique_visitors(model, object_id, since):
+    """(distinct viewers since a day, [(day, distinct viewers that day)]) of one item"""
+    sketches = VisitorSketch.objects.filter(
+        content_type=ContentType.objects.get_for_model(model), object_id=object_id, day__gte=since
+    ).values_list('day', 'sketch', 'unique_visitors')
+    total, days = HyperLogLog(), []
+    for day, data, count in sketches:
+        total.merge(HyperLogLog.from_bytes(data))
+        days.append((day, count))
+    return total.count(), days